@@ -0,0 +1,75 @@
+"""
+Benchmark get_case_with_laws: merge toàn bảng so với chỉ mục kề CSR
+
+Cách cũ merge case_data (kèm toàn văn) với case_law_data rồi law_data ở mỗi
+lần gọi, sau đó mới lọc theo case_id. Cách mới dựng kết quả từ
+case_law_index: tra một bản án chỉ lấy các dòng trích dẫn của nó, bảng ghép
+toàn bộ không sao chép cột văn bản trừ khi include_text=True.
+
+Cách chạy:
+    python benchmarks/bench_case_law_index.py --data-dir data_export
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from bench_utils import quiet, summarize, time_call
+
+from data_loader import DataLoader
+
+
+def merge_case_with_laws(loader: DataLoader, case_id: int = None) -> pd.DataFrame:
+    """Cách cũ: merge ba bảng ở mỗi lần gọi rồi lọc theo bản án"""
+    merged = pd.merge(loader.case_data, loader.case_law_data, left_on='id', right_on='case_id', how='inner')
+    merged = pd.merge(merged, loader.law_data, left_on='law_id', right_on='id', how='left',
+                      suffixes=('', '_law'))
+    if case_id is not None:
+        merged = merged[merged['case_id'] == case_id]
+    return merged
+
+
+def per_call_ms(func, keys) -> float:
+    started = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - started) / len(keys) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--lookups', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    loader = DataLoader(args.data_dir)
+    with quiet():
+        loader.load_all_data()
+    started = time.perf_counter()
+    loader.build_indexes()
+    build_ms = (time.perf_counter() - started) * 1000
+
+    keys = np.random.default_rng(0).choice(loader.case_data['id'].to_numpy(), args.lookups).tolist()
+    merge_single = per_call_ms(lambda key: merge_case_with_laws(loader, key), keys)
+    index_single = per_call_ms(loader.get_case_with_laws, keys)
+
+    merge_all = summarize(time_call(lambda: merge_case_with_laws(loader), args.repeat))['median']
+    index_all = summarize(time_call(lambda: loader.get_case_with_laws(), args.repeat))['median']
+    index_all_text = summarize(time_call(lambda: loader.get_case_with_laws(include_text=True),
+                                         args.repeat))['median']
+
+    print("🔗 GET_CASE_WITH_LAWS (ms/lần gọi)")
+    print("=" * 70)
+    print(f"  - {len(loader.case_data):,} bản án, {len(loader.case_law_index):,} trích dẫn, "
+          f"dựng chỉ mục {build_ms:.1f} ms")
+    print(f"  - một bản án : merge {merge_single:9.2f} | chỉ mục {index_single:7.3f} "
+          f"| nhanh hơn {merge_single / index_single:,.0f}x")
+    print(f"  - toàn bộ    : merge {merge_all * 1000:9.2f} | chỉ mục {index_all * 1000:7.2f} "
+          f"(kèm văn bản {index_all_text * 1000:.2f})")
+
+
+if __name__ == "__main__":
+    main()
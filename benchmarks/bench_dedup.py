@@ -0,0 +1,165 @@
+"""
+Benchmark phát hiện bản án gần trùng: so sánh mọi cặp so với MinHash + LSH
+
+Một phần bản án (--duplicate-fraction) được đăng lại với id/case_number/url
+mới và vài âm tiết bị sửa, ghi ra thư mục tạm. Cách cũ tính Jaccard chính
+xác của mọi cặp bản án (ma trận shingle thưa nhân chuyển vị của nó);
+MinHashIndex chỉ so sánh các cặp cùng bucket LSH. Đo thời gian tính chữ ký
+(1 và --jobs tiến trình), thời gian tìm cụm, thời gian kiểm tra các bản án
+nối thêm, precision/recall so với Jaccard chính xác và số mẫu test bị rò rỉ
+(cùng cụm với một mẫu train) khi chia train/test thường và theo cụm. Kiểm tra
+thêm văn bản được sửa tại chỗ (cùng id) thì được tính lại chữ ký.
+
+Cách chạy:
+    python benchmarks/bench_dedup.py --data-dir data_export
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from bench_utils import quiet
+
+from data_loader import DataLoader
+from dedup import THRESHOLD, MinHashIndex, shingle_hashes
+from models.law_classifier import LawClassifier
+
+
+def plant_duplicates(data_dir: str, target_dir: str, fraction: float, seed: int = 42) -> int:
+    """Ghi bản sao dữ liệu kèm các bản án đăng lại, trả về số bản án đăng lại"""
+    rng = np.random.default_rng(seed)
+    cases = pd.read_csv(os.path.join(data_dir, "case_data.csv"), encoding='utf-8-sig')
+    links = pd.read_csv(os.path.join(data_dir, "case_law_data.csv"), encoding='utf-8-sig')
+    sources = np.sort(rng.choice(len(cases), int(len(cases) * fraction), replace=False))
+
+    copies = cases.iloc[sources].copy()
+    new_ids = np.arange(len(copies)) + cases['id'].max() + 1
+    id_map = dict(zip(copies['id'], new_ids))
+    copies['id'] = new_ids
+    copies['case_number'] = copies['case_number'].astype(str) + '-dup'
+    copies['url'] = copies['url'].astype(str) + '?repost'
+    copies['file'] = 'repost_' + copies['file'].astype(str)
+
+    def edit(text: str) -> str:
+        words = str(text).split()
+        for position in rng.choice(len(words), min(len(words), 2), replace=False) if words else []:
+            words[position] = words[position][::-1]
+        return ' '.join(words)
+    copies['text'] = copies['text'].map(edit)
+
+    copy_links = links[links['case_id'].isin(id_map)].copy()
+    copy_links['case_id'] = copy_links['case_id'].map(id_map)
+    copy_links['id'] = np.arange(len(copy_links)) + links['id'].max() + 1
+    pd.concat([cases, copies]).to_csv(os.path.join(target_dir, "case_data.csv"), index=False, encoding='utf-8-sig')
+    pd.concat([links, copy_links]).to_csv(os.path.join(target_dir, "case_law_data.csv"), index=False,
+                                          encoding='utf-8-sig')
+    shutil.copy(os.path.join(data_dir, "law_data.csv"), os.path.join(target_dir, "law_data.csv"))
+    return len(copies)
+
+
+def exact_pairs(texts, threshold: float) -> set:
+    """Cách cũ: Jaccard chính xác của mọi cặp qua ma trận shingle thưa"""
+    values, counts = shingle_hashes(texts)
+    rows = np.repeat(np.arange(len(counts)), counts)
+    _, columns = np.unique(values, return_inverse=True)
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, columns)))
+    # Shingle lặp lại trong một văn bản chỉ tính một lần
+    matrix.data[:] = 1
+    sizes = np.asarray(matrix.sum(axis=1)).ravel()
+    intersection = sparse.triu(matrix @ matrix.T, k=1).tocoo()
+    jaccard = intersection.data / (sizes[intersection.row] + sizes[intersection.col] - intersection.data)
+    keep = jaccard >= threshold
+    return set(zip(intersection.row[keep].tolist(), intersection.col[keep].tolist()))
+
+
+def leaked_samples(model: LawClassifier, loader: DataLoader, group_split: bool) -> int:
+    """Số mẫu test có bản án cùng cụm gần trùng với một mẫu train"""
+    texts, labels = model.prepare_data(loader)
+    y_encoded = model.label_encoder.fit_transform(labels)
+    train_idx, test_idx = model._split(loader, len(texts), 0.2, y_encoded, group_split)
+    groups = loader.get_duplicate_clusters()[model._sample_rows]
+    return int(np.isin(groups[test_idx], groups[train_idx]).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--duplicate-fraction', type=float, default=0.1)
+    parser.add_argument('--append-fraction', type=float, default=0.05)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_dedup_')
+    try:
+        planted = plant_duplicates(args.data_dir, work_dir, args.duplicate_fraction)
+        loader = DataLoader(work_dir)
+        with quiet():
+            loader.load_all_data()
+        texts = loader.get_case_texts('text')
+        ids = loader.case_data['id']
+
+        timings = {}
+        for jobs in sorted({1, args.jobs}):
+            index = MinHashIndex()
+            started = time.perf_counter()
+            index.refresh(ids, texts, n_jobs=jobs)
+            timings[jobs] = time.perf_counter() - started
+        started = time.perf_counter()
+        clusters = index.clusters()
+        lsh_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        expected = exact_pairs(texts, THRESHOLD)
+        exact_seconds = time.perf_counter() - started
+        found = set(map(tuple, index.duplicate_pairs()[['row', 'other_row']].to_numpy().tolist()))
+        # So sánh theo cụm: cặp chính xác được tính là tìm thấy nếu hai dòng cùng cụm
+        recall = np.mean([clusters[i] == clusters[j] for i, j in expected]) if expected else 1.0
+        precision = len(found & expected) / len(found) if found else 1.0
+
+        # Kiểm tra bản án nối thêm: chỉ các dòng mới được tính chữ ký
+        n_old = int(len(ids) * (1 - args.append_fraction))
+        incremental = MinHashIndex()
+        incremental.refresh(ids.iloc[:n_old], texts.take(np.arange(n_old)))
+        started = time.perf_counter()
+        incremental.refresh(ids, texts)
+        incremental.clusters()
+        append_seconds = time.perf_counter() - started
+        assert np.array_equal(incremental.signatures, index.signatures)
+
+        # Văn bản được sửa tại chỗ (id không đổi): chỉ dòng đó được tính lại chữ ký
+        corrected = pd.Series(list(texts), dtype=object)
+        corrected.iloc[0] = corrected.iloc[0] + ' văn bản được sửa lỗi'
+        assert incremental.refresh(ids, corrected) == 1
+        rebuilt = MinHashIndex()
+        rebuilt.refresh(ids, corrected)
+        assert np.array_equal(incremental.signatures, rebuilt.signatures)
+
+        print("🧬 BẢN ÁN GẦN TRÙNG")
+        print("=" * 70)
+        print(f"  - {len(ids):,} bản án ({planted:,} bản đăng lại), ngưỡng Jaccard {THRESHOLD}")
+        for jobs, seconds in timings.items():
+            print(f"  - chữ ký MinHash, {jobs} tiến trình          : {seconds:8.2f} s")
+        print(f"  - mọi cặp, Jaccard chính xác            : {exact_seconds:8.2f} s")
+        print(f"  - LSH + ước lượng + gom cụm             : {lsh_seconds:8.2f} s")
+        print(f"  - nối thêm {args.append_fraction:.0%} bản án (chữ ký + gom cụm)  : {append_seconds:8.2f} s")
+        print(f"  - {len(expected):,} cặp gần trùng: recall {recall:.3f} | precision {precision:.3f} | "
+              f"{int((clusters != np.arange(len(clusters))).sum()):,} bản án bị gộp")
+
+        with quiet():
+            loader.get_duplicate_clusters()
+            model = LawClassifier()
+            leaked = {group_split: leaked_samples(model, loader, group_split) for group_split in (False, True)}
+        print(f"  - mẫu test rò rỉ từ train: chia thường {leaked[False]:,} | chia theo cụm {leaked[True]:,}")
+        assert leaked[True] == 0
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark tìm siêu tham số: dùng lại ma trận đếm so với fit_transform từng ứng viên
+
+Cách cơ sở chạy TfidfVectorizer.fit_transform/transform trên văn bản cho mỗi
+(ứng viên, fold) như khi sửa tham số rồi chạy lại train(). HyperparameterSearch
+tách từ một lần (cache trống và cache có sẵn), mỗi cấu hình vectorizer chỉ là
+chọn cột trên ma trận đếm của fold, và chạy các tác vụ trên nhiều tiến trình.
+
+Cách chạy:
+    python benchmarks/bench_hyperparameter_search.py --data-dir data_export --jobs 1 4
+"""
+
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.model_selection import KFold
+from sklearn.naive_bayes import MultinomialNB
+
+from bench_utils import quiet
+
+from data.config import MODEL_CONFIG
+from data_loader import DataLoader
+from models.law_classifier import LawClassifier
+from models.token_cache import TokenCache
+from models.tuning import HyperparameterSearch, expand_grid
+
+VECTORIZER_GRID = {'max_features': [2000, 5000], 'min_df': [1, 2], 'use_idf': [True, False]}
+CLASSIFIER_GRIDS = {'naive_bayes': {'alpha': [0.1, 1.0]}}
+
+
+def baseline_search(loader: DataLoader, n_folds: int) -> float:
+    """fit_transform lại văn bản cho mỗi (ứng viên, fold), trả về thời gian (giây)"""
+    with quiet():
+        texts, Y = LawClassifier(multi_label=True).prepare_multilabel_data(loader)
+    Y = Y.tocsr()
+    started = time.perf_counter()
+    for train_cases, test_cases in KFold(n_folds, shuffle=True, random_state=42).split(np.arange(Y.shape[0])):
+        Y_train = Y[train_cases]
+        train_texts = texts.take(np.repeat(train_cases, np.diff(Y_train.indptr)))
+        for vectorizer_params in expand_grid(VECTORIZER_GRID):
+            for classifier_params in expand_grid(CLASSIFIER_GRIDS['naive_bayes']):
+                vectorizer = TfidfVectorizer(**{**MODEL_CONFIG['tfidf'], **vectorizer_params})
+                X_train = vectorizer.fit_transform(train_texts)
+                classifier = MultinomialNB(**classifier_params).fit(X_train, Y_train.indices)
+                classifier.predict_proba(vectorizer.transform(texts.take(test_cases)))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--folds', type=int, default=3)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    loader = DataLoader(args.data_dir)
+    with quiet():
+        loader.load_all_data()
+    n_candidates = len(expand_grid(VECTORIZER_GRID)) * len(expand_grid(CLASSIFIER_GRIDS['naive_bayes']))
+
+    print("⏱️  TÌM SIÊU THAM SỐ")
+    print("=" * 70)
+    print(f"  - {n_candidates} ứng viên × {args.folds} fold")
+    print(f"  - fit_transform từng ứng viên      : {baseline_search(loader, args.folds):7.1f}s")
+
+    TokenCache(os.path.join(loader.cache_dir, 'tokens')).clear()
+    for label, n_jobs in [('cache trống', args.jobs[0])] + [('cache có sẵn', n) for n in args.jobs]:
+        search = HyperparameterSearch(VECTORIZER_GRID, CLASSIFIER_GRIDS, n_folds=args.folds, n_jobs=n_jobs)
+        started = time.perf_counter()
+        with quiet():
+            leaderboard = search.run(loader)
+        elapsed = time.perf_counter() - started
+        print(f"  - HyperparameterSearch {label:12s}, {n_jobs:2d} tiến trình: {elapsed:7.1f}s")
+
+    best = leaderboard.iloc[0]
+    metric = [column for column in leaderboard.columns if column.startswith(search.scoring[0] + '@')][0]
+    print(f"  - tốt nhất: {best['model_type']} {best['vectorizer_params']} {best['classifier_params']} "
+          f"{metric}={best[metric]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
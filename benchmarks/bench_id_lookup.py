@@ -0,0 +1,73 @@
+"""
+Benchmark tra cứu bản án theo ID: lọc boolean mask so với chỉ mục băm
+
+Cách chạy:
+    python benchmarks/bench_id_lookup.py --sizes 10000 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from bench_utils import quiet
+
+from data_loader import DataLoader
+
+
+def make_loader(n_rows: int) -> DataLoader:
+    """Tạo DataLoader với case_data tổng hợp gồm n_rows dòng"""
+    rng = np.random.default_rng(42)
+    loader = DataLoader()
+    loader.case_data = pd.DataFrame({
+        'id': rng.permutation(n_rows) + 1,
+        'case_number': [f"{i}/2020/HS-ST" for i in range(n_rows)],
+        'court_name': rng.choice(['TAND tỉnh A', 'TAND huyện B'], n_rows),
+    })
+    loader.build_indexes()
+    return loader
+
+
+def mask_lookup(loader: DataLoader, case_id: int) -> dict:
+    """Cách tra cứu cũ: quét toàn bảng bằng boolean mask"""
+    case = loader.case_data[loader.case_data['id'] == case_id]
+    return case.iloc[0].to_dict() if len(case) > 0 else {}
+
+
+def per_call_us(func, keys) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000])
+    parser.add_argument('--lookups', type=int, default=200)
+    parser.add_argument('--bulk', type=int, default=10_000)
+    args = parser.parse_args()
+
+    print("🔎 TRA CỨU THEO ID (µs/lần)")
+    print("=" * 60)
+    for n_rows in args.sizes:
+        with quiet():
+            loader = make_loader(n_rows)
+        rng = np.random.default_rng(0)
+        keys = rng.integers(1, n_rows + 1, args.lookups).tolist()
+        bulk_keys = rng.integers(1, n_rows + 1, args.bulk)
+
+        mask_us = per_call_us(lambda k: mask_lookup(loader, k), keys)
+        index_us = per_call_us(loader.get_case_by_id, keys)
+
+        start = time.perf_counter()
+        loader.get_cases_by_ids(bulk_keys)
+        bulk_us = (time.perf_counter() - start) / len(bulk_keys) * 1e6
+
+        print(f"  {n_rows:>9,} dòng: mask {mask_us:10.1f} | chỉ mục {index_us:7.1f} "
+              f"| bulk {bulk_us:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark nạp bản án mới: load lại + train lại toàn bộ so với append_data + update
+
+Dữ liệu được tách thành phần gốc (ghi ra CSV trong thư mục tạm) và phần
+mới (--append-fraction cuối case_data cùng các trích dẫn của chúng), phần
+mới được nạp thành --batches lô qua DataLoader.append_data() rồi
+LawClassifier.update(). Kiểm tra bảng, chỉ mục, thống kê sau khi nạp trùng
+với load toàn bộ, các mảng đếm Naive Bayes bằng đúng số đếm cộng thêm của
+các lô mới, và load lại sau khi gộp segment vẫn cho cùng dữ liệu.
+
+Cách chạy:
+    python benchmarks/bench_ingest.py --data-dir data_export
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from bench_utils import quiet
+
+from data_loader import DataLoader
+from models.law_classifier import LawClassifier
+
+
+def split_data(data_dir: str, target_dir: str, fraction: float, batches: int):
+    """Ghi phần gốc ra target_dir, trả về các lô (cases, case_laws) mới"""
+    cases = pd.read_csv(os.path.join(data_dir, "case_data.csv"), encoding='utf-8-sig')
+    links = pd.read_csv(os.path.join(data_dir, "case_law_data.csv"), encoding='utf-8-sig')
+    n_base = int(len(cases) * (1 - fraction))
+    base = links['case_id'].isin(cases['id'].iloc[:n_base])
+    cases.iloc[:n_base].to_csv(os.path.join(target_dir, "case_data.csv"), index=False, encoding='utf-8-sig')
+    links[base].to_csv(os.path.join(target_dir, "case_law_data.csv"), index=False, encoding='utf-8-sig')
+    shutil.copy(os.path.join(data_dir, "law_data.csv"), os.path.join(target_dir, "law_data.csv"))
+    new_cases, new_links = cases.iloc[n_base:], links[~base]
+    bounds = np.linspace(0, len(new_cases), batches + 1).astype(int)
+    chunks = [new_cases.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+    return [(chunk, new_links[new_links['case_id'].isin(chunk['id'])]) for chunk in chunks]
+
+
+def assert_same_data(loader: DataLoader, reference: DataLoader):
+    for table in ('case_data', 'case_law_data'):
+        actual, expected = (getattr(item, table).sort_values('id').reset_index(drop=True)
+                            for item in (loader, reference))
+        pd.testing.assert_frame_equal(actual, expected, check_categorical=False)
+
+
+def naive_bayes_counts(model: LawClassifier) -> dict:
+    """Điều luật → (số mẫu, dòng feature_count) của mô hình"""
+    classifier = model.classifier
+    return {label: (classifier.class_count_[i], np.array(classifier.feature_count_[i]))
+            for i, label in enumerate(model.label_encoder.classes_)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--append-fraction', type=float, default=0.1)
+    parser.add_argument('--batches', type=int, default=4)
+    parser.add_argument('--sample-cases', type=int, default=200)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_ingest_')
+    try:
+        batches = split_data(args.data_dir, work_dir, args.append_fraction, args.batches)
+
+        reference = DataLoader(args.data_dir, use_cache=False)
+        started = time.perf_counter()
+        with quiet():
+            reference.load_all_data()
+            reference.get_statistics()
+            LawClassifier().train(reference)
+        full_seconds = time.perf_counter() - started
+
+        loader = DataLoader(work_dir, use_cache=False)
+        model = LawClassifier()
+        with quiet():
+            loader.load_all_data()
+            loader.get_statistics()
+            model.train(loader)
+        before = naive_bayes_counts(model)
+
+        timings, reports, new_rows = [], [], []
+        for cases, case_laws in batches:
+            started = time.perf_counter()
+            with quiet():
+                result = loader.append_data(cases, case_laws)
+                reports.append(model.update(loader, result['case_law_rows'], refresh_vocabulary=False))
+            timings.append(time.perf_counter() - started)
+            new_rows.append(result['case_law_rows'])
+
+        print("📥 NẠP BẢN ÁN MỚI")
+        print("=" * 70)
+        print(f"  - {len(reference.case_data):,} bản án, nạp thêm {sum(len(c) for c, _ in batches):,} "
+              f"bản án / {sum(len(l) for _, l in batches):,} trích dẫn trong {len(batches)} lô")
+        print(f"  - load lại + thống kê + train lại toàn bộ : {full_seconds:8.2f} s")
+        print(f"  - append_data + update (mỗi lô)         : {np.median(timings) * 1000:8.1f} ms "
+              f"(tổng {sum(timings):.2f} s)")
+        for i, report in enumerate(reports, 1):
+            print(f"      lô {i}: {report['samples']:,} mẫu, {report['new_labels']} điều luật mới, "
+                  f"accuracy trước khi cập nhật {report['accuracy']:.4f}")
+
+        assert_same_data(loader, reference)
+        rng = np.random.default_rng(42)
+        for case_id in rng.choice(reference.case_data['id'].to_numpy(), args.sample_cases):
+            assert str(loader.get_case_with_laws(int(case_id))) == str(reference.get_case_with_laws(int(case_id)))
+        assert loader.get_law_statistics() == reference.get_law_statistics()
+        assert loader.get_case_statistics() == reference.get_case_statistics()
+
+        # update() cộng đúng số đếm của các mẫu mới (vector hóa bằng cùng từ vựng)
+        links = loader.case_law_data.iloc[np.concatenate(new_rows)].dropna(subset=['article'])
+        texts = loader.get_case_texts('text', loader.case_index.positions(links['case_id'].to_numpy()))
+        X = model.vectorizer.transform(texts.fillna(''))
+        codes = model.label_encoder.transform(links['article'].astype(str))
+        onehot = sparse.csr_matrix((np.ones(len(codes)), (codes, np.arange(len(codes)))),
+                                   shape=(len(model.label_encoder.classes_), len(codes)))
+        added = np.asarray((onehot @ X).todense())
+        after = naive_bayes_counts(model)
+        for label, (class_count, feature_count) in after.items():
+            code = np.searchsorted(model.label_encoder.classes_, label)
+            old_count, old_features = before.get(label, (0.0, 0.0))
+            assert np.isclose(class_count, old_count + onehot[code].sum())
+            assert np.allclose(feature_count, old_features + added[code])
+
+        with quiet():
+            loader.compact_segments()
+            reloaded = DataLoader(work_dir, use_cache=False)
+            reloaded.load_all_data()
+        assert_same_data(reloaded, reference)
+        print(f"  - load lại sau khi gộp {len(batches)} segment trùng khớp load toàn bộ ✅")
+        print("  - bảng, chỉ mục, thống kê và số đếm Naive Bayes trùng khớp ✅")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
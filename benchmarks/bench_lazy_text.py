@@ -0,0 +1,67 @@
+"""
+Benchmark bộ nhớ cho workload thống kê: load đầy đủ so với lazy_text
+
+Mỗi chế độ chạy trong một tiến trình con riêng để đo peak RSS độc lập.
+
+Cách chạy:
+    python benchmarks/bench_lazy_text.py --data-dir data_export
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+
+from bench_utils import quiet
+
+from data_loader import DataLoader
+
+
+def run_workload(data_dir: str, lazy_text: bool) -> dict:
+    """Load dữ liệu và chạy các hàm thống kê, trả về số liệu bộ nhớ"""
+    with quiet():
+        loader = DataLoader(data_dir, lazy_text=lazy_text)
+        loader.load_all_data()
+        loader.get_case_statistics()
+        loader.get_law_statistics()
+
+    return {
+        'case_data_bytes': int(loader.case_data.memory_usage(deep=True).sum()),
+        # ru_maxrss tính theo KB trên Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--child', choices=['full', 'lazy'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_workload(args.data_dir, args.child == 'lazy')))
+        return
+
+    # Tạo sẵn text store để lần đo lazy không tính chi phí build
+    with quiet():
+        DataLoader(args.data_dir, lazy_text=True).load_all_data()
+
+    results = {}
+    for mode in ('full', 'lazy'):
+        output = subprocess.check_output(
+            [sys.executable, __file__, '--data-dir', args.data_dir, '--child', mode]
+        )
+        results[mode] = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+    print("💾 BỘ NHỚ WORKLOAD THỐNG KÊ")
+    print("=" * 50)
+    for mode, stats in results.items():
+        print(f"  - {mode:5s}: case_data {stats['case_data_bytes'] / 2**20:8.1f} MB, "
+              f"peak RSS {stats['peak_rss_mb']:8.1f} MB")
+    ratio = results['full']['case_data_bytes'] / max(results['lazy']['case_data_bytes'], 1)
+    print(f"  - case_data nhỏ hơn {ratio:.1f}x ở chế độ lazy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark và kiểm tra tương đương: LinearScorer so với LawClassifier (sklearn)
+
+Đo thời gian khởi động lạnh (import + load + một lần dự đoán, trong tiến
+trình con), độ trễ mỗi bản án của predict(), và kiểm tra hai đường cho
+cùng xác suất/top-k. Trước đó luôn chạy một lần kiểm tra tương đương tự
+chứa: train một mô hình nhỏ trên dữ liệu tổng hợp (synthetic_corpus), không
+cần data_export hay mô hình đã lưu.
+
+Cách chạy:
+    python benchmarks/bench_linear_scorer.py --model models/law_classifier \\
+        --linear models/law_classifier_linear --data-dir data_export
+    python benchmarks/bench_linear_scorer.py --synthetic-only
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unicodedata
+import warnings
+
+import numpy as np
+
+from bench_utils import SRC_DIR, quiet
+from synthetic_corpus import generate_corpus
+
+from data_loader import DataLoader
+from models.law_classifier import LawClassifier
+from models.linear_scorer import LinearScorer
+
+COLD_START = {
+    'sklearn': (
+        "from models.law_classifier import LawClassifier\n"
+        "c = LawClassifier(); c.load_model({path!r}); c.predict('bị cáo trộm cắp tài sản')"
+    ),
+    'linear': (
+        "from models.linear_scorer import LinearScorer\n"
+        "s = LinearScorer({path!r}); s.predict('bị cáo trộm cắp tài sản')"
+    ),
+}
+
+
+def cold_start(kind: str, path: str) -> float:
+    """Thời gian chạy một tiến trình Python mới chỉ để trả lời một truy vấn"""
+    code = f"import sys; sys.path.append({SRC_DIR!r})\n" + COLD_START[kind].format(path=path)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def check_parity(classifier: LawClassifier, scorer: LinearScorer, texts, top_k: int = 5) -> float:
+    """Kiểm tra xác suất và top-k của hai đường khớp nhau, trả về sai số lớn nhất"""
+    # LinearScorer chỉ có các lớp classifier đã thấy khi fit
+    expected = classifier.predict_scores(classifier.vectorizer.transform(texts))
+    expected = expected[:, classifier.classifier.classes_]
+    actual = scorer.predict_scores(texts)
+    max_error = float(np.abs(expected - actual).max())
+    assert max_error < 1e-4, f"Sai khác xác suất quá lớn: {max_error}"
+
+    expected_top = classifier.predict_topk(texts, top_k=top_k)
+    actual_top = scorer.predict_topk(texts, top_k=top_k)
+    # So sánh theo tập nhãn top-k để bỏ qua khác biệt thứ tự khi điểm bằng nhau
+    for doc in range(len(texts)):
+        rows = expected_top['doc_index'] == doc
+        assert set(expected_top['article'][rows]) == set(actual_top['article'][rows]), \
+            f"Top-{top_k} khác nhau ở bản án {doc}"
+    return max_error
+
+
+def check_synthetic_parity(num_cases: int = 600) -> float:
+    """
+    Kiểm tra tương đương trên mô hình train từ bộ dữ liệu tổng hợp nhỏ
+
+    Ngoài văn bản bản án còn thử các đầu vào dễ lệch giữa hai bộ tách từ:
+    chuỗi rỗng, chữ hoa, dạng Unicode tổ hợp (NFD), dấu câu và từ ngoài từ vựng.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        data_dir = os.path.join(directory, 'data')
+        with quiet():
+            generate_corpus(data_dir, num_cases, num_laws=60, text_chars=800)
+            loader = DataLoader(data_dir)
+            loader.load_all_data()
+            classifier = LawClassifier()
+            classifier.train(loader)
+            classifier.export_linear(os.path.join(directory, 'linear'))
+        scorer = LinearScorer(os.path.join(directory, 'linear'), mmap=False)
+
+        texts = list(loader.get_case_texts('text', list(range(100))))
+        texts += ['', 'BỊ CÁO TRỘM CẮP TÀI SẢN', unicodedata.normalize('NFD', texts[0]),
+                  'Điều 173, khoản 1; điểm b) - "trộm cắp"!', 'xyzzy qwerty 12345 ab']
+        return check_parity(classifier, scorer, texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default='models/law_classifier')
+    parser.add_argument('--linear', default='models/law_classifier_linear')
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--docs', type=int, default=200)
+    parser.add_argument('--synthetic-only', action='store_true',
+                        help='Chỉ chạy kiểm tra tương đương trên dữ liệu tổng hợp')
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    max_error = check_synthetic_parity()
+    print(f"✅ Tương đương trên dữ liệu tổng hợp: sai số xác suất lớn nhất {max_error:.2e}")
+    if args.synthetic_only:
+        return
+
+    with quiet():
+        loader = DataLoader(args.data_dir)
+        loader.load_all_data()
+        classifier = LawClassifier()
+        classifier.load_model(args.model)
+        classifier.export_linear(args.linear)
+    scorer = LinearScorer(args.linear)
+
+    texts = loader.get_case_texts('text', list(range(min(args.docs, len(loader.case_data)))))
+    texts = [text if isinstance(text, str) else '' for text in texts]
+
+    max_error = check_parity(classifier, scorer, texts)
+    print(f"✅ Tương đương với sklearn trên {args.data_dir}: sai số xác suất lớn nhất {max_error:.2e}")
+
+    print("\n⏱️  KHỞI ĐỘNG LẠNH (giây)")
+    print("=" * 50)
+    print(f"  - sklearn + pickle: {cold_start('sklearn', args.model):.3f}s")
+    print(f"  - LinearScorer:     {cold_start('linear', args.linear):.3f}s")
+
+    print("\n⏱️  ĐỘ TRỄ predict() MỖI BẢN ÁN (ms)")
+    print("=" * 50)
+    for name, predictor in (('sklearn', classifier), ('linear', scorer)):
+        start = time.perf_counter()
+        with quiet():
+            for text in texts:
+                predictor.predict(text)
+        print(f"  - {name:8s}: {(time.perf_counter() - start) / len(texts) * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
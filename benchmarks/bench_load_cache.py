@@ -0,0 +1,46 @@
+"""
+Benchmark load dữ liệu: CSV gốc (cold) so với cache nhị phân (warm)
+
+Cách chạy:
+    python benchmarks/bench_load_cache.py --data-dir data_export --repeat 3
+"""
+
+import argparse
+
+from bench_utils import quiet, summarize, time_call
+
+from data_loader import DataLoader
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    plain = DataLoader(args.data_dir)
+    cached = DataLoader(args.data_dir, use_cache=True)
+
+    def cold_load():
+        cached.clear_cache()
+        cached.load_all_data()
+
+    with quiet():
+        csv_times = time_call(plain.load_all_data, args.repeat)
+        cold_times = time_call(cold_load, args.repeat)
+        warm_times = time_call(cached.load_all_data, args.repeat)
+
+    csv_stats = summarize(csv_times)
+    cold_stats = summarize(cold_times)
+    warm_stats = summarize(warm_times)
+
+    print("⏱️  LOAD DỮ LIỆU (median, giây)")
+    print("=" * 50)
+    print(f"  - CSV (không cache):       {csv_stats['median']:.3f}s")
+    print(f"  - Cold (CSV + ghi cache):  {cold_stats['median']:.3f}s")
+    print(f"  - Warm (đọc cache):        {warm_stats['median']:.3f}s")
+    print(f"  - Tăng tốc warm so với CSV: {csv_stats['median'] / warm_stats['median']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
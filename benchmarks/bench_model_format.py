@@ -0,0 +1,78 @@
+"""
+Benchmark định dạng lưu mô hình: pickle cũ so với thư mục mảng có phiên bản
+
+So sánh kích thước trên đĩa, thời gian load và RSS tăng thêm khi load (mỗi
+lần đo RSS chạy trong một tiến trình con riêng).
+
+Cách chạy:
+    python benchmarks/bench_model_format.py --data-dir data_export --out-dir models/bench
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from bench_utils import current_rss_mb, quiet, summarize, time_call
+
+from data_loader import DataLoader
+from models.law_classifier import LawClassifier
+
+
+def disk_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def load_rss_mb(path: str, mmap: bool) -> float:
+    """RSS (MB) tăng thêm khi load mô hình trong một tiến trình mới"""
+    output = subprocess.check_output(
+        [sys.executable, __file__, '--child', path] + (['--mmap'] if mmap else [])
+    )
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])['rss_delta_mb']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--out-dir', default='models/bench')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--mmap', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        before = current_rss_mb()
+        with quiet():
+            LawClassifier().load_model(args.child, mmap=args.mmap)
+        print(json.dumps({'rss_delta_mb': current_rss_mb() - before}))
+        return
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    pickle_path = os.path.join(args.out_dir, 'law_classifier.pkl')
+    dir_path = os.path.join(args.out_dir, 'law_classifier')
+
+    with quiet():
+        loader = DataLoader(args.data_dir)
+        loader.load_all_data()
+        classifier = LawClassifier()
+        classifier.train(loader)
+        classifier.save_model(pickle_path)
+        classifier.save_model(dir_path)
+
+    print("💾 ĐỊNH DẠNG LƯU MÔ HÌNH")
+    print("=" * 60)
+    for name, path, mmap in (('pickle', pickle_path, False),
+                             ('thư mục', dir_path, False),
+                             ('thư mục + mmap', dir_path, True)):
+        with quiet():
+            load_time = summarize(time_call(
+                lambda: LawClassifier().load_model(path, mmap=mmap), args.repeat))['median']
+        print(f"  - {name:15s}: {disk_size(path) / 2**20:7.2f} MB | load {load_time * 1000:8.1f} ms "
+              f"| RSS +{load_rss_mb(path, mmap):6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
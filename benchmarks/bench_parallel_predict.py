@@ -0,0 +1,70 @@
+"""
+Benchmark dự đoán theo lô song song: throughput và bộ nhớ theo số worker
+
+Với mỗi số worker, chấm điểm toàn bộ bản án bằng ParallelPredictor và đo
+throughput cùng tổng PSS của các worker (trang mmap dùng chung chỉ được
+tính một lần). Kết quả được kiểm tra khớp với predict_topk một tiến trình.
+
+Cách chạy:
+    python benchmarks/bench_parallel_predict.py --model models/law_classifier \\
+        --data-dir data_export --workers 1 2 4
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from bench_utils import current_rss_mb, process_pss_mb, quiet
+
+from data_loader import DataLoader
+from models.parallel_predict import ParallelPredictor
+from models.predictor import load_predictor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default='models/law_classifier',
+                        help='Thư mục mô hình hoặc artifact tuyến tính')
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--docs', type=int, default=20000)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--start-method', default=None)
+    args = parser.parse_args()
+
+    with quiet():
+        loader = DataLoader(args.data_dir)
+        loader.load_all_data()
+    rows = np.arange(args.docs) % len(loader.case_data)
+    texts = [text if isinstance(text, str) else '' for text in loader.get_case_texts('text', rows)]
+
+    before = current_rss_mb()
+    predictor = load_predictor(args.model, quiet=True)
+    model_mb = current_rss_mb() - before
+
+    started = time.perf_counter()
+    expected = predictor.predict_topk(texts, top_k=args.top_k)
+    single = len(texts) / (time.perf_counter() - started)
+
+    print(f"⏱️  DỰ ĐOÁN SONG SONG ({len(texts):,} bản án, {os.cpu_count()} CPU)")
+    print("=" * 70)
+    print(f"  - 1 tiến trình       : {single:9.1f} bản án/giây | mô hình +{model_mb:.1f} MB RSS")
+    for n_workers in args.workers:
+        with ParallelPredictor(args.model, n_workers, args.start_method) as pool:
+            # Một lượt nhỏ để các worker load xong mô hình trước khi đo
+            pool.predict_topk(texts[:n_workers], top_k=args.top_k, chunk_size=1)
+            started = time.perf_counter()
+            actual = pool.predict_topk(texts, top_k=args.top_k)
+            elapsed = time.perf_counter() - started
+            pss = sum(process_pss_mb(pid) for pid in pool.worker_pids())
+
+        assert np.array_equal(expected['article'], actual['article']), "Kết quả khác predict_topk"
+        rate = len(texts) / elapsed
+        print(f"  - {n_workers:2d} worker          : {rate:9.1f} bản án/giây (x{rate / single:.2f}) "
+              f"| tổng PSS worker {pss:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Benchmark toàn bộ pipeline load → train → predict trên dữ liệu tổng hợp nhiều quy mô
+
+Với mỗi quy mô (--scales, mặc định 10k, 100k và 1M bản án), sinh bộ dữ liệu
+tổng hợp theo schema data_export (synthetic_corpus.py, dùng lại nếu đã có
+trong --corpus-dir) rồi đo trong một tiến trình riêng để RSS của các quy mô
+không lẫn vào nhau:
+
+    load_all_data        - thời gian load 3 bảng CSV
+    get_case_with_laws   - p50/p99 tra một bản án, thời gian join toàn bộ
+    search_cases         - p50/p99 quét regex và truy vấn chỉ mục ngược
+    train                - thời gian huấn luyện LawClassifier
+    predict              - p50/p99 dự đoán từng bản án
+    predict_batch        - thông lượng dự đoán theo lô, tỷ lệ top-k trúng điều luật thật
+
+Mỗi bước ghi kèm RSS lớn nhất (PeakMemory). Kết quả ghi ra JSON kèm commit
+git và phiên bản thư viện; --baseline so sánh với một file kết quả trước đó và
+trả mã lỗi 1 nếu có chỉ số chậm/tốn bộ nhớ hơn quá --tolerance.
+
+Cách chạy:
+    python benchmarks/bench_pipeline.py --scales 10000 100000 --corpus-dir /tmp/corpus
+    python benchmarks/bench_pipeline.py --scales 10000 --baseline benchmarks/results/pipeline-abc1234.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+from bench_utils import ROOT_DIR, PeakMemory, quiet, time_call
+from synthetic_corpus import NUM_LAWS, TEXT_CHARS, load_or_generate
+
+from data_loader import DataLoader
+from models.law_classifier import LawClassifier
+
+SCALES = [10000, 100000, 1000000]
+# Truy vấn chỉ mục ngược: từ phổ biến, từ hiếm, AND, OR và cụm từ. Mọi truy vấn
+# đều có kết quả trên synthetic_corpus (cụm từ lấy từ câu trích dẫn "căn cứ Điều ...")
+INDEX_QUERIES = ['bị cáo', 'ma túy', 'chiếm đoạt AND tài sản', 'trộm OR lừa', '"tố tụng hình sự"',
+                 '"căn cứ điều"', 'kháng cáo AND hiệu lực', 'tàng trữ OR vận chuyển']
+SCAN_QUERIES = ['trộm cắp', 'lừa đảo', 'ma túy', 'thương tích']
+
+
+def percentiles_ms(timings: List[float]) -> Dict[str, float]:
+    p50, p99 = np.percentile(timings, [50, 99]) * 1000
+    return {'p50_ms': float(p50), 'p99_ms': float(p99)}
+
+
+def measure(metrics: Dict, name: str, func):
+    """Chạy func một lần, ghi thời gian và RSS lớn nhất vào metrics, trả về kết quả của func"""
+    with PeakMemory() as memory:
+        started = time.perf_counter()
+        result = func()
+        metrics[f'{name}_seconds'] = time.perf_counter() - started
+    metrics[f'{name}_peak_mb'] = memory.peak_mb
+    return result
+
+
+def record_latency(metrics: Dict, name: str, func, inputs):
+    """p50/p99 (ms) của func trên từng phần tử inputs"""
+    timings = []
+    with PeakMemory() as memory:
+        for value in inputs:
+            timings.extend(time_call(lambda: func(value)))
+    metrics.update({f'{name}_{key}': value for key, value in percentiles_ms(timings).items()})
+    metrics[f'{name}_peak_mb'] = memory.peak_mb
+
+
+def run_scale(data_dir: str, options: Dict) -> Dict:
+    """Đo toàn bộ pipeline trên một bộ dữ liệu (chạy trong tiến trình riêng)"""
+    warnings.filterwarnings('ignore')
+    rng = np.random.default_rng(options['seed'])
+    metrics = {}
+
+    loader = DataLoader(data_dir, lazy_text=options['lazy_text'])
+    with quiet():
+        measure(metrics, 'load_all_data', loader.load_all_data)
+        case_ids = loader.case_data['id'].to_numpy()
+        lookups = rng.choice(case_ids, min(options['lookups'], len(case_ids))).tolist()
+        record_latency(metrics, 'get_case_with_laws', lambda case_id: loader.get_case_with_laws(case_id),
+                       lookups)
+        measure(metrics, 'get_case_with_laws_all', loader.get_case_with_laws)
+
+        record_latency(metrics, 'search_cases_scan', lambda keyword: loader.search_cases(keyword),
+                       SCAN_QUERIES[:options['scan_queries']])
+        measure(metrics, 'search_index_build', lambda: loader.get_search_index('text'))
+        record_latency(metrics, 'search_cases_index', lambda query: loader.search_cases(
+            query, use_index=True, page_size=20), INDEX_QUERIES * 5)
+        # Truy vấn không có kết quả chỉ đo được đường thoát sớm
+        metrics['search_cases_index_empty'] = sum(
+            len(loader.search_cases(query, use_index=True, page_size=1)) == 0 for query in INDEX_QUERIES)
+
+        model = LawClassifier(model_type=options['model_type'])
+        measure(metrics, 'train', lambda: model.train(loader))
+
+        rows = np.sort(rng.choice(len(case_ids), min(options['batch_size'], len(case_ids)), replace=False))
+        texts = list(loader.get_case_texts('text', rows))
+        record_latency(metrics, 'predict', lambda text: model.predict(text), texts[:options['predictions']])
+        predictions = measure(metrics, 'predict_batch', lambda: model.predict_batch(texts, top_k=3))
+    metrics['predict_batch_docs_per_second'] = len(texts) / metrics['predict_batch_seconds']
+
+    # Tỷ lệ bản án có ít nhất một điều luật được trích dẫn nằm trong top-3 dự đoán
+    links = loader.case_law_data.dropna(subset=['article'])
+    cited = links.groupby('case_id')['article'].agg(lambda articles: set(articles.astype(int).astype(str)))
+    hits = [bool({p['article'] for p in prediction} & cited.get(int(case_ids[row]), set()))
+            for row, prediction in zip(rows, predictions) if int(case_ids[row]) in cited.index]
+    metrics['predict_batch_top3_hit_rate'] = float(np.mean(hits)) if hits else 0.0
+    metrics['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return metrics
+
+
+def environment() -> Dict:
+    """Phiên bản mã nguồn và môi trường chạy benchmark"""
+    import pandas
+    import sklearn
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = 'unknown'
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def lower_is_better(metric: str) -> bool:
+    return not metric.endswith(('_per_second', '_hit_rate'))
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Các chỉ số kém hơn baseline quá tolerance (tỷ lệ tương đối)"""
+    regressions = []
+    for scale, current in results['scales'].items():
+        previous = baseline.get('scales', {}).get(scale, {}).get('metrics', {})
+        for metric, value in current.get('metrics', {}).items():
+            old = previous.get(metric)
+            if not old:
+                continue
+            ratio = value / old
+            worse = ratio > 1 + tolerance if lower_is_better(metric) else ratio < 1 - tolerance
+            if worse:
+                regressions.append(f"{int(scale):,} bản án - {metric}: {old:.4g} → {value:.4g} ({ratio:.2f}x)")
+    return regressions
+
+
+def print_scale(scale: int, entry: Dict):
+    metrics = entry['metrics']
+    corpus = entry['corpus']
+    print(f"\n📦 {scale:,} bản án ({corpus['case_laws']:,} trích dẫn, {corpus['disk_mb']:.0f} MB CSV, "
+          f"văn bản trung bình {corpus['mean_text_chars']:.0f} ký tự)")
+    print(f"  - load_all_data                 : {metrics['load_all_data_seconds']:9.2f} s   "
+          f"| RSS {metrics['load_all_data_peak_mb']:8.0f} MB")
+    for name in ('get_case_with_laws', 'search_cases_scan', 'search_cases_index', 'predict'):
+        print(f"  - {name:30s}: p50 {metrics[f'{name}_p50_ms']:9.2f} ms | p99 {metrics[f'{name}_p99_ms']:9.2f} ms")
+    print(f"  - get_case_with_laws (toàn bộ)  : {metrics['get_case_with_laws_all_seconds']:9.2f} s")
+    print(f"  - dựng chỉ mục tìm kiếm         : {metrics['search_index_build_seconds']:9.2f} s")
+    if metrics.get('search_cases_index_empty'):
+        print(f"  ⚠️ {metrics['search_cases_index_empty']} truy vấn chỉ mục không có kết quả")
+    print(f"  - train                         : {metrics['train_seconds']:9.2f} s   "
+          f"| RSS {metrics['train_peak_mb']:8.0f} MB")
+    print(f"  - predict_batch                 : {metrics['predict_batch_docs_per_second']:9.0f} bản án/s "
+          f"| top-3 trúng {metrics['predict_batch_top3_hit_rate']:.3f}")
+    print(f"  - RSS lớn nhất                  : {metrics['peak_rss_mb']:9.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES)
+    parser.add_argument('--corpus-dir', default=None,
+                        help='Thư mục giữ các bộ dữ liệu tổng hợp để dùng lại, mặc định thư mục tạm')
+    parser.add_argument('--laws', type=int, default=NUM_LAWS)
+    parser.add_argument('--text-chars', type=int, default=TEXT_CHARS)
+    parser.add_argument('--model-type', default='naive_bayes')
+    parser.add_argument('--lazy-text', action='store_true')
+    parser.add_argument('--lookups', type=int, default=1000)
+    parser.add_argument('--scan-queries', type=int, default=len(SCAN_QUERIES))
+    parser.add_argument('--predictions', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None,
+                        help='File JSON kết quả, mặc định benchmarks/results/pipeline-<commit>.json')
+    parser.add_argument('--baseline', default=None, help='File JSON kết quả trước đó để so sánh')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    options = {key: getattr(args, key) for key in ('model_type', 'lazy_text', 'lookups', 'scan_queries',
+                                                   'predictions', 'batch_size', 'seed')}
+    results = {'environment': environment(),
+               'parameters': dict(options, laws=args.laws, text_chars=args.text_chars),
+               'scales': {}}
+    corpus_root = args.corpus_dir or tempfile.mkdtemp(prefix='bench_pipeline_')
+    print("🏁 BENCHMARK PIPELINE LOAD → TRAIN → PREDICT")
+    print("=" * 70)
+    try:
+        for scale in args.scales:
+            data_dir = os.path.join(corpus_root, f'cases_{scale}')
+            corpus = load_or_generate(data_dir, scale, args.laws, args.text_chars, args.seed)
+            # Mỗi quy mô chạy trong một tiến trình mới: RSS lớn nhất không cộng dồn giữa các quy mô,
+            # tiến trình bị OOM killer dừng được báo lỗi (BrokenProcessPool) thay vì treo
+            with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                try:
+                    metrics = executor.submit(run_scale, data_dir, options).result()
+                except (MemoryError, OSError, BrokenProcessPool) as e:
+                    message = str(e) or type(e).__name__
+                    print(f"\n❌ {scale:,} bản án: {message}")
+                    results['scales'][str(scale)] = {'corpus': corpus, 'error': message}
+                    continue
+            results['scales'][str(scale)] = {'corpus': corpus, 'metrics': metrics}
+            print_scale(scale, results['scales'][str(scale)])
+            if not args.corpus_dir:
+                shutil.rmtree(data_dir, ignore_errors=True)
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_root, ignore_errors=True)
+
+    output = args.output or os.path.join(ROOT_DIR, 'benchmarks', 'results',
+                                         f"pipeline-{results['environment']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Đã ghi kết quả vào {output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('parameters') != results['parameters']:
+            print("⚠️ Tham số benchmark khác với baseline, các chỉ số có thể không so sánh được")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"⚠️ {len(regressions)} chỉ số kém hơn baseline quá {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"✅ Không có chỉ số nào kém hơn baseline quá {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Sinh tải cho server dự đoán: micro-batching so với predict() từng bản án
+
+Khởi động src/serving/prediction_server.py trong một tiến trình con (hoặc
+dùng server có sẵn qua --port), mở nhiều kết nối keep-alive đồng thời gửi
+POST /predict, rồi so sánh throughput với vòng lặp predict() tuần tự trên
+cùng các bản án trong một tiến trình.
+
+Cách chạy:
+    python benchmarks/bench_prediction_server.py --model models/law_classifier \\
+        --data-dir data_export --concurrency 64 --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from bench_utils import SRC_DIR, quiet
+
+from data_loader import DataLoader
+from models.predictor import load_predictor
+
+SERVER_SCRIPT = os.path.join(SRC_DIR, 'serving', 'prediction_server.py')
+
+
+async def http_request(reader, writer, method: str, path: str,
+                       payload: Dict = None) -> Tuple[int, Dict]:
+    """Gửi một request HTTP/1.1 trên kết nối keep-alive"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+    await writer.drain()
+
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    status = int(head[0].split(' ')[1])
+    length = next(int(line.split(':', 1)[1]) for line in head
+                  if line.lower().startswith('content-length:'))
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def run_load(port: int, texts: List[str], concurrency: int, top_k: int) -> Dict:
+    """Gửi toàn bộ texts qua `concurrency` kết nối đồng thời"""
+    next_item = iter(range(len(texts)))
+    latencies: List[float] = []
+    rejected = 0
+
+    async def client():
+        nonlocal rejected
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for i in next_item:
+            started = time.perf_counter()
+            status, _ = await http_request(reader, writer, 'POST', '/predict',
+                                           {'text': texts[i], 'top_k': top_k})
+            if status == 503:
+                rejected += 1
+            else:
+                assert status == 200, f"Server trả về {status}"
+                latencies.append(time.perf_counter() - started)
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    _, stats = await http_request(reader, writer, 'GET', '/stats')
+    writer.close()
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return {'elapsed': elapsed, 'rps': len(latencies) / elapsed, 'p50': p50, 'p99': p99,
+            'rejected': rejected, 'server': stats}
+
+
+def wait_for_server(process: subprocess.Popen) -> int:
+    """Đọc stdout của server tới khi in ra địa chỉ, trả về port"""
+    for line in process.stdout:
+        if 'http://' in line:
+            return int(line.split('http://', 1)[1].split()[0].rsplit(':', 1)[1])
+    raise RuntimeError("Server dừng trước khi sẵn sàng")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default='models/law_classifier')
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--port', type=int, default=None, help='Dùng server đang chạy ở port này')
+    args = parser.parse_args()
+
+    with quiet():
+        loader = DataLoader(args.data_dir)
+        loader.load_all_data()
+    rows = np.arange(args.requests) % len(loader.case_data)
+    texts = [text if isinstance(text, str) else '' for text in loader.get_case_texts('text', rows)]
+
+    print("⏱️  SERVER DỰ ĐOÁN")
+    print("=" * 60)
+
+    # Đường cơ sở: mỗi bản án một lần predict() trong cùng tiến trình
+    with quiet():
+        predictor = load_predictor(args.model)
+        started = time.perf_counter()
+        for text in texts:
+            predictor.predict(text, top_k=args.top_k)
+    baseline = len(texts) / (time.perf_counter() - started)
+    print(f"  - predict() tuần tự      : {baseline:9.1f} bản án/giây")
+
+    process = None
+    port = args.port
+    if port is None:
+        process = subprocess.Popen([sys.executable, SERVER_SCRIPT, '--model', args.model, '--port', '0'],
+                                   stdout=subprocess.PIPE, text=True)
+        port = wait_for_server(process)
+
+    try:
+        for concurrency in sorted({1, args.concurrency}):
+            result = asyncio.run(run_load(port, texts, concurrency, args.top_k))
+            print(f"  - server, {concurrency:3d} kết nối   : {result['rps']:9.1f} bản án/giây "
+                  f"(x{result['rps'] / baseline:.1f}) | p50 {result['p50']:.1f} ms "
+                  f"| p99 {result['p99']:.1f} ms | 503: {result['rejected']}")
+        server = result['server']
+        print(f"\n📊 /stats: {server['requests']:,} request, {server['batches']:,} batch, "
+              f"batch trung bình {server['avg_batch_size']:.1f}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark schema kiểu dữ liệu: pandas tự suy kiểu so với schema khai báo
+
+So sánh bộ nhớ từng bảng (memory_usage deep), thời gian load_all_data và
+thời gian value_counts/groupby trên các cột category/Int32 so với các cột
+object/int64 khi để pandas tự suy kiểu.
+
+Cách chạy:
+    python benchmarks/bench_schema.py --data-dir data_export
+"""
+
+import argparse
+
+from bench_utils import quiet, summarize, time_call
+
+from data_loader import DataLoader
+
+# (bảng, mô tả, thao tác) đo trên cả hai cách load
+OPERATIONS = [
+    ('case', "court_name.value_counts()", lambda df: df['court_name'].value_counts()),
+    ('case', "groupby(court_name, case_level)", lambda df: df.groupby(['court_name', 'case_level'],
+                                                                     observed=True).size()),
+    ('case_law', "type.value_counts()", lambda df: df['type'].value_counts()),
+    ('case_law', "groupby(law_id, type)", lambda df: df.groupby(['law_id', 'type'], observed=True).size()),
+    ('case_law', "groupby(case_id).law_id.nunique()", lambda df: df.groupby('case_id')['law_id'].nunique()),
+]
+
+
+def load(data_dir: str, use_schema: bool, repeat: int):
+    loader = DataLoader(data_dir, use_schema=use_schema)
+    with quiet():
+        seconds = summarize(time_call(loader.load_all_data, repeat))['median']
+    return loader, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    inferred, inferred_load = load(args.data_dir, False, max(1, args.repeat // 2))
+    typed, typed_load = load(args.data_dir, True, max(1, args.repeat // 2))
+    tables = {'case': 'case_data', 'law': 'law_data', 'case_law': 'case_law_data'}
+
+    print("🧮 SCHEMA KIỂU DỮ LIỆU")
+    print("=" * 70)
+    before = inferred.get_memory_report().set_index(['table', 'column'])
+    report = typed.get_memory_report().set_index(['table', 'column'])
+    report['bytes_inferred'] = before['bytes']
+    report['dtype_inferred'] = before['dtype']
+    for table in tables:
+        rows = report.loc[table]
+        changed = rows[rows['dtype'] != rows['dtype_inferred']].drop(index='*', errors='ignore')
+        total = rows.loc['*']
+        print(f"  - {table:9s}: {total['bytes_inferred'] / 2**20:8.2f} MB → {total['bytes'] / 2**20:8.2f} MB "
+              f"({1 - total['bytes'] / total['bytes_inferred']:.0%} nhỏ hơn)")
+        for column, row in changed.iterrows():
+            print(f"      {column:14s} {row['dtype_inferred']:>14s} → {row['dtype']:14s} "
+                  f"{row['bytes_inferred'] / 2**20:7.2f} → {row['bytes'] / 2**20:6.2f} MB")
+
+    print(f"  - load_all_data: tự suy kiểu {inferred_load:.2f}s | schema {typed_load:.2f}s")
+    for table, label, operation in OPERATIONS:
+        frames = [getattr(loader, tables[table]) for loader in (inferred, typed)]
+        before_ms, after_ms = (summarize(time_call(lambda: operation(df), args.repeat))['median'] * 1000
+                               for df in frames)
+        print(f"  - {label:34s}: {before_ms:7.2f} ms → {after_ms:6.2f} ms ({before_ms / after_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
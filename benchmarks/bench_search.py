@@ -0,0 +1,47 @@
+"""
+Benchmark tìm kiếm bản án: quét regex so với chỉ mục ngược
+
+Cách chạy:
+    python benchmarks/bench_search.py --data-dir data_export
+"""
+
+import argparse
+
+from bench_utils import quiet, summarize, time_call
+
+from data_loader import DataLoader
+
+QUERIES = [
+    ('trộm cắp', '"trộm cắp"'),
+    ('ma túy', '"ma túy"'),
+    ('tài sản', '"tài sản"'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--page-size', type=int, default=20)
+    args = parser.parse_args()
+
+    with quiet():
+        loader = DataLoader(args.data_dir)
+        loader.load_all_data()
+        build_time = time_call(lambda: loader.get_search_index('text'))[0]
+
+    print("🔍 TÌM KIẾM BẢN ÁN (median, ms)")
+    print("=" * 60)
+    print(f"  Xây/load chỉ mục: {build_time:.2f}s")
+    for keyword, query in QUERIES:
+        with quiet():
+            scan = summarize(time_call(lambda: loader.search_cases(keyword), args.repeat))
+            indexed = summarize(time_call(
+                lambda: loader.search_cases(query, use_index=True, page_size=args.page_size),
+                args.repeat))
+        print(f"  {keyword:12s}: regex {scan['median'] * 1000:9.2f} | "
+              f"chỉ mục {indexed['median'] * 1000:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
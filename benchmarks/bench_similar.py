@@ -0,0 +1,107 @@
+"""
+Benchmark tìm bản án tương tự: quét toàn bộ ma trận so với chỉ mục khối chuyển vị
+
+Cách cũ (baseline) nhân cả ma trận bản án × từ với vector truy vấn rồi sắp
+xếp toàn bộ điểm. SimilarCaseIndex chỉ duyệt các dòng ứng với từ có trong
+truy vấn và lấy top-k bằng argpartition; chế độ approximate cắt bớt từ của
+truy vấn rồi chấm lại chính xác các ứng viên. Đo độ trễ p50/p99 của một
+truy vấn, thông lượng theo lô, và kiểm tra kết quả chính xác trùng baseline,
+recall@k của chế độ approximate.
+
+Cách chạy:
+    python benchmarks/bench_similar.py --data-dir data_export
+"""
+
+import argparse
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from bench_utils import quiet, time_call
+
+from data_loader import DataLoader
+from data.config import MODEL_CONFIG
+from models.similarity import SimilarCaseIndex
+
+
+def baseline(index: SimilarCaseIndex, row: int, k: int):
+    """Cách cũ: cosine với toàn bộ bản án rồi argsort"""
+    scores = (index.matrix @ index.matrix[row].T).toarray().ravel()
+    scores[row] = -np.inf
+    order = np.argsort(-scores, kind='stable')[:k]
+    return order, scores[order]
+
+
+def latency_ms(func, queries) -> dict:
+    """p50/p99 (ms) của từng truy vấn"""
+    timings = []
+    for query in queries:
+        timings.extend(time_call(lambda: func(query), 1))
+    p50, p99 = np.percentile(timings, [50, 99]) * 1000
+    return {'p50': p50, 'p99': p99}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    loader = DataLoader(args.data_dir, lazy_text=True)
+    with quiet():
+        loader.load_all_data()
+    texts = loader.get_case_texts('text')
+    vectorizer = TfidfVectorizer(**MODEL_CONFIG['tfidf'])
+    sample = np.random.default_rng(0).permutation(len(loader.case_data))[:20000]
+    vectorizer.fit(texts.take(np.sort(sample)))
+
+    index = SimilarCaseIndex(vectorizer)
+    started = time.perf_counter()
+    with quiet():
+        index.fit(loader)
+    fit_seconds = time.perf_counter() - started
+
+    rows = np.random.default_rng(42).choice(index.num_rows, min(args.queries, index.num_rows), replace=False)
+    case_ids = loader.case_data['id'].to_numpy()[rows]
+    k = args.k
+
+    print("🔎 TÌM BẢN ÁN TƯƠNG TỰ")
+    print("=" * 70)
+    print(f"  - {index.num_rows:,} bản án, {index.matrix.shape[1]:,} từ, {index.matrix.nnz:,} phần tử khác 0 "
+          f"(vector hóa {fit_seconds:.1f}s)")
+
+    exact, _ = index.rank_many(index.matrix[rows], k, exclude=rows)
+    approximate, _ = index.rank_many(index.matrix[rows], k, approximate=True, exclude=rows)
+    recall = []
+    for i, row in enumerate(rows):
+        expected_rows, expected_scores = baseline(index, row, k)
+        actual_scores = np.asarray(index.matrix[exact[i]].multiply(index.matrix[row]).sum(axis=1)).ravel()
+        assert np.allclose(np.sort(actual_scores)[::-1], expected_scores, atol=1e-5), "top-k khác baseline"
+        recall.append(len(np.intersect1d(approximate[i], expected_rows)) / k)
+
+    timings = {
+        'quét toàn bộ + argsort': latency_ms(lambda row: baseline(index, row, k), rows),
+        'find_similar_cases': latency_ms(lambda case_id: index.find_similar_cases(int(case_id), k), case_ids),
+        'find_similar_cases approximate': latency_ms(
+            lambda case_id: index.find_similar_cases(int(case_id), k, approximate=True), case_ids),
+    }
+    for label, stats in timings.items():
+        print(f"  - {label:32s}: p50 {stats['p50']:7.2f} ms | p99 {stats['p99']:7.2f} ms")
+    text_stats = latency_ms(lambda row: index.find_similar_cases(texts[int(row)], k), rows[:50])
+    print(f"  - {'find_similar_cases(văn bản)':32s}: p50 {text_stats['p50']:7.2f} ms | "
+          f"p99 {text_stats['p99']:7.2f} ms")
+
+    for approximate_mode in (False, True):
+        started = time.perf_counter()
+        index.rank_many(index.matrix[rows], k, approximate=approximate_mode, exclude=rows)
+        throughput = len(rows) / (time.perf_counter() - started)
+        print(f"  - rank_many theo lô{' approximate' if approximate_mode else '':12s}    : "
+              f"{throughput:8.0f} truy vấn/s")
+    print(f"  - recall@{k} approximate: {np.mean(recall):.3f}")
+    print("  - top-k chính xác trùng khớp baseline ✅")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark thống kê dựng sẵn: value_counts mỗi lần gọi so với StatisticsStore
+
+Cách cũ tính lại value_counts() trên case_data/case_law_data ở mỗi lần gọi
+get_law_statistics/get_case_statistics, bảng chéo thì merge hai bảng rồi
+pd.crosstab. Đo thêm thời gian dựng toàn bộ so với cập nhật dần khi nối
+thêm phần cuối dữ liệu (--append-fraction), và kiểm tra kết quả trùng khớp,
+kể cả khi giá trị của phần dữ liệu đã đếm bị sửa tại chỗ.
+
+Cách chạy:
+    python benchmarks/bench_statistics.py --data-dir data_export
+"""
+
+import argparse
+import os
+import shutil
+import time
+
+import pandas as pd
+
+from bench_utils import quiet, summarize, time_call
+
+from data_loader import DataLoader
+from statistics_store import CASE_STATISTICS, LAW_STATISTICS, StatisticsStore, case_attributes
+
+
+def legacy_statistics(loader: DataLoader):
+    """Cách cũ: value_counts() trên toàn bộ bảng ở mỗi lần gọi"""
+    law_stats = {name: loader.case_law_data[col].value_counts().to_dict()
+                 for name, col in LAW_STATISTICS.items() if col in loader.case_law_data.columns}
+    case_stats = {name: loader.case_data[col].value_counts().to_dict()
+                  for name, col in CASE_STATISTICS.items() if col in loader.case_data.columns}
+    return law_stats, case_stats
+
+
+def legacy_crosstab(loader: DataLoader, index: str, columns: str) -> pd.DataFrame:
+    """Cách cũ: merge trích dẫn với thuộc tính bản án rồi pd.crosstab"""
+    attributes = case_attributes(loader.case_data).assign(case_id=loader.case_data['id'])
+    merged = loader.case_law_data.merge(attributes.drop_duplicates('case_id'), on='case_id', how='left')
+    return pd.crosstab(merged[index], merged[columns])
+
+
+def per_call_ms(func, repeat: int) -> float:
+    return summarize(time_call(func, repeat))['median'] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--append-fraction', type=float, default=0.05)
+    args = parser.parse_args()
+
+    loader = DataLoader(args.data_dir)
+    with quiet():
+        loader.load_all_data()
+    stats_dir = os.path.join(loader.cache_dir, 'stats')
+    shutil.rmtree(stats_dir, ignore_errors=True)
+
+    print("📊 THỐNG KÊ DỰNG SẴN")
+    print("=" * 70)
+    print(f"  - {len(loader.case_data):,} bản án, {len(loader.case_law_data):,} trích dẫn")
+
+    started = time.perf_counter()
+    loader.get_statistics()
+    print(f"  - dựng lần đầu + lưu cache_dir/stats : {(time.perf_counter() - started) * 1000:8.1f} ms")
+    loader.statistics = None
+    started = time.perf_counter()
+    loader.get_statistics()
+    print(f"  - load lại từ cache_dir/stats        : {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    legacy_ms = per_call_ms(lambda: legacy_statistics(loader), args.repeat)
+    store_ms = per_call_ms(lambda: (loader.get_law_statistics(), loader.get_case_statistics()), args.repeat)
+    print(f"  - get_*_statistics mỗi lần gọi      : value_counts {legacy_ms:8.2f} ms "
+          f"| dựng sẵn {store_ms:6.3f} ms")
+
+    law_stats, case_stats = legacy_statistics(loader)
+    for expected, actual in ((law_stats, loader.get_law_statistics()), (case_stats, loader.get_case_statistics())):
+        assert expected == actual and all(list(expected[k]) == list(actual[k]) for k in expected), \
+            "thống kê dựng sẵn khác value_counts()"
+
+    for index, columns in (('article', 'court_name'), ('law_id', 'year')):
+        expected = legacy_crosstab(loader, index, columns)
+        actual = loader.get_crosstab(index, columns)
+        pd.testing.assert_frame_equal(actual.sort_index().sort_index(axis=1), expected,
+                                      check_names=False, check_dtype=False,
+                                      check_index_type=False, check_column_type=False)
+        legacy_ms = per_call_ms(lambda: legacy_crosstab(loader, index, columns), args.repeat)
+        store_ms = per_call_ms(lambda: loader.get_crosstab(index, columns), args.repeat)
+        print(f"  - crosstab {index:>7s} × {columns:10s}     : merge+crosstab {legacy_ms:6.2f} ms "
+              f"| dựng sẵn {store_ms:6.2f} ms")
+
+    # Cập nhật dần: thống kê của phần đầu, rồi nối thêm các bản án cuối cùng trích dẫn của chúng
+    n_cases = int(len(loader.case_data) * (1 - args.append_fraction))
+    new_links = ~loader.case_law_data['case_id'].isin(loader.case_data['id'].iloc[:n_cases]).to_numpy()
+    n_links = int(new_links.argmax()) if new_links.any() else len(new_links)
+    old_cases, old_links = loader.case_data.iloc[:n_cases], loader.case_law_data.iloc[:n_links]
+    full = StatisticsStore()
+    rebuild_ms = per_call_ms(lambda: StatisticsStore().refresh(loader.case_data, loader.case_law_data),
+                             max(1, args.repeat // 4))
+    full.refresh(loader.case_data, loader.case_law_data)
+
+    timings = []
+    for _ in range(max(1, args.repeat // 4)):
+        store = StatisticsStore()
+        store.refresh(old_cases, old_links)
+        started = time.perf_counter()
+        store.refresh(loader.case_data, loader.case_law_data)
+        timings.append(time.perf_counter() - started)
+    incremental_ms = summarize(timings)['median'] * 1000
+    for name, counts in full.tables.items():
+        pd.testing.assert_series_equal(store.tables[name], counts)
+    print(f"  - nối thêm {args.append_fraction:.0%} dòng                : dựng lại {rebuild_ms:8.1f} ms "
+          f"| cập nhật dần {incremental_ms:6.1f} ms")
+    # Sửa tại chỗ (số dòng và id không đổi) như khi CSV được sửa rồi load lại
+    edited = loader.case_data.copy()
+    courts = edited['court_name'].dropna().unique()
+    if len(courts) > 1:
+        edited.loc[0, 'court_name'] = courts[1] if edited.loc[0, 'court_name'] == courts[0] else courts[0]
+        loader.case_data = edited
+        loader.statistics = None
+        expected_law, expected_case = legacy_statistics(loader)
+        assert loader.get_case_statistics() == expected_case and loader.get_law_statistics() == expected_law, \
+            "thống kê cũ vẫn được dùng sau khi sửa dữ liệu tại chỗ"
+        print("  - sửa court_name tại chỗ             : dựng lại, khớp value_counts() ✅")
+    print("  - kết quả trùng khớp value_counts()/pd.crosstab ✅")
+
+    # Không để lại cache thống kê của lần chạy benchmark
+    shutil.rmtree(stats_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
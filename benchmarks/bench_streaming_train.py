@@ -0,0 +1,100 @@
+"""
+Benchmark huấn luyện streaming so với train() trong bộ nhớ theo kích thước dữ liệu
+
+Tạo các bản sao phóng to của data_dir (case_data/case_law_data lặp lại với
+id mới), rồi với mỗi mức chạy train() và train_streaming() trong tiến trình
+con riêng để đo thời gian và peak RSS. Với streaming, peak RSS gần như không
+đổi khi dữ liệu tăng vì chỉ phụ thuộc chunk_size và kích thước mô hình.
+
+Cách chạy:
+    python benchmarks/bench_streaming_train.py --data-dir data_export \\
+        --out-dir data_export/.cache/bench_streaming --scales 1 4
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import time
+import warnings
+
+import pandas as pd
+
+from bench_utils import quiet
+
+from data_loader import DataLoader
+from models.law_classifier import LawClassifier
+
+
+def make_scaled_copy(data_dir: str, out_dir: str, factor: int, chunk_size: int = 5000):
+    """Ghi bản sao data_dir với case_data và case_law_data lặp lại factor lần"""
+    os.makedirs(out_dir, exist_ok=True)
+    shutil.copy(os.path.join(data_dir, 'law_data.csv'), out_dir)
+    max_id = int(pd.read_csv(os.path.join(data_dir, 'case_data.csv'), usecols=['id'],
+                             encoding='utf-8-sig')['id'].max())
+
+    for filename, id_column in (('case_data.csv', 'id'), ('case_law_data.csv', 'case_id')):
+        target = os.path.join(out_dir, filename)
+        header = True
+        for copy in range(factor):
+            for chunk in pd.read_csv(os.path.join(data_dir, filename), encoding='utf-8-sig',
+                                     chunksize=chunk_size):
+                chunk[id_column] = chunk[id_column] + copy * (max_id + 1)
+                chunk.to_csv(target, mode='w' if header else 'a', header=header, index=False,
+                             encoding='utf-8-sig' if header else 'utf-8')
+                header = False
+
+
+def run_child(mode: str, data_dir: str, chunk_size: int) -> dict:
+    """Huấn luyện trong tiến trình hiện tại, trả về thời gian và peak RSS"""
+    warnings.filterwarnings('ignore')
+    loader = DataLoader(data_dir)
+    started = time.perf_counter()
+    with quiet():
+        classifier = LawClassifier('naive_bayes')
+        if mode == 'memory':
+            loader.load_all_data()
+            classifier.train(loader)
+        else:
+            classifier.train_streaming(loader, chunk_size=chunk_size)
+    return {
+        'seconds': time.perf_counter() - started,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--out-dir', default='data_export/.cache/bench_streaming')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.mode, args.child, args.chunk_size)))
+        return
+
+    print("⏱️  HUẤN LUYỆN TRONG BỘ NHỚ SO VỚI STREAMING")
+    print("=" * 70)
+    for factor in args.scales:
+        data_dir = os.path.join(args.out_dir, f"x{factor}")
+        make_scaled_copy(args.data_dir, data_dir, factor)
+        n_cases = sum(len(chunk) for chunk in DataLoader(data_dir).iter_chunks('case_data.csv', columns=['id']))
+        for mode in ('memory', 'streaming'):
+            output = subprocess.check_output(
+                [sys.executable, __file__, '--child', data_dir, '--mode', mode,
+                 '--chunk-size', str(args.chunk_size)]
+            )
+            result = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+            print(f"  - x{factor:<3d} {n_cases:>9,} bản án | {mode:9s}: {result['seconds']:7.1f}s "
+                  f"| peak RSS {result['peak_rss_mb']:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
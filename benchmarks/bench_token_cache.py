@@ -0,0 +1,68 @@
+"""
+Benchmark cache tách từ: thời gian train() khi đổi classifier/test_size
+
+Chạy lần lượt: train() không dùng cache, lần đầu với use_token_cache=True
+(cache trống, phải tách từ rồi ghi cache), rồi các lần train lại với
+classifier và test_size khác (dùng lại cache, không tách từ). Kiểm tra
+vocabulary_/idf_ dựng từ cache trùng với TfidfVectorizer.fit_transform.
+
+Cách chạy:
+    python benchmarks/bench_token_cache.py --data-dir data_export
+"""
+
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+
+from bench_utils import quiet
+
+from data_loader import DataLoader
+from models.law_classifier import LawClassifier
+from models.token_cache import TokenCache
+
+
+def timed_train(loader: DataLoader, model_type: str, use_token_cache: bool,
+                test_size: float = 0.2):
+    classifier = LawClassifier(model_type, use_token_cache=use_token_cache)
+    started = time.perf_counter()
+    with quiet():
+        classifier.train(loader, test_size=test_size)
+    return classifier, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default='data_export')
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    loader = DataLoader(args.data_dir)
+    with quiet():
+        loader.load_all_data()
+    cache = TokenCache(os.path.join(loader.cache_dir, 'tokens'))
+    cache.clear()
+
+    print("⏱️  CACHE TÁCH TỪ CHO CÁC LẦN HUẤN LUYỆN LẶP LẠI")
+    print("=" * 70)
+    baseline, seconds = timed_train(loader, 'naive_bayes', use_token_cache=False)
+    print(f"  - không cache        naive_bayes test_size=0.2: {seconds:7.2f}s")
+
+    runs = [('naive_bayes', 0.2, 'cache trống'), ('naive_bayes', 0.2, 'cache có sẵn'),
+            ('sgd', 0.2, 'cache có sẵn'), ('naive_bayes', 0.3, 'cache có sẵn')]
+    for model_type, test_size, label in runs:
+        classifier, seconds = timed_train(loader, model_type, True, test_size)
+        print(f"  - {label:18s} {model_type:11s} test_size={test_size}: {seconds:7.2f}s")
+        if (model_type, test_size) == ('naive_bayes', 0.2):
+            same = (classifier.vectorizer.vocabulary_ == baseline.vectorizer.vocabulary_
+                    and np.allclose(classifier.vectorizer.idf_, baseline.vectorizer.idf_))
+            assert same, "vocabulary_/idf_ dựng từ cache khác TfidfVectorizer"
+
+    size_mb = sum(size for _, size, _ in cache.entries()) / 2**20
+    print(f"  - cache: {len(cache.entries())} mục, {size_mb:.1f} MB; vocabulary_/idf_ trùng khớp ✅")
+
+
+if __name__ == "__main__":
+    main()
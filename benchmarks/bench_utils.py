@@ -0,0 +1,95 @@
+"""
+Các hàm tiện ích dùng chung cho các script benchmark
+"""
+
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+
+for _path in (ROOT_DIR, SRC_DIR):
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Tắt output print của các hàm được đo"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def time_call(func: Callable, repeat: int = 1) -> List[float]:
+    """Đo thời gian (giây) của func qua nhiều lần chạy"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """Tóm tắt danh sách thời gian đo được"""
+    ordered = sorted(timings)
+    return {
+        'min': ordered[0],
+        'median': ordered[len(ordered) // 2],
+        'max': ordered[-1],
+    }
+
+
+def current_rss_mb() -> float:
+    """RSS hiện tại của tiến trình (MB), đọc từ /proc trên Linux"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class PeakMemory:
+    """Đo RSS lớn nhất (MB) trong một khối lệnh bằng luồng lấy mẫu /proc"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.start_mb = self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def __enter__(self) -> 'PeakMemory':
+        self.start_mb = self.peak_mb = current_rss_mb()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    @property
+    def delta_mb(self) -> float:
+        """Phần RSS tăng thêm so với lúc bắt đầu khối lệnh"""
+        return self.peak_mb - self.start_mb
+
+
+def process_pss_mb(pid: int) -> float:
+    """PSS (MB) của một tiến trình: trang dùng chung được chia đều cho các tiến trình"""
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
@@ -43,13 +43,49 @@ LAW_PATTERNS = {
 # Model parameters
 MODEL_CONFIG = {
     'tfidf': {
-        'max_features': 10000,
+        'max_features': 5000,
         'ngram_range': (1, 2),
-        'min_df': 2
+        'min_df': 2,
+        'max_df': 0.95
     },
     'bm25': {
         'k1': 1.5,
         'b': 0.75
+    },
+    'streaming': {
+        'n_features': 2 ** 14,  # số chiều không gian băm, bộ nhớ mô hình ∝ n_features × số điều luật
+        'chunk_size': 5000,     # số bản án mỗi lần partial_fit
+        'use_idf': True
+    },
+    'token_cache': {
+        'max_size_mb': 2048     # tổng dung lượng cache tách từ (data_dir/.cache/tokens), xóa theo LRU
+    },
+    # LawClassifier.update(): huấn luyện lại toàn bộ (fit lại từ vựng) khi số mẫu
+    # cập nhật dần vượt tỷ lệ này so với số mẫu lúc fit từ vựng
+    'incremental': {
+        'refresh_ratio': 0.25
+    },
+    # Tìm bản án tương tự (src/models/similarity.py)
+    'similarity': {
+        'block_size': 200000,     # số bản án mỗi khối, ma trận điểm tạm ≤ chunk_size × block_size
+        'chunk_size': 64,         # số truy vấn mỗi lần nhân ma trận
+        'max_query_terms': 32,    # approximate: số từ trọng số lớn nhất của truy vấn dùng để lấy ứng viên
+        'candidate_factor': 10    # approximate: số ứng viên = top_k × hệ số, được chấm lại chính xác
+    },
+    # Không gian tìm kiếm mặc định của src/models/tuning.py (tích Descartes các giá trị)
+    'search': {
+        'n_folds': 3,
+        'scoring': ('map', 10),  # chỉ số và k dùng để xếp hạng leaderboard
+        'vectorizer': {
+            'max_features': [2000, 5000, 10000],
+            'min_df': [1, 2],
+            'use_idf': [True, False]
+        },
+        'classifiers': {
+            'naive_bayes': {'alpha': [0.01, 0.1, 1.0]},
+            'sgd': {'alpha': [1e-5, 1e-4]},
+            'random_forest': {'n_estimators': [100], 'max_depth': [None, 30]}
+        }
     }
 }
 
@@ -57,4 +93,13 @@ MODEL_CONFIG = {
 EVAL_CONFIG = {
     'k_values': list(range(5, 201, 5)),  # k từ 5 đến 200, bước 5
     'metrics': ['precision', 'recall', 'f1', 'map', 'mar']
-} 
\ No newline at end of file
+} 
+
+# Prediction server parameters
+SERVER_CONFIG = {
+    'host': os.getenv('SERVER_HOST', '127.0.0.1'),
+    'port': int(os.getenv('SERVER_PORT', 8000)),
+    'max_batch_size': 64,   # số request tối đa gộp vào một lần predict_topk
+    'max_wait_ms': 5,       # thời gian chờ gom batch sau request đầu tiên
+    'max_queue': 1024       # số request chờ tối đa, vượt quá trả về 503
+}
@@ -54,7 +54,8 @@ def main():
     # Lưu mô hình
     print("\n💾 Lưu mô hình...")
     os.makedirs('models', exist_ok=True)
-    classifier.save_model('models/law_classifier.pkl')
+    classifier.save_model('models/law_classifier')
+    classifier.export_linear('models/law_classifier_linear')
     
     print("\n✅ Demo hoàn thành!")
 
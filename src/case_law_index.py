@@ -0,0 +1,134 @@
+"""
+Module chỉ mục kề bản án → điều luật dạng CSR
+
+Các dòng của case_law_data được sắp theo vị trí dòng của bản án trong
+case_data (giữ thứ tự gốc trong cùng một bản án), kèm mảng offsets độ dài
+n_cases + 1: các trích dẫn của bản án ở dòng r là link_rows[offsets[r]:offsets[r + 1]],
+law_rows cùng đoạn là vị trí dòng của điều luật trong law_data (-1 nếu không
+có). Tra một bản án chỉ tốn O(số điều luật được trích dẫn), còn bảng ghép
+toàn bộ được dựng bằng cách lấy dòng theo các mảng này thay vì merge.
+
+Khi nối thêm dòng vào case_data/case_law_data, extend() chèn các trích dẫn
+mới vào đúng vị trí (searchsorted) thay vì sắp xếp lại toàn bộ, kết quả giống
+hệt dựng lại chỉ mục.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from id_index import IdIndex
+
+
+class CaseLawIndex:
+    """Chỉ mục kề bản án → các dòng case_law_data / law_data, xây một lần khi load dữ liệu"""
+
+    def __init__(self, case_index: IdIndex, case_law_data: pd.DataFrame,
+                 law_index: Optional[IdIndex] = None):
+        """
+        Args:
+            case_index: Chỉ mục id → dòng của case_data
+            case_law_data: Bảng case_law (id, case_id, law_id, ...)
+            law_index: Chỉ mục id → dòng của law_data
+        """
+        self.n_cases = len(case_index)
+        self.n_links = len(case_law_data)
+        case_rows = case_index.positions(case_law_data['case_id'].to_numpy())
+        # Như inner join: bỏ các trích dẫn tới bản án không có trong case_data,
+        # giữ lại case_id của chúng để extend() ghép khi bản án được thêm sau
+        known = np.flatnonzero(case_rows >= 0)
+        order = known[np.argsort(case_rows[known], kind='stable')]
+        self.orphan_rows = np.flatnonzero(case_rows < 0)
+        self.orphan_case_ids = case_law_data['case_id'].to_numpy()[self.orphan_rows]
+
+        self.link_rows = order
+        self.case_rows = case_rows[order]
+        self.offsets = np.zeros(self.n_cases + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.case_rows, minlength=self.n_cases), out=self.offsets[1:])
+        self.law_rows = self._law_rows(case_law_data['law_id'].to_numpy()[order], law_index)
+
+    @staticmethod
+    def _law_rows(law_ids: np.ndarray, law_index: Optional[IdIndex]) -> np.ndarray:
+        if law_index is None:
+            return np.full(len(law_ids), -1, dtype=np.int64)
+        return law_index.positions(law_ids)
+
+    def extend(self, case_index: IdIndex, case_law_data: pd.DataFrame,
+               law_index: Optional[IdIndex] = None):
+        """
+        Cập nhật chỉ mục sau khi nối thêm dòng vào cuối case_data và/hoặc case_law_data
+
+        Args:
+            case_index: Chỉ mục id → dòng của case_data (đã extend)
+            case_law_data: Toàn bộ case_law_data, các dòng từ n_links trở đi là dòng mới
+            law_index: Chỉ mục id → dòng của law_data
+        """
+        new_rows = np.arange(self.n_links, len(case_law_data))
+        # Trích dẫn cũ chưa ghép được, có thể trỏ tới bản án vừa thêm
+        candidates = np.concatenate([self.orphan_rows, new_rows])
+        case_ids = np.concatenate([self.orphan_case_ids,
+                                   case_law_data['case_id'].to_numpy()[new_rows]])
+        case_rows = case_index.positions(case_ids)
+
+        known = np.flatnonzero(case_rows >= 0)
+        order = known[np.argsort(case_rows[known], kind='stable')]
+        link_rows, new_case_rows = candidates[order], case_rows[order]
+        law_rows = self._law_rows(case_law_data['law_id'].to_numpy()[link_rows], law_index)
+
+        # Trong cùng một bản án các trích dẫn giữ thứ tự dòng trong case_law_data
+        within = self.case_rows * (len(case_law_data) + 1) + self.link_rows
+        at = np.searchsorted(within, new_case_rows * (len(case_law_data) + 1) + link_rows)
+        self.link_rows = np.insert(self.link_rows, at, link_rows)
+        self.case_rows = np.insert(self.case_rows, at, new_case_rows)
+        self.law_rows = np.insert(self.law_rows, at, law_rows)
+
+        self.n_cases = len(case_index)
+        self.n_links = len(case_law_data)
+        self.offsets = np.zeros(self.n_cases + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.case_rows, minlength=self.n_cases), out=self.offsets[1:])
+        self.orphan_rows = candidates[case_rows < 0]
+        self.orphan_case_ids = case_ids[case_rows < 0]
+
+    def __len__(self) -> int:
+        return len(self.link_rows)
+
+    def links(self, case_row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(dòng case_law_data, dòng law_data) của một bản án theo vị trí dòng"""
+        start, end = self.offsets[case_row], self.offsets[case_row + 1]
+        return self.link_rows[start:end], self.law_rows[start:end]
+
+    def links_for_rows(self, case_rows: Iterable[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Các trích dẫn của nhiều bản án theo vị trí dòng
+
+        Returns:
+            Tuple (dòng case_data, dòng case_law_data, dòng law_data) đã ghép nối
+        """
+        case_rows = np.asarray(case_rows, dtype=np.int64)
+        starts, ends = self.offsets[case_rows], self.offsets[case_rows + 1]
+        lengths = ends - starts
+        positions = np.repeat(ends - lengths.cumsum(), lengths) + np.arange(lengths.sum())
+        return np.repeat(case_rows, lengths), self.link_rows[positions], self.law_rows[positions]
+
+    def law_counts(self) -> np.ndarray:
+        """Số trích dẫn của mỗi bản án theo vị trí dòng"""
+        return np.diff(self.offsets)
+
+
+def take_columns(df: pd.DataFrame, rows: np.ndarray, names: Dict[str, str]) -> Dict[str, object]:
+    """
+    Lấy các dòng rows của các cột trong names (cột -> tên mới), không sao chép cột khác
+
+    rows = -1 cho giá trị rỗng (NaN), giống phía phải của left join.
+    """
+    allow_fill = len(rows) > 0 and rows.min() < 0
+    return {name: pd.api.extensions.take(df[column].array, rows, allow_fill=allow_fill)
+            for column, name in names.items()}
+
+
+def joined_columns(left: List[str], right: List[str], suffixes: Tuple[str, str]) -> Tuple[List[str], List[str]]:
+    """Tên cột sau pd.merge của hai bảng có các cột trùng tên (thêm hậu tố)"""
+    overlap = set(left) & set(right)
+    return ([f"{column}{suffixes[0]}" if column in overlap else column for column in left],
+            [f"{column}{suffixes[1]}" if column in overlap else column for column in right])
@@ -0,0 +1,160 @@
+"""
+Module cache nhị phân cho các bảng dữ liệu CSV
+
+Mỗi bảng CSV được lưu thêm một bản sao nhị phân (pickle protocol 5 của
+DataFrame, giữ nguyên dtype) trong thư mục cache, kèm một file manifest
+JSON ghi lại kích thước, mtime và (tùy chọn) hash SHA-1 của file nguồn.
+Lần load sau chỉ đọc bản nhị phân khi file nguồn chưa thay đổi.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+import pandas as pd
+
+CACHE_FORMAT_VERSION = 1
+CACHE_SUFFIX = '.pkl'
+META_SUFFIX = '.meta.json'
+
+
+def file_sha1(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """Tính hash SHA-1 của file theo từng khối"""
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_fingerprint(filepath: str, with_hash: bool = False) -> Dict:
+    """
+    Lấy dấu vết của file nguồn để kiểm tra cache
+
+    Args:
+        filepath: Đường dẫn file CSV nguồn
+        with_hash: Có tính thêm hash SHA-1 hay không
+
+    Returns:
+        Dict gồm size, mtime_ns và sha1 (nếu có)
+    """
+    stat = os.stat(filepath)
+    fingerprint = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+    if with_hash:
+        fingerprint['sha1'] = file_sha1(filepath)
+    return fingerprint
+
+
+def cache_paths(cache_dir: str, table_name: str) -> Dict[str, str]:
+    """Đường dẫn file dữ liệu và manifest của một bảng trong cache"""
+    return {
+        'data': os.path.join(cache_dir, table_name + CACHE_SUFFIX),
+        'meta': os.path.join(cache_dir, table_name + META_SUFFIX),
+    }
+
+
+def _read_meta(meta_file: str) -> Optional[Dict]:
+    if not os.path.exists(meta_file):
+        return None
+    try:
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_file: str, meta: Dict):
+    tmp_file = meta_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, meta_file)
+
+
+def is_cache_valid(source_file: str, cache_dir: str, table_name: str,
+                   params: Optional[Dict] = None, verify_hash: bool = False) -> bool:
+    """
+    Kiểm tra bản cache của một bảng còn dùng được hay không
+
+    Cache bị coi là cũ khi kích thước file nguồn thay đổi, hoặc mtime thay
+    đổi mà (khi verify_hash=True) hash SHA-1 cũng khác. Nếu chỉ mtime đổi
+    còn nội dung giữ nguyên thì manifest được cập nhật mtime mới.
+
+    Args:
+        source_file: File CSV nguồn
+        cache_dir: Thư mục cache
+        table_name: Tên bảng (case, law, case_law)
+        params: Tham số đọc dữ liệu, phải khớp với lúc ghi cache
+        verify_hash: Có so sánh hash nội dung khi mtime thay đổi hay không
+    """
+    paths = cache_paths(cache_dir, table_name)
+    meta = _read_meta(paths['meta'])
+    if meta is None or not os.path.exists(paths['data']):
+        return False
+
+    if meta.get('format_version') != CACHE_FORMAT_VERSION:
+        return False
+    if meta.get('params', {}) != (params or {}):
+        return False
+
+    current = source_fingerprint(source_file)
+    cached = meta.get('source', {})
+    if current['size'] != cached.get('size'):
+        return False
+    if current['mtime_ns'] == cached.get('mtime_ns'):
+        return True
+
+    if not verify_hash or 'sha1' not in cached:
+        return False
+    if file_sha1(source_file) != cached['sha1']:
+        return False
+
+    # Nội dung không đổi, chỉ cập nhật lại mtime trong manifest
+    meta['source']['mtime_ns'] = current['mtime_ns']
+    _write_meta(paths['meta'], meta)
+    return True
+
+
+def read_cached_table(cache_dir: str, table_name: str) -> pd.DataFrame:
+    """Đọc bảng từ bản cache nhị phân"""
+    return pd.read_pickle(cache_paths(cache_dir, table_name)['data'])
+
+
+def write_cached_table(df: pd.DataFrame, source_file: str, cache_dir: str,
+                       table_name: str, params: Optional[Dict] = None,
+                       with_hash: bool = False):
+    """
+    Ghi bản cache nhị phân của một bảng cùng manifest
+
+    Dữ liệu được ghi ra file tạm rồi đổi tên để tránh để lại cache hỏng
+    khi tiến trình bị dừng giữa chừng.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    paths = cache_paths(cache_dir, table_name)
+
+    tmp_file = paths['data'] + '.tmp'
+    df.to_pickle(tmp_file, compression=None, protocol=5)
+    os.replace(tmp_file, paths['data'])
+
+    _write_meta(paths['meta'], {
+        'format_version': CACHE_FORMAT_VERSION,
+        'table': table_name,
+        'source_file': os.path.basename(source_file),
+        'source': source_fingerprint(source_file, with_hash=with_hash),
+        'params': params or {},
+        'rows': len(df),
+    })
+
+
+def clear_cache(cache_dir: str, table_name: Optional[str] = None):
+    """Xóa cache của một bảng hoặc toàn bộ thư mục cache"""
+    if not os.path.isdir(cache_dir):
+        return
+    for filename in os.listdir(cache_dir):
+        if table_name is not None and not filename.startswith(table_name + '.'):
+            continue
+        if filename.endswith((CACHE_SUFFIX, META_SUFFIX)):
+            os.remove(os.path.join(cache_dir, filename))
@@ -4,54 +4,155 @@ Module load và xử lý dữ liệu từ các file CSV có sẵn
 
 import pandas as pd
 import os
-from typing import Dict, List, Tuple, Optional
+import re
+from typing import Dict, Iterator, List, Tuple, Optional
 import numpy as np
 
+import data_cache
+import schema
+from case_law_index import CaseLawIndex, joined_columns, take_columns
+from dedup import MinHashIndex
+from id_index import IdIndex
+from search_index import InvertedIndex
+from segments import COMPACT_AFTER, SegmentStore
+from statistics_store import StatisticsStore
+from text_store import TextStore, TextStoreWriter, append_to_store, read_store_meta
+
+# Các cột chứa toàn văn bản án, có thể được tách ra text store (lazy_text)
+TEXT_COLUMNS = ('content', 'text')
+
 class DataLoader:
     """Lớp load và xử lý dữ liệu từ CSV files"""
     
-    def __init__(self, data_dir: str = "data_export"):
+    def __init__(self, data_dir: str = "data_export", use_cache: bool = False,
+                 cache_dir: Optional[str] = None, verify_hash: bool = False,
+                 lazy_text: bool = False, use_schema: bool = True):
+        """
+        Args:
+            data_dir: Thư mục chứa các file CSV
+            use_cache: Bật cache nhị phân cho các bảng (xem data_cache.py)
+            cache_dir: Thư mục cache, mặc định là data_dir/.cache
+            verify_hash: Kiểm tra hash SHA-1 khi mtime file nguồn thay đổi
+            lazy_text: Chỉ load các cột metadata của case_data, các cột văn bản
+                (content, text) được đưa vào text store memory-mapped
+            use_schema: Đọc các bảng theo kiểu khai báo trong schema.py (category,
+                Int32, datetime) thay vì để pandas tự suy kiểu
+        """
         self.data_dir = data_dir
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir or os.path.join(data_dir, ".cache")
+        self.verify_hash = verify_hash
+        self.lazy_text = lazy_text
+        self.use_schema = use_schema
         self.case_data = None
         self.law_data = None
         self.case_law_data = None
+        self.text_stores: Dict[str, TextStore] = {}
+        self.case_index: Optional[IdIndex] = None
+        self.law_index: Optional[IdIndex] = None
+        self.case_law_index: Optional[CaseLawIndex] = None
+        self.search_indexes: Dict[Tuple[str, bool], InvertedIndex] = {}
+        self.statistics: Optional[StatisticsStore] = None
+        # Chữ ký MinHash phát hiện bản án gần trùng, load khi cần (get_duplicate_clusters)
+        self.dedup: Optional[MinHashIndex] = None
+        # Các dòng thêm qua append_data() (delta segment), load cùng các file CSV
+        self.segments = SegmentStore(os.path.join(data_dir, "segments"))
+        self.case_law_ids: Optional[IdIndex] = None
+        
+    def _read_csv_table(self, table_name: str, filename: str,
+                        exclude_columns: Tuple[str, ...] = ()) -> pd.DataFrame:
+        """
+        Đọc một bảng CSV, dùng bản cache nhị phân nếu còn hợp lệ
+        
+        Args:
+            table_name: Tên bảng (case, law, case_law)
+            filename: Tên file CSV trong data_dir
+            exclude_columns: Các cột không đọc vào DataFrame
+            
+        Returns:
+            DataFrame của bảng, rỗng nếu không tìm thấy file
+        """
+        filepath = os.path.join(self.data_dir, filename)
+        if not os.path.exists(filepath):
+            print(f"❌ Không tìm thấy file {filepath}")
+            return pd.DataFrame()
+        
+        schema_table = table_name
+        # Bảng chỉ gồm một phần cột được cache dưới tên riêng
+        if exclude_columns:
+            table_name = f"{table_name}_meta"
+        params = {'schema_version': schema.SCHEMA_VERSION} if self.use_schema else None
+        
+        if self.use_cache:
+            if data_cache.is_cache_valid(filepath, self.cache_dir, table_name, params=params,
+                                         verify_hash=self.verify_hash):
+                df = data_cache.read_cached_table(self.cache_dir, table_name)
+                print(f"⚡ Đã load {len(df):,} records từ cache của {filename}")
+                return df
+        
+        usecols = None
+        header = None
+        if exclude_columns:
+            header = pd.read_csv(filepath, encoding='utf-8-sig', nrows=0).columns
+            usecols = [col for col in header if col not in exclude_columns]
+        
+        df = None
+        if self.use_schema:
+            try:
+                df = schema.read_table(filepath, schema_table, usecols, header)
+            except schema.SchemaError as e:
+                # Vẫn đọc được bảng, chỉ mất các kiểu khai báo; cache ghi như use_schema=False
+                print(f"⚠️ {e}")
+                print(f"⚠️ Đọc {filename} không theo schema")
+                params = None
+        if df is None:
+            df = pd.read_csv(filepath, encoding='utf-8-sig', usecols=usecols)
+        print(f"✅ Đã load {len(df):,} records từ {filename}")
         
+        if self.use_cache:
+            data_cache.write_cached_table(df, filepath, self.cache_dir, table_name,
+                                          params=params, with_hash=self.verify_hash)
+        return df
+    
     def load_all_data(self) -> Dict[str, pd.DataFrame]:
         """
         Load tất cả dữ liệu từ các file CSV
         
+        Khi bật use_cache, lần load đầu ghi bản sao nhị phân của từng bảng,
+        các lần sau đọc bản sao này nếu file CSV nguồn không thay đổi. Các
+        dòng đã thêm qua append_data() (delta segment) được nối vào cuối bảng.
+        
         Returns:
             Dict chứa 3 DataFrame: case, law, case_law
         """
         print("📊 Đang load dữ liệu từ CSV files...")
         
         try:
-            # Load case data
-            case_file = os.path.join(self.data_dir, "case_data.csv")
-            if os.path.exists(case_file):
-                self.case_data = pd.read_csv(case_file, encoding='utf-8-sig')
-                print(f"✅ Đã load {len(self.case_data):,} records từ case_data.csv")
+            segment_cases = self.segments.read('case')
+            if self.lazy_text:
+                self.case_data = self._read_csv_table('case', "case_data.csv",
+                                                      exclude_columns=TEXT_COLUMNS)
+                self._open_text_stores("case_data.csv", segment_cases)
             else:
-                print(f"❌ Không tìm thấy file {case_file}")
-                self.case_data = pd.DataFrame()
+                self.case_data = self._read_csv_table('case', "case_data.csv")
+            self.law_data = self._read_csv_table('law', "law_data.csv")
+            self.case_law_data = self._read_csv_table('case_law', "case_law_data.csv")
             
-            # Load law data
-            law_file = os.path.join(self.data_dir, "law_data.csv")
-            if os.path.exists(law_file):
-                self.law_data = pd.read_csv(law_file, encoding='utf-8-sig')
-                print(f"✅ Đã load {len(self.law_data):,} records từ law_data.csv")
-            else:
-                print(f"❌ Không tìm thấy file {law_file}")
-                self.law_data = pd.DataFrame()
+            segment_links = self.segments.read('case_law')
+            if segment_cases is not None or segment_links is not None:
+                if segment_cases is not None and self.lazy_text:
+                    segment_cases = segment_cases.drop(columns=list(TEXT_COLUMNS), errors='ignore')
+                self.case_data = self._concat_rows(self.case_data, segment_cases)
+                self.case_law_data = self._concat_rows(self.case_law_data, segment_links)
+                print(f"✅ Đã load {len(segment_cases) if segment_cases is not None else 0:,} bản án, "
+                      f"{len(segment_links) if segment_links is not None else 0:,} trích dẫn "
+                      f"từ {len(self.segments.segments())} segment")
             
-            # Load case_law data
-            case_law_file = os.path.join(self.data_dir, "case_law_data.csv")
-            if os.path.exists(case_law_file):
-                self.case_law_data = pd.read_csv(case_law_file, encoding='utf-8-sig')
-                print(f"✅ Đã load {len(self.case_law_data):,} records từ case_law_data.csv")
-            else:
-                print(f"❌ Không tìm thấy file {case_law_file}")
-                self.case_law_data = pd.DataFrame()
+            self.case_law_ids = None
+            self.build_indexes()
+            self.search_indexes = {}
+            self.statistics = None
+            self.dedup = None
             
             return {
                 'case': self.case_data,
@@ -63,6 +164,242 @@ class DataLoader:
             print(f"❌ Lỗi load dữ liệu: {e}")
             return {}
     
+    def build_indexes(self):
+        """Xây chỉ mục id → vị trí dòng cho case_data, law_data và chỉ mục kề bản án → điều luật"""
+        self.case_index = None
+        self.law_index = None
+        self.case_law_index = None
+        if self.case_data is not None and 'id' in self.case_data.columns:
+            self.case_index = IdIndex(self.case_data['id'])
+        if self.law_data is not None and 'id' in self.law_data.columns:
+            self.law_index = IdIndex(self.law_data['id'])
+        if self.case_index is not None and self.case_law_data is not None:
+            self.case_law_index = CaseLawIndex(self.case_index, self.case_law_data, self.law_index)
+    
+    @staticmethod
+    def _concat_rows(table: pd.DataFrame, rows: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Nối các dòng mới vào cuối bảng, đưa về cùng cột và kiểu với bảng"""
+        if rows is None or len(rows) == 0:
+            return table
+        if len(table.columns) == 0:
+            return rows.reset_index(drop=True)
+        return pd.concat([table, schema.conform(rows, table)], ignore_index=True)
+    
+    def append_data(self, cases: Optional[pd.DataFrame] = None,
+                    case_laws: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        Thêm bản án / trích dẫn mới mà không cần export lại CSV và load lại
+        
+        Các dòng mới được ghi thành một delta segment trong data_dir/segments
+        (các lần load_all_data sau load cùng file CSV), rồi nối vào bảng trong
+        bộ nhớ. Chỉ mục id, chỉ mục kề bản án → điều luật, text store
+        (lazy_text) và bảng thống kê được cập nhật dần thay vì dựng lại. Dòng
+        có id đã tồn tại bị bỏ qua, nên nạp lại cùng một lô không tạo bản ghi trùng.
+        Khi số segment đạt COMPACT_AFTER, các segment được gộp trong luồng nền.
+        
+        Args:
+            cases: Các dòng case_data mới (thiếu cột thì để trống)
+            case_laws: Các dòng case_law_data mới
+            
+        Returns:
+            Dict gồm case_rows, case_law_rows (vị trí các dòng mới trong
+            case_data, case_law_data), segment (None nếu không có dòng mới) và
+            near_duplicates (các dòng mới gần trùng một bản án khác, chỉ kiểm
+            tra khi chữ ký MinHash đã được load bằng get_duplicate_clusters())
+        """
+        if self.case_data is None or self.case_law_data is None:
+            raise ValueError("Cần load_all_data() trước khi append_data()")
+        if self.case_law_ids is None:
+            self.case_law_ids = IdIndex(self.case_law_data['id'])
+        
+        texts = None
+        if cases is not None and self.lazy_text:
+            texts = cases[[col for col in TEXT_COLUMNS if col in cases.columns]]
+            cases = cases.drop(columns=list(texts.columns))
+        new_cases = self._unseen_rows(cases, self.case_index)
+        new_links = self._unseen_rows(case_laws, self.case_law_ids)
+        new_cases = schema.conform(new_cases, self.case_data)
+        new_links = schema.conform(new_links, self.case_law_data)
+        if texts is not None:
+            texts = texts.loc[new_cases.index].reset_index(drop=True)
+        new_cases, new_links = new_cases.reset_index(drop=True), new_links.reset_index(drop=True)
+        
+        case_start, link_start = len(self.case_data), len(self.case_law_data)
+        result = {'case_rows': np.arange(case_start, case_start + len(new_cases)),
+                  'case_law_rows': np.arange(link_start, link_start + len(new_links)),
+                  'segment': None, 'near_duplicates': np.empty(0, dtype=np.int64)}
+        skipped = (len(cases) if cases is not None else 0) + (len(case_laws) if case_laws is not None else 0) \
+            - len(new_cases) - len(new_links)
+        if skipped:
+            print(f"⚠️ Bỏ qua {skipped:,} dòng có id đã tồn tại")
+        if len(new_cases) == 0 and len(new_links) == 0:
+            return result
+        
+        segment_cases = new_cases if texts is None else pd.concat([new_cases, texts], axis=1)
+        result['segment'] = self.segments.append({'case': segment_cases, 'case_law': new_links})
+        
+        self.case_data = pd.concat([self.case_data, new_cases], ignore_index=True)
+        self.case_law_data = pd.concat([self.case_law_data, new_links], ignore_index=True)
+        for col, store in list(self.text_stores.items()):
+            appended = (read_store_meta(store.path_prefix) or {}).get('appended', 0)
+            column = texts[col] if texts is not None and col in texts.columns else [None] * len(new_cases)
+            self.text_stores[col] = append_to_store(store.path_prefix, column,
+                                                    {'appended': appended + len(new_cases)})
+        
+        if self.case_index is None or self.case_law_index is None:
+            self.build_indexes()
+        else:
+            self.case_index.extend(new_cases['id'])
+            self.case_law_index.extend(self.case_index, self.case_law_data, self.law_index)
+        self.case_law_ids.extend(new_links['id'])
+        self.search_indexes = {}
+        if self.statistics is not None:
+            self.get_statistics()
+        
+        print(f"✅ Đã thêm {len(new_cases):,} bản án, {len(new_links):,} trích dẫn ({result['segment']})")
+        if self.dedup is not None:
+            # Chỉ các bản án mới được tính chữ ký rồi đối chiếu với chữ ký đã có
+            clusters = self.get_duplicate_clusters()
+            rows = result['case_rows']
+            result['near_duplicates'] = rows[clusters[rows] != rows]
+            if len(result['near_duplicates']):
+                print(f"⚠️ {len(result['near_duplicates']):,} bản án mới gần trùng bản án khác")
+        if len(self.segments.segments()) >= COMPACT_AFTER:
+            self.compact_segments(background=True)
+        return result
+    
+    @staticmethod
+    def _unseen_rows(rows: Optional[pd.DataFrame], index: Optional[IdIndex]) -> pd.DataFrame:
+        """Các dòng có id chưa có trong bảng (và không trùng trong cùng lô)"""
+        if rows is None:
+            return pd.DataFrame()
+        keep = ~rows['id'].duplicated().to_numpy()
+        if index is not None:
+            keep &= index.positions(rows['id'].to_numpy()) < 0
+        return rows[keep]
+    
+    def compact_segments(self, background: bool = False):
+        """
+        Gộp các delta segment thành một segment
+        
+        Args:
+            background: Chạy trong luồng nền, trả về threading.Thread
+            
+        Returns:
+            Tên segment gộp (hoặc luồng nền khi background=True)
+        """
+        if background:
+            return self.segments.compact_async()
+        return self.segments.compact()
+    
+    def clear_cache(self):
+        """Xóa toàn bộ cache nhị phân của data_dir"""
+        data_cache.clear_cache(self.cache_dir)
+    
+    def _open_text_stores(self, filename: str, segment_cases: Optional[pd.DataFrame] = None,
+                          chunk_size: int = 2000):
+        """
+        Mở (hoặc tạo mới) text store cho các cột văn bản của case_data
+        
+        Text store được tạo lại khi kích thước/mtime của file CSV nguồn thay đổi.
+        Việc tạo đọc CSV theo từng chunk nên không giữ toàn bộ văn bản trong RAM.
+        Văn bản của các bản án trong delta segment nằm sau các dòng của CSV,
+        số dòng này được ghi trong manifest (appended) để chỉ nối thêm phần thiếu.
+        """
+        self.text_stores = {}
+        filepath = os.path.join(self.data_dir, filename)
+        if not os.path.exists(filepath):
+            return
+        
+        header = pd.read_csv(filepath, encoding='utf-8-sig', nrows=0).columns
+        columns = [col for col in TEXT_COLUMNS if col in header]
+        source = data_cache.source_fingerprint(filepath)
+        
+        appended = segment_cases if segment_cases is not None else pd.DataFrame()
+        prefixes = {col: os.path.join(self.cache_dir, "text", f"case_{col}") for col in columns}
+        metas = {col: read_store_meta(prefixes[col]) or {} for col in columns}
+        stale = [col for col in columns
+                 if metas[col].get('source') != source or metas[col].get('appended', 0) > len(appended)]
+        
+        if stale:
+            print(f"📝 Đang tạo text store cho các cột {', '.join(stale)}...")
+            writers = {col: TextStoreWriter(prefixes[col]) for col in stale}
+            for chunk in pd.read_csv(filepath, encoding='utf-8-sig', usecols=stale,
+                                     chunksize=chunk_size):
+                for col, writer in writers.items():
+                    writer.extend(chunk[col])
+            for col, writer in writers.items():
+                writer.extend(appended[col] if col in appended.columns else [None] * len(appended))
+                writer.close(meta={'source': source, 'column': col, 'appended': len(appended)})
+                metas[col] = {'appended': len(appended)}
+        
+        for col in columns:
+            done = metas[col].get('appended', 0)
+            if done < len(appended):
+                missing = appended[col].iloc[done:] if col in appended.columns else [None] * (len(appended) - done)
+                self.text_stores[col] = append_to_store(prefixes[col], missing, {'appended': len(appended)})
+            else:
+                self.text_stores[col] = TextStore(prefixes[col])
+    
+    def iter_chunks(self, filename: str, chunk_size: int = 5000,
+                    columns: Optional[List[str]] = None,
+                    table: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """
+        Đọc một file CSV theo từng chunk, không giữ toàn bộ bảng trong RAM
+        
+        Args:
+            filename: Tên file trong data_dir (ví dụ case_data.csv)
+            chunk_size: Số dòng mỗi chunk
+            columns: Chỉ đọc các cột này, None là toàn bộ
+            table: Tên bảng trong schema (case, law, case_law); nếu có thì mọi
+                chunk có cùng kiểu cột như khi load() (vd article luôn là Int32,
+                kể cả chunk có NaN), None là để pandas tự suy kiểu từng chunk
+        """
+        filepath = os.path.join(self.data_dir, filename)
+        if not os.path.exists(filepath):
+            print(f"❌ Không tìm thấy file {filepath}")
+            return
+        
+        options = {}
+        if table is not None and self.use_schema:
+            header = pd.read_csv(filepath, encoding='utf-8-sig', nrows=0).columns
+            try:
+                options = schema.read_options(table, header, columns)
+            except schema.SchemaError as e:
+                print(f"⚠️ {e}, đọc {filename} không theo schema")
+        
+        for chunk in pd.read_csv(filepath, encoding='utf-8-sig', usecols=columns,
+                                 chunksize=chunk_size, **options):
+            for col in options.get('dtype', {}):
+                kind = schema.TABLE_SCHEMAS[table][col]
+                if kind in schema.NULLABLE_PARSE_DTYPES:
+                    chunk[col] = chunk[col].astype(kind)
+            yield chunk
+    
+    def get_case_texts(self, column: str = 'text', rows: Optional[List[int]] = None):
+        """
+        Lấy các văn bản của case_data theo vị trí dòng
+        
+        Ở chế độ lazy_text trả về TextView đọc từ text store memory-mapped,
+        ngược lại trả về Series tương ứng của case_data.
+        
+        Args:
+            column: Cột văn bản (content hoặc text)
+            rows: Danh sách vị trí dòng, None là toàn bộ
+        """
+        if column in self.text_stores:
+            return self.text_stores[column].view(rows)
+        
+        if self.case_data is None or column not in self.case_data.columns:
+            return pd.Series([], dtype=object)
+        texts = self.case_data[column].reset_index(drop=True)
+        return texts if rows is None else texts.take(np.asarray(rows))
+    
+    def get_memory_report(self) -> pd.DataFrame:
+        """Bộ nhớ của từng cột trong ba bảng (xem schema.memory_report)"""
+        return schema.memory_report({'case': self.case_data, 'law': self.law_data,
+                                     'case_law': self.case_law_data})
+    
     def get_data_info(self) -> Dict:
         """Lấy thông tin tổng quan về dữ liệu"""
         info = {}
@@ -90,12 +427,18 @@ class DataLoader:
         
         return info
     
-    def get_case_with_laws(self, case_id: int = None) -> pd.DataFrame:
+    def get_case_with_laws(self, case_id: int = None, include_text: bool = False) -> pd.DataFrame:
         """
         Lấy thông tin bản án kèm các điều luật được áp dụng
         
+        Kết quả giống phép merge case_data ⋈ case_law_data ⟕ law_data (cùng tên
+        cột: id_x/id_y cho id bản án/trích dẫn, id cho id điều luật, hậu tố
+        _law cho cột trùng tên của law_data) nhưng được dựng từ chỉ mục kề
+        case_law_index, không merge lại các bảng ở mỗi lần gọi.
+        
         Args:
             case_id: ID của bản án cụ thể, nếu None thì lấy tất cả
+            include_text: Có lấy kèm các cột văn bản (content, text) hay không
             
         Returns:
             DataFrame với thông tin bản án và điều luật
@@ -103,90 +446,191 @@ class DataLoader:
         if self.case_data is None or self.case_law_data is None:
             print("❌ Chưa load dữ liệu. Hãy gọi load_all_data() trước.")
             return pd.DataFrame()
+        if self.case_law_index is None:
+            self.build_indexes()
+        
+        index = self.case_law_index
+        if case_id is None:
+            case_rows, link_rows, law_rows = index.case_rows, index.link_rows, index.law_rows
+        else:
+            position = self.case_index.position(case_id)
+            case_rows, link_rows, law_rows = index.links_for_rows([] if position is None else [position])
         
-        # Merge case với case_law
-        merged = pd.merge(
-            self.case_data,
-            self.case_law_data,
-            left_on='id',
-            right_on='case_id',
-            how='inner'
-        )
+        # Tên cột như khi merge toàn bộ case_data (kể cả cột văn bản) với case_law và law
+        store_columns = [column for column in self.text_stores if column not in self.case_data.columns]
+        case_columns = list(self.case_data.columns) + store_columns
+        case_names, link_names = joined_columns(case_columns, list(self.case_law_data.columns), ('_x', '_y'))
+        case_names = dict(zip(case_columns, case_names))
         
-        # Merge với law để lấy thông tin điều luật
+        result = take_columns(self.case_data, case_rows,
+                              {column: case_names[column] for column in self.case_data.columns
+                               if include_text or column not in TEXT_COLUMNS})
+        if include_text:
+            for column in store_columns:
+                result[case_names[column]] = self.text_stores[column].view(case_rows).tolist()
+        result.update(take_columns(self.case_law_data, link_rows,
+                                   dict(zip(self.case_law_data.columns, link_names))))
         if self.law_data is not None:
-            merged = pd.merge(
-                merged,
-                self.law_data,
-                left_on='law_id',
-                right_on='id',
-                how='left',
-                suffixes=('', '_law')
-            )
-        
-        if case_id is not None:
-            merged = merged[merged['id'] == case_id]
-        
-        return merged
+            _, law_names = joined_columns(list(case_names.values()) + link_names,
+                                          list(self.law_data.columns), ('', '_law'))
+            result.update(take_columns(self.law_data, law_rows, dict(zip(self.law_data.columns, law_names))))
+        return pd.DataFrame(result)
+    
+    def get_statistics(self) -> Optional[StatisticsStore]:
+        """
+        Lấy các bảng thống kê dựng sẵn (xem statistics_store.py)
+        
+        Các bảng được lưu trong cache_dir/stats. Lần gọi đầu sau khi load chỉ
+        đếm thêm các dòng mới được nối vào cuối case_data/case_law_data (dựng
+        lại toàn bộ nếu phần dữ liệu cũ đã thay đổi, kể cả giá trị được sửa tại
+        chỗ như court_name), các lần sau trả về ngay.
+        """
+        if self.case_data is None and self.case_law_data is None:
+            return None
+        
+        directory = os.path.join(self.cache_dir, "stats")
+        if self.statistics is None:
+            self.statistics = StatisticsStore.load(directory) or StatisticsStore()
+            stale = True
+        else:
+            # Chỉ so số dòng: dữ liệu trong bộ nhớ có thể đã được nối thêm
+            stale = self.statistics.rows != {
+                'case': len(self.case_data) if self.case_data is not None else 0,
+                'case_law': len(self.case_law_data) if self.case_law_data is not None else 0,
+            }
+        if stale and self.statistics.refresh(self.case_data, self.case_law_data, self.case_index):
+            self.statistics.save(directory)
+        return self.statistics
     
     def get_law_statistics(self) -> Dict:
-        """Thống kê về việc sử dụng các điều luật"""
+        """Thống kê về việc sử dụng các điều luật (law_usage, type_usage, clause_usage, point_usage)"""
         if self.case_law_data is None:
             return {}
+        return self.get_statistics().law_statistics()
+    
+    def get_case_statistics(self) -> Dict:
+        """Thống kê về bản án (court_distribution, level_distribution, document_type_distribution)"""
+        if self.case_data is None:
+            return {}
+        return self.get_statistics().case_statistics()
+    
+    def get_crosstab(self, index, columns: Optional[str] = None,
+                     table: str = 'citations') -> pd.DataFrame:
+        """
+        Bảng chéo từ các khối đếm dựng sẵn, vd số lần áp dụng điều luật theo tòa án
         
-        stats = {}
-        
-        # Thống kê theo điều luật
-        law_counts = self.case_law_data['law_id'].value_counts()
-        stats['law_usage'] = law_counts.to_dict()
+        Args:
+            index: Chiều làm dòng ('law_id', 'article', 'type', 'court_name', ...)
+            columns: Chiều làm cột ('court_name', 'year', ...), None trả về Series
+            table: 'citations' (đếm trích dẫn) hoặc 'cases' (đếm bản án)
+            
+        Ví dụ:
+            loader.get_crosstab('article', 'court_name')
+            loader.get_crosstab('law_id', 'year')
+            loader.get_crosstab('court_name', 'year', table='cases')
+        """
+        store = self.get_statistics()
+        if store is None:
+            return pd.DataFrame()
+        return store.crosstab(index, columns, table=table)
+    
+    def get_duplicate_clusters(self, n_jobs: int = 1) -> Optional[np.ndarray]:
+        """
+        Cụm bản án gần trùng theo văn bản (MinHash + LSH, xem dedup.py)
         
-        # Thống kê theo loại điều luật
-        if 'type' in self.case_law_data.columns:
-            type_counts = self.case_law_data['type'].value_counts()
-            stats['type_usage'] = type_counts.to_dict()
+        Chữ ký MinHash được lưu trong cache_dir/dedup; chỉ các bản án nối
+        thêm vào cuối case_data (kể cả qua append_data()) và các bản án có văn
+        bản đã đổi so với lần lưu trước được tính chữ ký mới.
         
-        # Thống kê theo khoản, điểm
-        if 'clause' in self.case_law_data.columns:
-            clause_counts = self.case_law_data['clause'].value_counts()
-            stats['clause_usage'] = clause_counts.to_dict()
+        Args:
+            n_jobs: Số tiến trình tính chữ ký
+            
+        Returns:
+            Mảng vị trí dòng đại diện (dòng đứng trước nhất) của cụm chứa
+            từng dòng case_data; dòng không trùng với dòng nào trỏ về chính nó
+        """
+        if self.case_data is None:
+            return None
         
-        if 'point' in self.case_law_data.columns:
-            point_counts = self.case_law_data['point'].value_counts()
-            stats['point_usage'] = point_counts.to_dict()
+        directory = os.path.join(self.cache_dir, "dedup")
+        if self.dedup is None:
+            self.dedup = MinHashIndex.load(directory)
+            stale = verify = True
+        else:
+            # Trong phiên chỉ có thể nối thêm dòng (append_data), phần cũ không cần so lại
+            stale, verify = self.dedup.rows != len(self.case_data), False
+        if stale:
+            added = self.dedup.refresh(self.case_data['id'], self.get_case_texts('text'), n_jobs,
+                                       verify=verify)
+            if added:
+                print(f"🔏 Đã tính chữ ký MinHash cho {added:,} bản án")
+                self.dedup.save(directory)
+        return self.dedup.clusters()
+    
+    def get_deduplicated_cases(self, n_jobs: int = 1) -> pd.DataFrame:
+        """
+        case_data chỉ giữ bản án đại diện của mỗi cụm gần trùng
         
-        return stats
+        Bản án đại diện là bản án đứng trước nhất trong case_data; các bản án
+        đăng lại (khác case_number/url/file nhưng gần trùng văn bản) bị bỏ.
+        """
+        clusters = self.get_duplicate_clusters(n_jobs)
+        if clusters is None:
+            return pd.DataFrame()
+        return self.case_data[clusters == np.arange(len(clusters))]
     
-    def get_case_statistics(self) -> Dict:
-        """Thống kê về bản án"""
-        if self.case_data is None:
-            return {}
+    def get_search_index(self, column: str = 'text',
+                         fold_diacritics: bool = False) -> Optional[InvertedIndex]:
+        """
+        Lấy chỉ mục ngược của một cột văn bản trong case_data
         
-        stats = {}
+        Chỉ mục được lưu trong cache_dir/search và chỉ xây lại khi file
+        case_data.csv thay đổi.
         
-        # Thống kê theo loại tòa án
-        if 'court_name' in self.case_data.columns:
-            court_counts = self.case_data['court_name'].value_counts()
-            stats['court_distribution'] = court_counts.to_dict()
+        Args:
+            column: Cột cần đánh chỉ mục (text, case_name, ...)
+            fold_diacritics: Chỉ mục không phân biệt dấu tiếng Việt
+        """
+        if self.case_data is None:
+            return None
+        if column not in self.text_stores and column not in self.case_data.columns:
+            return None
         
-        # Thống kê theo cấp độ
-        if 'case_level' in self.case_data.columns:
-            level_counts = self.case_data['case_level'].value_counts()
-            stats['level_distribution'] = level_counts.to_dict()
+        key = (column, fold_diacritics)
+        if key in self.search_indexes:
+            return self.search_indexes[key]
         
-        # Thống kê theo loại văn bản
-        if 'document_type' in self.case_data.columns:
-            doc_counts = self.case_data['document_type'].value_counts()
-            stats['document_type_distribution'] = doc_counts.to_dict()
+        case_file = os.path.join(self.data_dir, "case_data.csv")
+        source = data_cache.source_fingerprint(case_file) if os.path.exists(case_file) else None
+        directory = os.path.join(self.cache_dir, "search",
+                                 f"{column}_fold" if fold_diacritics else column)
         
-        return stats
+        index = InvertedIndex.load(directory) if source is not None else None
+        if (index is None or index.meta.get('source') != source
+                or index.num_rows != len(self.case_data)):
+            print(f"📚 Đang xây chỉ mục tìm kiếm cho cột '{column}'...")
+            index = InvertedIndex.build(self.get_case_texts(column), fold_diacritics,
+                                        meta={'source': source, 'column': column})
+            if source is not None:
+                index.save(directory)
+        
+        self.search_indexes[key] = index
+        return index
     
-    def search_cases(self, keyword: str, column: str = 'text') -> pd.DataFrame:
+    def search_cases(self, keyword: str, column: str = 'text', use_index: bool = False,
+                     fold_diacritics: bool = False, page: int = 1,
+                     page_size: Optional[int] = None) -> pd.DataFrame:
         """
         Tìm kiếm bản án theo từ khóa
         
         Args:
-            keyword: Từ khóa tìm kiếm
+            keyword: Từ khóa tìm kiếm (regex khi không dùng chỉ mục)
             column: Cột để tìm kiếm (mặc định là 'text')
+            use_index: Dùng chỉ mục ngược, keyword là truy vấn theo âm tiết
+                hỗ trợ AND/OR/"cụm từ" (xem search_index.py)
+            fold_diacritics: Khi dùng chỉ mục, tìm kiếm không phân biệt dấu
+            page: Trang kết quả khi dùng chỉ mục (bắt đầu từ 1)
+            page_size: Số bản án mỗi trang, None là trả về tất cả
             
         Returns:
             DataFrame chứa các bản án thỏa mãn
@@ -194,6 +638,25 @@ class DataLoader:
         if self.case_data is None:
             return pd.DataFrame()
         
+        if use_index:
+            index = self.get_search_index(column, fold_diacritics)
+            if index is None:
+                print(f"❌ Cột '{column}' không tồn tại")
+                return pd.DataFrame()
+            rows, total = index.search(keyword, texts=self.get_case_texts(column),
+                                       page=page, page_size=page_size)
+            print(f"🔍 Tìm thấy {total} bản án khớp truy vấn '{keyword}'")
+            return self.case_data.iloc[rows]
+        
+        if column in self.text_stores:
+            # Duyệt tuần tự text store, mỗi lần chỉ giải mã một văn bản
+            pattern = re.compile(keyword, re.IGNORECASE)
+            rows = [row for row, text in enumerate(self.text_stores[column].view())
+                    if pattern.search(text)]
+            results = self.case_data.iloc[rows]
+            print(f"🔍 Tìm thấy {len(results)} bản án chứa từ khóa '{keyword}'")
+            return results
+        
         if column not in self.case_data.columns:
             print(f"❌ Cột '{column}' không tồn tại")
             return pd.DataFrame()
@@ -207,24 +670,66 @@ class DataLoader:
     
     def get_law_by_id(self, law_id: int) -> Dict:
         """Lấy thông tin điều luật theo ID"""
-        if self.law_data is None:
+        if self.law_data is None or self.law_index is None:
             return {}
         
-        law = self.law_data[self.law_data['id'] == law_id]
-        if len(law) > 0:
-            return law.iloc[0].to_dict()
+        position = self.law_index.position(law_id)
+        if position is not None:
+            return self.law_data.iloc[position].to_dict()
         return {}
     
     def get_case_by_id(self, case_id: int) -> Dict:
         """Lấy thông tin bản án theo ID"""
-        if self.case_data is None:
+        if self.case_data is None or self.case_index is None:
             return {}
         
-        case = self.case_data[self.case_data['id'] == case_id]
-        if len(case) > 0:
-            return case.iloc[0].to_dict()
+        position = self.case_index.position(case_id)
+        if position is not None:
+            record = self.case_data.iloc[position].to_dict()
+            for column, store in self.text_stores.items():
+                record[column] = store.get(position)
+            return record
         return {}
-
+    
+    def get_laws_by_ids(self, law_ids: List[int]) -> pd.DataFrame:
+        """
+        Lấy nhiều điều luật theo danh sách ID trong một lần truy cập
+        
+        Args:
+            law_ids: Danh sách ID điều luật
+            
+        Returns:
+            DataFrame theo thứ tự law_ids, bỏ qua các ID không tồn tại
+        """
+        if self.law_data is None or self.law_index is None:
+            return pd.DataFrame()
+        
+        positions = self.law_index.positions(law_ids)
+        return self.law_data.iloc[positions[positions >= 0]]
+    
+    def get_cases_by_ids(self, case_ids: List[int], include_text: bool = True) -> pd.DataFrame:
+        """
+        Lấy nhiều bản án theo danh sách ID trong một lần truy cập
+        
+        Args:
+            case_ids: Danh sách ID bản án
+            include_text: Ở chế độ lazy_text, có đọc kèm các cột văn bản hay không
+            
+        Returns:
+            DataFrame theo thứ tự case_ids, bỏ qua các ID không tồn tại
+        """
+        if self.case_data is None or self.case_index is None:
+            return pd.DataFrame()
+        
+        positions = self.case_index.positions(case_ids)
+        positions = positions[positions >= 0]
+        cases = self.case_data.iloc[positions]
+        
+        if include_text and self.text_stores:
+            cases = cases.copy()
+            for column, store in self.text_stores.items():
+                cases[column] = store.view(positions).tolist()
+        return cases
 
 def main():
     """Test function"""
@@ -0,0 +1,304 @@
+"""
+Module phát hiện bản án gần trùng bằng MinHash + LSH
+
+Cùng một bản án có thể được đăng lại nhiều lần với case_number/url/file
+khác nhau. Mỗi văn bản được tách âm tiết (như search_index.tokenize), lấy
+các shingle SHINGLE_SIZE âm tiết liền nhau rồi tính chữ ký MinHash NUM_PERM
+hàm băm: tỷ lệ vị trí trùng nhau của hai chữ ký xấp xỉ độ tương đồng Jaccard
+của hai tập shingle.
+
+LSH chia chữ ký thành BANDS dải; hai bản án trùng nguyên một dải được đưa
+vào cùng bucket và trở thành cặp ứng viên, nên chỉ các cặp ứng viên (thay vì
+mọi cặp) được so sánh chữ ký. Cặp có Jaccard ước lượng ≥ THRESHOLD được nối
+thành cụm (thành phần liên thông); bản án đứng trước nhất trong case_data là
+đại diện của cụm.
+
+Chữ ký được lưu trong cache_dir/dedup:
+
+    signatures.npy - uint32 (số bản án × NUM_PERM), theo thứ tự dòng case_data
+    digests.npy    - hash BLAKE2b 16 byte của văn bản từng dòng (text_digests)
+    meta.json      - số dòng và tham số MinHash
+
+Chỉ các dòng mới nối thêm vào cuối case_data và các dòng có văn bản đã đổi
+(hash khác hash đã lưu, vd văn bản được sửa lỗi) được tính lại chữ ký.
+"""
+
+import itertools
+import json
+import multiprocessing
+import os
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from search_index import tokenize
+
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_SIZE = 5
+THRESHOLD = 0.8
+SEED = 1
+
+# Chữ ký của văn bản rỗng, không được coi là trùng với văn bản rỗng khác
+EMPTY = np.uint32(0xFFFFFFFF)
+SHINGLE_BASE = np.uint64(0x100000001B3)
+
+
+def _permutations(num_perm: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hệ số (a lẻ, b) 64 bit của các hàm băm multiply-shift ((a·x + b) mod 2^64) >> 32"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, np.iinfo(np.int64).max, num_perm, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+    return a, rng.integers(0, np.iinfo(np.int64).max, num_perm, dtype=np.int64).astype(np.uint64)
+
+
+def shingle_hashes(texts: Iterable[str], shingle_size: int = SHINGLE_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Băm 32 bit của các shingle (shingle_size âm tiết liền nhau) của nhiều văn bản
+
+    Các âm tiết của cả lô được mã hóa một lần (pd.factorize), băm âm tiết dùng
+    crc32 nên ổn định giữa các tiến trình và các lần chạy. Văn bản ngắn hơn
+    shingle_size âm tiết có một shingle là toàn bộ văn bản.
+
+    Returns:
+        Tuple (băm shingle của mọi văn bản nối liền, số shingle của từng văn bản)
+    """
+    tokens = [tokenize(text) for text in texts]
+    lengths = np.fromiter((len(item) for item in tokens), dtype=np.int64, count=len(tokens))
+    if lengths.sum() == 0:
+        return np.empty(0, dtype=np.uint32), np.zeros(len(tokens), dtype=np.int64)
+    codes, uniques = pd.factorize(np.fromiter(itertools.chain.from_iterable(tokens), dtype=object,
+                                              count=int(lengths.sum())))
+    hashes = np.fromiter((zlib.crc32(token.encode()) for token in uniques), dtype=np.uint64,
+                         count=len(uniques))[codes]
+
+    # Cửa sổ bắt đầu tại i thuộc văn bản d nếu i + width(d) <= cuối văn bản d
+    widths = np.minimum(lengths, shingle_size)
+    counts = np.where(lengths > 0, lengths - widths + 1, 0)
+    doc_starts = np.cumsum(lengths) - lengths
+    window_starts = np.repeat(doc_starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    window_widths = np.repeat(widths, counts)
+    combined = hashes[window_starts]
+    for offset in range(1, shingle_size):
+        inside = window_widths > offset
+        combined[inside] = combined[inside] * SHINGLE_BASE + hashes[window_starts[inside] + offset]
+    return ((combined >> np.uint64(32)) ^ combined).astype(np.uint32), counts
+
+
+def minhash_signatures(texts: Iterable[str], num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE,
+                       seed: int = SEED, perm_block: int = 8, max_shingles: int = 1 << 20) -> np.ndarray:
+    """
+    Chữ ký MinHash của một dãy văn bản
+
+    Văn bản được gom thành nhóm khoảng max_shingles shingle; với mỗi khối
+    perm_block hàm băm, giá trị băm của cả nhóm được tính tại chỗ trong một
+    bộ đệm (perm_block × max_shingles) rồi lấy min theo từng văn bản
+    (minimum.reduceat).
+
+    Returns:
+        Mảng uint32 (số văn bản × num_perm); văn bản rỗng có chữ ký EMPTY
+    """
+    values, counts = shingle_hashes(texts, shingle_size)
+    signatures = np.full((len(counts), num_perm), EMPTY, dtype=np.uint32)
+    values = values.astype(np.uint64)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    a, b = _permutations(num_perm, seed)
+    shift = np.uint64(32)
+
+    first_doc = 0
+    while first_doc < len(counts):
+        end_doc = max(first_doc + 1, int(np.searchsorted(offsets, offsets[first_doc] + max_shingles, 'right')) - 1)
+        end_doc = min(end_doc, len(counts))
+        filled = first_doc + np.flatnonzero(counts[first_doc:end_doc] > 0)
+        if len(filled):
+            group = values[offsets[first_doc]:offsets[end_doc]]
+            starts = offsets[filled] - offsets[first_doc]
+            buffer = np.empty((perm_block, len(group)), dtype=np.uint64)
+            for first in range(0, num_perm, perm_block):
+                block = slice(first, min(first + perm_block, num_perm))
+                hashed = buffer[:block.stop - block.start]
+                np.multiply(a[block, None], group[None, :], out=hashed)
+                np.add(hashed, b[block, None], out=hashed)
+                np.right_shift(hashed, shift, out=hashed)
+                signatures[filled, block] = np.minimum.reduceat(hashed, starts, axis=1).T
+        first_doc = end_doc
+    return signatures
+
+
+def _signature_task(task: Tuple[List[str], int, int, int]) -> np.ndarray:
+    texts, num_perm, shingle_size, seed = task
+    return minhash_signatures(texts, num_perm, shingle_size, seed)
+
+
+class MinHashIndex:
+    """Chữ ký MinHash của case_data và các cụm bản án gần trùng"""
+
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS, shingle_size: int = SHINGLE_SIZE,
+                 threshold: float = THRESHOLD, seed: int = SEED):
+        """
+        Args:
+            num_perm: Số hàm băm MinHash (độ dài chữ ký)
+            bands: Số dải LSH, num_perm phải chia hết cho bands
+            shingle_size: Số âm tiết mỗi shingle
+            threshold: Jaccard ước lượng tối thiểu để coi là gần trùng
+            seed: Seed sinh các hàm băm
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) phải chia hết cho bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.seed = seed
+        self.signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self.digests = np.empty(0, dtype='S16')
+        self.meta: Dict = {}
+        self._clusters: Optional[np.ndarray] = None
+
+    @property
+    def rows(self) -> int:
+        return len(self.signatures)
+
+    def _params(self) -> Dict:
+        # Chữ ký chỉ dùng lại được khi cùng cách tách shingle và cùng các hàm băm
+        return {'num_perm': self.num_perm, 'shingle_size': self.shingle_size, 'seed': self.seed}
+
+    def refresh(self, ids: pd.Series, texts, n_jobs: int = 1, chunk_size: int = 2000,
+                verify: bool = True) -> int:
+        """
+        Tính chữ ký cho các dòng chưa có hoặc có văn bản đã đổi
+
+        Args:
+            ids: Cột id của case_data
+            texts: Văn bản theo thứ tự dòng (Series hoặc TextView)
+            n_jobs: Số tiến trình tính chữ ký
+            chunk_size: Số văn bản mỗi tác vụ
+            verify: So hash văn bản của các dòng đã có chữ ký; False khi biết chắc
+                phần đó không đổi (chỉ nối thêm dòng trong cùng phiên)
+
+        Returns:
+            Số dòng vừa được tính chữ ký
+        """
+        # Import khi cần: token_cache kéo theo sklearn, không cần cho phần còn lại của DataLoader
+        from models.token_cache import text_digests
+
+        known = min(self.rows, len(ids))
+        if self.meta.get('params') != self._params():
+            known = 0
+        start = 0 if verify else known
+        digests = np.concatenate([self.digests[:start]] + [
+            text_digests(texts.take(np.arange(first, min(first + chunk_size, len(ids)))))
+            for first in range(start, len(ids), chunk_size)])
+        stale = np.concatenate([np.flatnonzero(digests[:known] != self.digests[:known]),
+                                np.arange(known, len(ids))])
+        if len(stale) == 0 and self.rows == len(ids):
+            return 0
+
+        tasks = [(list(texts.take(stale[first:first + chunk_size])),
+                  self.num_perm, self.shingle_size, self.seed)
+                 for first in range(0, len(stale), chunk_size)]
+        if n_jobs <= 1 or len(tasks) <= 1:
+            parts = [_signature_task(task) for task in tasks]
+        else:
+            with multiprocessing.get_context().Pool(min(n_jobs, len(tasks))) as pool:
+                parts = pool.map(_signature_task, tasks)
+
+        signatures = np.empty((len(ids), self.num_perm), dtype=np.uint32)
+        signatures[:known] = self.signatures[:known]
+        if parts:
+            signatures[stale] = np.vstack(parts)
+        self.signatures, self.digests = signatures, digests
+        self.meta = {'rows': self.rows, 'params': self._params()}
+        self._clusters = None
+        return len(stale)
+
+    def candidate_pairs(self) -> np.ndarray:
+        """
+        Các cặp dòng (i < j) cùng bucket ở ít nhất một dải LSH
+
+        Mọi cặp trong cùng bucket đều được sinh: bucket có thể lẫn dòng chỉ
+        trùng dải do ngẫu nhiên, nên nếu chỉ ghép nối tiếp thì khi các cặp đó
+        bị loại theo threshold, hai dòng thật sự gần trùng cùng bucket sẽ
+        không còn được nối với nhau.
+        """
+        width = self.num_perm // self.bands
+        signed = np.flatnonzero(self.signatures[:, 0] != EMPTY)
+        multipliers = np.random.default_rng(self.seed).integers(1, 1 << 63, width, dtype=np.uint64) | np.uint64(1)
+        pairs = []
+        for band in range(self.bands):
+            columns = self.signatures[signed, band * width:(band + 1) * width].astype(np.uint64)
+            keys = (columns * multipliers).sum(axis=1, dtype=np.uint64)
+            order = np.argsort(keys, kind='stable')
+            same = keys[order][1:] == keys[order][:-1]
+            if not same.any():
+                continue
+            run_start = np.maximum.accumulate(np.where(np.concatenate([[False], same]), 0, np.arange(len(order))))
+            rows = signed[order]
+            # Ghép dòng thứ i của bucket với dòng i + offset còn trong cùng bucket
+            for offset in range(1, int((np.arange(len(order)) - run_start).max()) + 1):
+                later = np.flatnonzero(run_start[offset:] <= np.arange(len(order) - offset)) + offset
+                pairs.append(np.column_stack([rows[later - offset], rows[later]]))
+        if not pairs:
+            return np.empty((0, 2), dtype=np.int64)
+        pairs = np.sort(np.vstack(pairs), axis=1)
+        return np.unique(pairs[pairs[:, 0] != pairs[:, 1]], axis=0)
+
+    def similarity(self, pairs: np.ndarray) -> np.ndarray:
+        """Jaccard ước lượng (tỷ lệ vị trí chữ ký trùng nhau) của các cặp dòng"""
+        if len(pairs) == 0:
+            return np.empty(0, dtype=np.float64)
+        return (self.signatures[pairs[:, 0]] == self.signatures[pairs[:, 1]]).mean(axis=1)
+
+    def duplicate_pairs(self) -> pd.DataFrame:
+        """Các cặp dòng gần trùng: row, other_row (row < other_row), similarity"""
+        pairs = self.candidate_pairs()
+        scores = self.similarity(pairs)
+        keep = scores >= self.threshold
+        return pd.DataFrame({'row': pairs[keep, 0], 'other_row': pairs[keep, 1], 'similarity': scores[keep]})
+
+    def clusters(self) -> np.ndarray:
+        """
+        Dòng đại diện của cụm gần trùng chứa từng dòng
+
+        Returns:
+            Mảng int64 độ dài rows; dòng không trùng với dòng nào là đại diện của chính nó
+        """
+        if self._clusters is None:
+            pairs = self.duplicate_pairs()
+            graph = sparse.csr_matrix((np.ones(len(pairs), dtype=np.int8), (pairs['row'], pairs['other_row'])),
+                                      shape=(self.rows, self.rows))
+            _, labels = connected_components(graph, directed=False)
+            representatives = np.full(labels.max() + 1 if len(labels) else 0, self.rows, dtype=np.int64)
+            np.minimum.at(representatives, labels, np.arange(self.rows))
+            self._clusters = representatives[labels]
+        return self._clusters
+
+    def save(self, directory: str):
+        """Lưu chữ ký ra thư mục"""
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, 'meta.json')
+        # Xóa meta cũ trước để bản ghi dở không bị coi là hợp lệ
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        np.save(os.path.join(directory, 'signatures.npy'), self.signatures)
+        np.save(os.path.join(directory, 'digests.npy'), self.digests)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, indent=2)
+
+    @classmethod
+    def load(cls, directory: str, **params) -> 'MinHashIndex':
+        """Load chữ ký đã lưu; chưa có hoặc hỏng thì trả về chỉ mục rỗng"""
+        index = cls(**params)
+        try:
+            with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            signatures = np.load(os.path.join(directory, 'signatures.npy'))
+            digests = np.load(os.path.join(directory, 'digests.npy'))
+        except (OSError, ValueError):
+            return index
+        if meta.get('params') == index._params() and len(signatures) == len(digests) == meta.get('rows'):
+            index.signatures, index.digests, index.meta = signatures, digests, meta
+        return index
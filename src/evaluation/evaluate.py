@@ -0,0 +1,227 @@
+"""
+Module đánh giá xếp hạng điều luật theo các mức k của EVAL_CONFIG
+
+Mỗi dòng của ma trận điểm (bản án × nhãn) chỉ được xếp hạng một lần tới
+max(k). Từ ma trận "trúng" (hit) của các hạng, tổng tích lũy theo hạng cho
+ngay số nhãn đúng tại mọi k, nên tất cả chỉ số ở mọi k được tính trong một
+lượt. Dữ liệu được xử lý theo từng chunk dòng để giới hạn bộ nhớ.
+
+Các chỉ số tại k, với rel_r = 1 nếu nhãn ở hạng r đúng và G là tập nhãn đúng:
+    precision@k = Σ_{r≤k} rel_r / k
+    recall@k    = Σ_{r≤k} rel_r / |G|
+    f1@k        = trung bình điều hòa của precision@k và recall@k
+    map@k       = trung bình AP@k = Σ_{r≤k} rel_r · precision@r / min(|G|, k)
+    mar@k       = trung bình AR@k = Σ_{r≤k} rel_r · recall@r / |G|
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from data.config import EVAL_CONFIG
+from models.ranking import top_k
+
+
+def build_ground_truth(case_law_data: pd.DataFrame, case_ids: np.ndarray,
+                       labels: Iterable[str]) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    Tạo ma trận nhãn đúng (bản án × nhãn) từ case_law_data
+
+    Args:
+        case_law_data: Bảng case_law (case_id, article, ...)
+        case_ids: ID các bản án theo thứ tự dòng của ma trận điểm
+        labels: Tên nhãn (article) theo thứ tự cột của ma trận điểm
+
+    Returns:
+        Tuple (ma trận chỉ thị CSR, số điều luật đúng của mỗi bản án).
+        Số điều luật đúng tính cả các điều không có trong labels.
+    """
+    case_ids = pd.Index(case_ids)
+    label_index = pd.Index(np.asarray(labels, dtype=str))
+
+    pairs = case_law_data.dropna(subset=['article'])[['case_id', 'article']]
+    pairs = pairs.assign(article=pairs['article'].astype(str)).drop_duplicates()
+
+    rows = case_ids.get_indexer(pairs['case_id'])
+    pairs, rows = pairs[rows >= 0], rows[rows >= 0]
+    sizes = np.bincount(rows, minlength=len(case_ids))
+
+    cols = label_index.get_indexer(pairs['article'])
+    known = cols >= 0
+    truth = sparse.csr_matrix(
+        (np.ones(known.sum(), dtype=bool), (rows[known], cols[known])),
+        shape=(len(case_ids), len(label_index)),
+    )
+    return truth, sizes
+
+
+def evaluate_rankings(scores: np.ndarray, truth: sparse.csr_matrix,
+                      truth_sizes: Optional[np.ndarray] = None,
+                      k_values: Optional[List[int]] = None,
+                      chunk_size: int = 1000) -> Dict:
+    """
+    Tính precision/recall/F1/MAP/MAR tại mọi k trong một lượt
+
+    Args:
+        scores: Ma trận điểm (bản án × nhãn), có thể là np.memmap
+        truth: Ma trận chỉ thị nhãn đúng cùng kích thước
+        truth_sizes: Số nhãn đúng của mỗi bản án, mặc định đếm từ truth
+        k_values: Các mức k, mặc định EVAL_CONFIG['k_values']
+        chunk_size: Số bản án xử lý mỗi lần
+
+    Returns:
+        Dict {metric: {k: giá trị}} cùng số bản án được đánh giá
+    """
+    k_values = sorted(k_values or EVAL_CONFIG['k_values'])
+    n_rows, n_labels = scores.shape
+    max_k = min(k_values[-1], n_labels)
+    ranks = np.arange(1, max_k + 1)
+    # Vị trí trong mảng tích lũy của từng k, k vượt số nhãn dùng hạng cuối
+    k_pos = np.minimum(np.asarray(k_values), max_k) - 1
+    k_arr = np.asarray(k_values, dtype=np.float64)
+
+    if truth_sizes is None:
+        truth_sizes = np.diff(truth.indptr)
+    truth_sizes = np.asarray(truth_sizes)
+
+    totals = {metric: np.zeros(len(k_values)) for metric in ('precision', 'recall', 'f1', 'map', 'mar')}
+    n_evaluated = 0
+
+    for start in range(0, n_rows, chunk_size):
+        end = min(start + chunk_size, n_rows)
+        sizes = truth_sizes[start:end]
+        valid = sizes > 0
+        if not valid.any():
+            continue
+
+        chunk_scores = np.asarray(scores[start:end])[valid]
+        chunk_truth = truth[start:end][valid].toarray()
+        sizes = sizes[valid].astype(np.float64)[:, None]
+
+        top_indices, _ = top_k(chunk_scores, max_k)
+        hits = np.take_along_axis(chunk_truth, top_indices, axis=1).astype(np.float64)
+        cum_hits = np.cumsum(hits, axis=1)
+
+        precision_r = cum_hits / ranks
+        recall_r = cum_hits / sizes
+        cum_ap = np.cumsum(hits * precision_r, axis=1)
+        cum_ar = np.cumsum(hits * recall_r, axis=1)
+
+        precision = cum_hits[:, k_pos] / k_arr
+        recall = recall_r[:, k_pos]
+        denom = precision + recall
+        f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(denom), where=denom > 0)
+
+        totals['precision'] += precision.sum(axis=0)
+        totals['recall'] += recall.sum(axis=0)
+        totals['f1'] += f1.sum(axis=0)
+        totals['map'] += (cum_ap[:, k_pos] / np.minimum(sizes, k_arr)).sum(axis=0)
+        totals['mar'] += (cum_ar[:, k_pos] / sizes).sum(axis=0)
+        n_evaluated += len(sizes)
+
+    report = {'n_cases': n_evaluated, 'k_values': k_values}
+    for metric in EVAL_CONFIG['metrics']:
+        values = totals[metric] / max(n_evaluated, 1)
+        report[metric] = {int(k): float(v) for k, v in zip(k_values, values)}
+    return report
+
+
+def merge_reports(reports: List[Dict]) -> Dict:
+    """
+    Gộp các báo cáo của nhiều phần dữ liệu (ví dụ từng chunk khi đánh giá streaming)
+
+    Các chỉ số là trung bình theo bản án nên được gộp bằng trung bình có
+    trọng số n_cases, cho kết quả bằng đánh giá trên toàn bộ dữ liệu.
+    """
+    reports = [report for report in reports if report['n_cases'] > 0]
+    if not reports:
+        return {'n_cases': 0, 'k_values': [], **{metric: {} for metric in EVAL_CONFIG['metrics']}}
+
+    n_cases = sum(report['n_cases'] for report in reports)
+    merged = {'n_cases': n_cases, 'k_values': reports[0]['k_values']}
+    for metric in EVAL_CONFIG['metrics']:
+        merged[metric] = {
+            k: sum(report[metric][k] * report['n_cases'] for report in reports) / n_cases
+            for k in merged['k_values']
+        }
+    return merged
+
+
+def save_report(report: Dict, filepath: str):
+    """Lưu báo cáo đánh giá ra file JSON"""
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ Đã lưu báo cáo đánh giá vào {filepath}")
+
+
+def print_report(report: Dict, k_values: Optional[List[int]] = None):
+    """In tóm tắt báo cáo tại một số mức k"""
+    k_values = k_values or [k for k in (5, 10, 20, 50, 100, 200) if k in report['k_values']]
+    print(f"\n📈 ĐÁNH GIÁ XẾP HẠNG ({report['n_cases']:,} bản án):")
+    print("=" * 60)
+    header = "  k    " + "".join(f"{metric:>10s}" for metric in EVAL_CONFIG['metrics'])
+    print(header)
+    for k in k_values:
+        row = "".join(f"{report[metric][k]:10.4f}" for metric in EVAL_CONFIG['metrics'])
+        print(f"  {k:<5d}{row}")
+
+
+def main():
+    """Đánh giá mô hình đã lưu trên tập test lúc train (LawClassifier.test_case_ids)"""
+    from data_loader import DataLoader
+    from models.law_classifier import LawClassifier
+
+    parser = argparse.ArgumentParser(description="Đánh giá xếp hạng điều luật theo EVAL_CONFIG")
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--model', default='models/law_classifier')
+    parser.add_argument('--output', default='reports/evaluation.json')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    loader = DataLoader(args.data_dir)
+    if not loader.load_all_data():
+        print("❌ Không thể load dữ liệu")
+        return
+
+    classifier = LawClassifier()
+    classifier.load_model(args.model)
+    if not classifier.is_trained:
+        return
+
+    case_ids = loader.case_data['id'].to_numpy()
+    if classifier.test_case_ids is None:
+        print("⚠️ Mô hình không lưu tập test, đánh giá trên mọi bản án (kể cả bản án đã dùng để train)")
+        rows = np.arange(len(case_ids))
+    else:
+        rows = np.flatnonzero(np.isin(case_ids, classifier.test_case_ids))
+        print(f"📊 Đánh giá trên {len(rows):,} bản án của tập test")
+    labels = classifier.label_encoder.classes_
+    truth, sizes = build_ground_truth(loader.case_law_data, case_ids[rows], labels)
+
+    # Chấm điểm và đánh giá từng chunk, không giữ cả ma trận điểm bản án × nhãn
+    texts = loader.get_case_texts('text', rows)
+    reports = []
+    for start in range(0, len(rows), args.chunk_size):
+        end = start + args.chunk_size
+        scores = classifier.predict_scores(classifier.vectorizer.transform(texts[start:end]))
+        reports.append(evaluate_rankings(scores, truth[start:end], sizes[start:end]))
+
+    report = merge_reports(reports)
+    print_report(report)
+    save_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Trích xuất trích dẫn điều luật từ văn bản bản án bằng luật (regex)
+
+Các mẫu trong LAW_PATTERNS (điều / khoản / điểm / law_type) được ghép thành
+một regex duy nhất với các nhóm có tên, mỗi mẫu được mở rộng để nhận cả danh
+sách và khoảng ("điểm a, b", "khoản 1 và 2", "Điều 51 - 53"). Mỗi văn bản
+chỉ được quét một lần; các token tìm được đi qua một máy trạng thái theo thứ
+tự trích dẫn của văn bản pháp lý tiếng Việt:
+
+    điểm a, b khoản 1 Điều 51; khoản 2 Điều 173 Bộ luật Hình sự
+
+điểm gắn với khoản đứng sau, khoản gắn với Điều đứng sau, và loại luật gắn
+với các Điều chưa có loại luật đứng trước nó. Hai token cách nhau quá
+MAX_GAP ký tự thì không được nối vào cùng một trích dẫn.
+
+Kết quả theo schema của case_law_data: id, case_id, law_id, point, clause,
+article, type.
+
+Cách chạy:
+    python src/extraction/law_extractor.py --data-dir data_export \\
+        --output data_export/extracted_case_law.csv --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+import time
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from data.config import LAW_PATTERNS, LAW_TYPES
+
+CASE_LAW_COLUMNS = ['id', 'case_id', 'law_id', 'point', 'clause', 'article', 'type']
+
+# Khoảng cách tối đa (ký tự) giữa hai token của cùng một trích dẫn
+MAX_GAP = 80
+# Khoảng "Điều 51 - 60" dài hơn giới hạn này bị coi là nhiễu, chỉ giữ hai đầu
+MAX_RANGE = 50
+
+LIST_SEPARATOR = r'\s*(?:,|;|và|hoặc)\s*'
+RANGE_SEPARATOR = r'\s*(?:-|–|đến)\s*'
+RANGE_PATTERN = re.compile(RANGE_SEPARATOR)
+SPLIT_PATTERN = re.compile(LIST_SEPARATOR)
+
+
+def _list_pattern(pattern: str, name: str) -> str:
+    """
+    Mở rộng mẫu 'tiền tố(nguyên tử)' của LAW_PATTERNS thành danh sách/khoảng
+
+    Ví dụ r'điều\\s+(\\d+)' -> r'điều\\s+(?P<article>\\d+(?:(?:,|và|-|...)\\d+)*)'
+    """
+    match = re.fullmatch(r'(.*)\((.*)\)', pattern)
+    prefix, atom = match.groups()
+    # Nguyên tử kết thúc ở ranh giới từ để "điểm a" không ăn vào chữ tiếp theo
+    atom = rf'(?:{atom})(?!\w)'
+    separator = rf'(?:{LIST_SEPARATOR}|{RANGE_SEPARATOR})'
+    return rf'{prefix.lower()}(?P<{name}>{atom}(?:{separator}{atom})*)'
+
+
+def _law_type_codes() -> Dict[str, str]:
+    """Ánh xạ cách viết (chữ thường) của loại luật -> mã (BLHS, BLTTHS, BLTHAHS)"""
+    codes = {}
+    for code, name in LAW_TYPES.items():
+        codes[code.lower()] = code
+        codes[f"bộ luật {name}"] = code
+    return codes
+
+
+def build_scanner() -> re.Pattern:
+    """
+    Ghép LAW_PATTERNS thành một regex duy nhất với các nhóm point/clause/article/law_type
+
+    Regex dùng chữ thường và được chạy trên văn bản đã lower(), nhanh hơn
+    nhiều so với re.IGNORECASE trên Unicode. Kiểm tra ranh giới từ phía
+    trước chỉ làm một lần cho cả bốn nhánh.
+    """
+    alternatives = [
+        _list_pattern(LAW_PATTERNS['point'], 'point'),
+        _list_pattern(LAW_PATTERNS['clause'], 'clause'),
+        _list_pattern(LAW_PATTERNS['article'], 'article'),
+        rf"(?P<law_type>{LAW_PATTERNS['law_type'][1:-1].lower()})(?!\w)",
+    ]
+    return re.compile(r'(?<!\w)(?:' + '|'.join(alternatives) + ')')
+
+
+SCANNER = build_scanner()
+LAW_TYPE_CODES = _law_type_codes()
+
+
+def _expand(values: str, numeric: bool) -> List[str]:
+    """Tách danh sách 'a, b và c' / khoảng '51 - 53' thành từng giá trị"""
+    result = []
+    for part in SPLIT_PATTERN.split(values):
+        bounds = RANGE_PATTERN.split(part)
+        if len(bounds) == 2 and all(bounds):
+            start, end = bounds
+            if numeric:
+                start, end = int(start), int(end)
+                if 0 <= end - start <= MAX_RANGE:
+                    result.extend(str(value) for value in range(start, end + 1))
+                    continue
+            elif len(start) == 1 and len(end) == 1 and 0 <= ord(end) - ord(start) <= MAX_RANGE:
+                result.extend(chr(code) for code in range(ord(start), ord(end) + 1))
+                continue
+        result.extend(bound for bound in bounds if bound)
+    return result
+
+
+def extract_citations(text: str) -> List[Tuple[Optional[str], int, Optional[int], Optional[str]]]:
+    """
+    Trích xuất các trích dẫn (law_type, article, clause, point) từ một văn bản
+
+    Args:
+        text: Văn bản bản án
+
+    Returns:
+        List các tuple (mã loại luật hoặc None, điều, khoản hoặc None, điểm hoặc None),
+        không trùng lặp, theo thứ tự xuất hiện
+    """
+    if not isinstance(text, str) or not text:
+        return []
+    text = unicodedata.normalize('NFC', text).lower()
+
+    citations: List[list] = []
+    unassigned = 0        # citations[unassigned:] chưa có loại luật
+    pending_points: List[str] = []
+    pending_clauses: List[Tuple[int, List[str]]] = []
+    last_end = -MAX_GAP - 1
+
+    for match in SCANNER.finditer(text):
+        if match.start() - last_end > MAX_GAP:
+            # Chuỗi trích dẫn bị ngắt: bỏ điểm/khoản lơ lửng, các Điều cũ không nhận loại luật sau
+            pending_points, pending_clauses = [], []
+            unassigned = len(citations)
+        last_end = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+
+        if kind == 'point':
+            pending_points.extend(_expand(value, numeric=False))
+        elif kind == 'clause':
+            clauses = _expand(value, numeric=True)
+            pending_clauses.append((int(clauses[0]), pending_points))
+            pending_clauses.extend((int(clause), []) for clause in clauses[1:])
+            pending_points = []
+        elif kind == 'article':
+            for article in _expand(value, numeric=True):
+                if not pending_clauses:
+                    citations.append([None, int(article), None, None])
+                for clause, points in pending_clauses:
+                    for point in points or [None]:
+                        citations.append([None, int(article), clause, point])
+            pending_points, pending_clauses = [], []
+        else:
+            code = LAW_TYPE_CODES.get(re.sub(r'\s+', ' ', value))
+            for citation in citations[unassigned:]:
+                citation[0] = code
+            unassigned = len(citations)
+
+    seen = set()
+    result = []
+    for citation in map(tuple, citations):
+        if citation not in seen:
+            seen.add(citation)
+            result.append(citation)
+    return result
+
+
+def extract_chunk(task: Tuple[List[int], List[str]]) -> List[Tuple]:
+    """Trích xuất cho một chunk bản án, trả về các dòng (case_id, type, article, clause, point)"""
+    case_ids, texts = task
+    rows = []
+    for case_id, text in zip(case_ids, texts):
+        for law_type, article, clause, point in extract_citations(text):
+            rows.append((case_id, law_type, article, clause, point))
+    return rows
+
+
+def to_case_law_frame(rows: List[Tuple], law_data: Optional[pd.DataFrame] = None,
+                      start_id: int = 1) -> pd.DataFrame:
+    """
+    Chuyển các dòng trích xuất sang schema case_law_data
+
+    law_id được tra theo (article, type) trong law_data nếu có.
+    """
+    frame = pd.DataFrame(rows, columns=['case_id', 'type', 'article', 'clause', 'point'])
+    frame['clause'] = frame['clause'].astype('Int64')
+    frame.insert(0, 'id', range(start_id, start_id + len(frame)))
+
+    frame['law_id'] = pd.array([pd.NA] * len(frame), dtype='Int64')
+    if law_data is not None and len(frame) > 0:
+        keys = law_data.drop_duplicates(['article', 'type'])
+        index = pd.MultiIndex.from_arrays([keys['article'].astype(int), keys['type'].astype(str)])
+        positions = index.get_indexer(pd.MultiIndex.from_arrays([frame['article'], frame['type'].astype(str)]))
+        law_ids = keys['id'].to_numpy()
+        frame.loc[positions >= 0, 'law_id'] = law_ids[positions[positions >= 0]]
+    return frame[CASE_LAW_COLUMNS]
+
+
+def iter_extracted(chunks: Iterable[Tuple[List[int], List[str]]], n_workers: int = 1):
+    """
+    Trích xuất song song theo chunk, trả kết quả đúng thứ tự chunk
+
+    Số chunk đang xử lý được giới hạn ở 2 × n_workers để bộ nhớ không phụ
+    thuộc kích thước dữ liệu.
+    """
+    if n_workers <= 1:
+        for chunk in chunks:
+            yield extract_chunk(chunk)
+        return
+
+    with multiprocessing.get_context().Pool(n_workers) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.apply_async(extract_chunk, (chunk,)))
+            if len(in_flight) >= 2 * n_workers:
+                yield in_flight.popleft().get()
+        while in_flight:
+            yield in_flight.popleft().get()
+
+
+def extract_file(data_dir: str, output: str, n_workers: int = 1, chunk_size: int = 2000,
+                 text_column: str = 'text') -> int:
+    """
+    Trích xuất trích dẫn cho toàn bộ case_data.csv và ghi ra file CSV
+
+    Returns:
+        Số trích dẫn đã ghi
+    """
+    from data_loader import DataLoader
+
+    loader = DataLoader(data_dir)
+    law_data = None
+    law_path = os.path.join(data_dir, 'law_data.csv')
+    if os.path.exists(law_path):
+        law_data = pd.read_csv(law_path, encoding='utf-8-sig', usecols=['id', 'article', 'type'])
+
+    chunks = ((chunk['id'].tolist(), chunk[text_column].tolist())
+              for chunk in loader.iter_chunks('case_data.csv', chunk_size, ['id', text_column]))
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    started = time.perf_counter()
+    n_rows = 0
+    n_cases = 0
+    with open(output, 'w', encoding='utf-8-sig', newline='') as f:
+        f.write(','.join(CASE_LAW_COLUMNS) + '\n')
+        for rows in iter_extracted(chunks, n_workers):
+            frame = to_case_law_frame(rows, law_data, start_id=n_rows + 1)
+            frame.to_csv(f, header=False, index=False)
+            n_rows += len(frame)
+            n_cases += frame['case_id'].nunique()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Đã trích xuất {n_rows:,} trích dẫn từ {n_cases:,} bản án "
+          f"trong {elapsed:.1f}s → {output}")
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trích xuất trích dẫn điều luật từ bản án")
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--output', default='data_export/extracted_case_law.csv')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    parser.add_argument('--text-column', default='text')
+    args = parser.parse_args()
+
+    extract_file(args.data_dir, args.output, args.workers, args.chunk_size, args.text_column)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Chuẩn hóa tên luật bằng automaton Aho–Corasick trên LAW_VARIATIONS
+
+Mọi cách viết của từng bộ luật (mã trong LAW_TYPES, "bộ luật <tên>" và các
+biến thể trong LAW_VARIATIONS) được dựng một lần thành automaton Aho–Corasick
+với bảng chuyển trạng thái đầy đủ (trạng thái × ký tự). Văn bản được chuẩn
+hóa từng ký tự một (chữ thường, bỏ dấu, 'đ' -> 'd', khoảng trắng -> ' ') nên
+vị trí ký tự của kết quả trùng với văn bản gốc (dạng NFC).
+
+Để quét cả một cột văn bản trong một lượt tuyến tính mà không lặp Python
+theo từng ký tự, các văn bản được nối thành một dòng ký tự rồi chia thành K
+"làn" bằng nhau; mỗi bước NumPy đẩy cả K làn tiến thêm một ký tự. Mỗi làn
+bắt đầu sớm hơn (độ dài mẫu dài nhất - 1) ký tự nên không bỏ sót các lần
+xuất hiện nằm vắt qua ranh giới làn.
+
+Kết quả giữ các lần xuất hiện không chồng nhau, dài nhất từ trái sang, nằm
+trọn vẹn giữa hai ranh giới từ.
+"""
+
+import os
+import sys
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from data.config import LAW_TYPES, LAW_VARIATIONS
+
+# Số ký tự tối đa mỗi lượt quét, giới hạn bộ nhớ của ma trận trạng thái
+BATCH_CHARS = 1 << 22
+# Mỗi làn dài ít nhất chừng này ký tự để chi phí bước NumPy được chia đều
+MIN_LANE_CHARS = 256
+MAX_LANES = 8192
+
+
+def _fold_char(char: str) -> str:
+    """Chữ thường, bỏ dấu, 'đ' -> 'd', khoảng trắng -> ' '; luôn trả về đúng một ký tự"""
+    if char.isspace():
+        return ' '
+    folded = unicodedata.normalize('NFD', char.lower())
+    folded = ''.join(c for c in folded if unicodedata.category(c) != 'Mn').replace('đ', 'd')
+    return folded if len(folded) == 1 else char
+
+
+# Bảng chuẩn hóa theo mã ký tự, phủ Latin và Latin mở rộng của tiếng Việt (U+1EA0-U+1EF9)
+FOLD_LIMIT = 0x2000
+FOLD_TABLE = np.array([ord(_fold_char(chr(code))) for code in range(FOLD_LIMIT)], dtype=np.uint32)
+
+
+def fold_codepoints(codepoints: np.ndarray) -> np.ndarray:
+    """Chuẩn hóa một mảng mã ký tự bằng FOLD_TABLE (ký tự ngoài bảng giữ nguyên)"""
+    inside = codepoints < FOLD_LIMIT
+    return np.where(inside, FOLD_TABLE[np.where(inside, codepoints, 0)], codepoints)
+
+
+def fold_text(text: str) -> str:
+    """Chuẩn hóa không phân biệt hoa thường/dấu, giữ nguyên độ dài văn bản NFC"""
+    codepoints = np.frombuffer(unicodedata.normalize('NFC', text).encode('utf-32-le'), dtype=np.uint32)
+    return fold_codepoints(codepoints).astype('<u4').tobytes().decode('utf-32-le')
+
+
+def law_name_variants(variations: Dict[str, List[str]] = None,
+                      law_types: Dict[str, str] = None) -> Dict[str, str]:
+    """
+    Các cách viết của từng bộ luật -> mã chuẩn (BLHS, BLTTHS, BLTHAHS)
+
+    Tên đầy đủ trong LAW_VARIATIONS được gắn với mã có "bộ luật " + LAW_TYPES[mã]
+    trùng với tên đó.
+    """
+    variations = LAW_VARIATIONS if variations is None else variations
+    law_types = LAW_TYPES if law_types is None else law_types
+
+    codes_by_name = {fold_text(f"bộ luật {name}"): code for code, name in law_types.items()}
+    variants = {}
+    for code, name in law_types.items():
+        variants[fold_text(code)] = code
+        variants[fold_text(f"bộ luật {name}")] = code
+    for name, forms in variations.items():
+        code = codes_by_name.get(fold_text(name))
+        if code is None:
+            continue
+        for form in [name] + list(forms):
+            variants[fold_text(form)] = code
+    return variants
+
+
+class LawNameNormalizer:
+    """Tìm và chuẩn hóa mọi cách viết tên luật trong một lượt quét"""
+
+    def __init__(self, variations: Dict[str, List[str]] = None,
+                 law_types: Dict[str, str] = None):
+        variants = law_name_variants(variations, law_types)
+        self.patterns = sorted(variants)
+        self.codes = [variants[pattern] for pattern in self.patterns]
+        self.pattern_lengths = [len(pattern) for pattern in self.patterns]
+        self.max_length = max(self.pattern_lengths, default=1)
+
+        # Ký hiệu 0 dành cho mọi ký tự không xuất hiện trong mẫu
+        self.alphabet = np.array(sorted({ord(c) for pattern in self.patterns for c in pattern}),
+                                 dtype=np.uint32)
+        self._build()
+
+    def _symbols(self, codepoints: np.ndarray) -> np.ndarray:
+        position = np.searchsorted(self.alphabet, codepoints)
+        position = np.minimum(position, len(self.alphabet) - 1)
+        return np.where(self.alphabet[position] == codepoints, position + 1, 0).astype(np.int32)
+
+    def _build(self):
+        """Dựng trie, liên kết thất bại và bảng chuyển đầy đủ"""
+        children: List[Dict[int, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for symbol in self._symbols(np.array([ord(c) for c in pattern], dtype=np.uint32)):
+                symbol = int(symbol)
+                if symbol not in children[state]:
+                    children.append({})
+                    outputs.append([])
+                    children[state][symbol] = len(children) - 1
+                state = children[state][symbol]
+            outputs[state].append(pattern_id)
+
+        n_states, n_symbols = len(children), len(self.alphabet) + 1
+        delta = np.zeros((n_states, n_symbols), dtype=np.int32)
+        fail = np.zeros(n_states, dtype=np.int32)
+
+        # Duyệt BFS: bảng chuyển của một trạng thái = bảng của trạng thái thất bại + cạnh trie
+        queue = deque()
+        for symbol, child in children[0].items():
+            delta[0, symbol] = child
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            delta[state] = delta[fail[state]]
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for symbol, child in children[state].items():
+                fail[child] = delta[fail[state], symbol]
+                delta[state, symbol] = child
+                queue.append(child)
+
+        self.delta = delta
+        self.outputs = [np.array(out, dtype=np.int64) for out in outputs]
+        self.output_counts = np.array([len(out) for out in outputs])
+        self.has_output = self.output_counts > 0
+
+    def _scan(self, codepoints: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Quét một dòng mã ký tự đã chuẩn hóa bằng K làn song song
+
+        Returns:
+            (vị trí kết thúc, mã mẫu) của mọi lần xuất hiện
+        """
+        length = len(codepoints)
+        if length == 0 or not self.patterns:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        symbols = self._symbols(codepoints)
+
+        lanes = int(min(MAX_LANES, max(1, length // MIN_LANE_CHARS)))
+        segment = -(-length // lanes)
+        warmup = self.max_length - 1
+        steps = segment + warmup
+
+        # Ma trận ký hiệu (làn × bước): làn k đọc [k*segment - warmup, (k+1)*segment)
+        padded = np.zeros(warmup + lanes * segment, dtype=np.int32)
+        padded[warmup:warmup + length] = symbols
+        lane_symbols = np.lib.stride_tricks.as_strided(
+            padded, shape=(lanes, steps), strides=(segment * padded.itemsize, padded.itemsize))
+        lane_symbols = np.ascontiguousarray(lane_symbols.T)
+
+        delta = self.delta
+        states = np.zeros(lanes, dtype=np.int32)
+        history = np.empty((steps, lanes), dtype=np.int32)
+        for step in range(steps):
+            states = delta[states, lane_symbols[step]]
+            history[step] = states
+
+        # Chỉ nhận kết quả kết thúc trong phần riêng của làn (sau đoạn khởi động)
+        steps_hit, lanes_hit = np.nonzero(self.has_output[history[warmup:]])
+        ends = lanes_hit * segment + steps_hit
+        states_hit = history[steps_hit + warmup, lanes_hit]
+
+        # Một trạng thái có thể kết thúc nhiều mẫu (qua liên kết thất bại)
+        counts = self.output_counts[states_hit]
+        pattern_ids = np.concatenate([self.outputs[state] for state in states_hit]) \
+            if len(states_hit) else np.empty(0, dtype=np.int64)
+        return np.repeat(ends, counts), pattern_ids
+
+    @staticmethod
+    def _is_boundary(text: str, position: int) -> bool:
+        return position < 0 or position >= len(text) or not text[position].isalnum()
+
+    def _select(self, text: str, ends: np.ndarray, pattern_ids: np.ndarray) -> List[Tuple[int, int, int]]:
+        """Giữ các lần xuất hiện trọn từ, không chồng nhau, dài nhất từ trái sang"""
+        candidates = []
+        for end, pattern_id in zip(ends.tolist(), pattern_ids.tolist()):
+            start = end - self.pattern_lengths[pattern_id] + 1
+            if self._is_boundary(text, start - 1) and self._is_boundary(text, end + 1):
+                candidates.append((start, -(end + 1), pattern_id))
+        selected = []
+        last_end = -1
+        for start, neg_end, pattern_id in sorted(candidates):
+            if start >= last_end:
+                selected.append((start, -neg_end, pattern_id))
+                last_end = -neg_end
+        return selected
+
+    def find(self, text: str) -> List[Dict]:
+        """
+        Tìm các lần nhắc tới tên luật trong một văn bản
+
+        Returns:
+            List các dict {start, end, code, mention}; start/end là vị trí
+            ký tự trong văn bản (dạng NFC)
+        """
+        frame = self.find_batch([text])
+        return frame.drop(columns='doc_index').to_dict('records')
+
+    def find_batch(self, texts: Iterable[str], batch_chars: int = BATCH_CHARS) -> pd.DataFrame:
+        """
+        Tìm tên luật trong cả một cột văn bản
+
+        Các văn bản được nối (ngăn cách bằng một ký tự không thuộc mẫu) thành
+        dòng ký tự dài tối đa batch_chars rồi quét một lượt.
+
+        Args:
+            texts: Các văn bản (Series, TextView hoặc list)
+            batch_chars: Số ký tự mỗi lượt quét
+
+        Returns:
+            DataFrame các cột doc_index, start, end, code, mention
+        """
+        records = []
+        batch: List[Tuple[int, str]] = []
+        batch_size = 0
+
+        def flush():
+            if not batch:
+                return
+            # Ký tự '\x00' không thuộc mẫu nào nên không có kết quả vắt qua hai văn bản
+            codepoints = np.frombuffer('\x00'.join(text for _, text in batch).encode('utf-32-le'),
+                                       dtype=np.uint32)
+            offsets = np.cumsum([0] + [len(text) + 1 for _, text in batch])
+            ends, pattern_ids = self._scan(fold_codepoints(codepoints))
+            docs = np.searchsorted(offsets, ends, side='right') - 1
+            order = np.argsort(docs, kind='stable')
+            docs, ends, pattern_ids = docs[order], ends[order], pattern_ids[order]
+            bounds = np.flatnonzero(np.diff(docs)) + 1
+            for doc_ends, doc_patterns in zip(np.split(ends, bounds), np.split(pattern_ids, bounds)):
+                if not len(doc_ends):
+                    continue
+                doc = int(np.searchsorted(offsets, doc_ends[0], side='right')) - 1
+                doc_index, text = batch[doc]
+                for start, end, pattern_id in self._select(text, doc_ends - offsets[doc], doc_patterns):
+                    records.append((doc_index, start, end, self.codes[pattern_id], text[start:end]))
+            batch.clear()
+
+        for doc_index, text in enumerate(texts):
+            text = unicodedata.normalize('NFC', text) if isinstance(text, str) else ''
+            batch.append((doc_index, text))
+            batch_size += len(text) + 1
+            if batch_size >= batch_chars:
+                flush()
+                batch_size = 0
+        flush()
+
+        return pd.DataFrame(records, columns=['doc_index', 'start', 'end', 'code', 'mention'])
+
+
+_default_normalizer: Optional[LawNameNormalizer] = None
+
+
+def find_law_mentions(texts: Iterable[str]) -> pd.DataFrame:
+    """find_batch với automaton dựng từ LAW_VARIATIONS/LAW_TYPES (dựng một lần)"""
+    global _default_normalizer
+    if _default_normalizer is None:
+        _default_normalizer = LawNameNormalizer()
+    return _default_normalizer.find_batch(texts)
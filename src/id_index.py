@@ -0,0 +1,88 @@
+"""
+Module chỉ mục băm id → vị trí dòng cho các bảng dữ liệu
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class IdIndex:
+    """
+    Chỉ mục id → vị trí dòng, được xây một lần khi load dữ liệu
+
+    Nếu một id xuất hiện nhiều lần, chỉ mục trỏ tới lần xuất hiện đầu tiên
+    (giống hành vi lọc rồi lấy iloc[0] trước đây).
+
+    Các id được nối thêm bằng extend() nằm trong các phần delta riêng (không
+    băm lại chỉ mục chính), được gộp lại khi số phần delta vượt MAX_DELTAS.
+    """
+
+    MAX_DELTAS = 8
+
+    def __init__(self, ids: Iterable):
+        ids = pd.Series(ids).reset_index(drop=True)
+        first = ~ids.duplicated().to_numpy()
+        self.index = pd.Index(ids[first])
+        self.rows = np.flatnonzero(first)
+        self.size = len(ids)
+        self.deltas = []
+        # pandas chỉ tạo bảng băm ở lần tra cứu đầu tiên, tạo sẵn ngay khi load
+        if len(self.index) > 0:
+            self.index.get_loc(self.index[0])
+
+    def __len__(self) -> int:
+        return self.size
+
+    def position(self, key) -> Optional[int]:
+        """Vị trí dòng của một id, None nếu không có"""
+        for index, rows in [(self.index, self.rows)] + self.deltas:
+            try:
+                return int(rows[index.get_loc(key)])
+            except (KeyError, TypeError):
+                continue
+        return None
+
+    def positions(self, keys: Iterable) -> np.ndarray:
+        """Vị trí dòng của nhiều id (vectorized), -1 cho id không tồn tại"""
+        if not isinstance(keys, (np.ndarray, pd.Series, pd.Index)):
+            keys = list(keys)
+        locs = self.index.get_indexer(keys)
+        if len(self.rows) == 0:
+            positions = np.full(len(locs), -1, dtype=np.int64)
+        else:
+            positions = np.where(locs >= 0, self.rows[locs], -1)
+        for index, rows in self.deltas:
+            missing = np.flatnonzero(positions < 0)
+            if len(missing) == 0:
+                break
+            subset = keys.take(missing) if hasattr(keys, 'take') else [keys[i] for i in missing]
+            locs = index.get_indexer(subset)
+            positions[missing[locs >= 0]] = rows[locs[locs >= 0]]
+        return positions
+
+    def extend(self, ids: Iterable):
+        """
+        Nối thêm các id của những dòng mới ở cuối bảng
+
+        Id đã có trong chỉ mục giữ nguyên vị trí cũ (lần xuất hiện đầu tiên).
+        """
+        ids = pd.Series(ids).reset_index(drop=True)
+        first = ~ids.duplicated().to_numpy() & (self.positions(ids) < 0)
+        if first.any():
+            index = pd.Index(ids[first])
+            index.get_loc(index[0])
+            self.deltas.append((index, self.size + np.flatnonzero(first)))
+        self.size += len(ids)
+        if len(self.deltas) > self.MAX_DELTAS:
+            self._merge_deltas()
+
+    def _merge_deltas(self):
+        """Gộp các phần delta vào chỉ mục chính"""
+        parts = [(self.index, self.rows)] + self.deltas
+        self.index = parts[0][0].append([index for index, _ in parts[1:]])
+        self.rows = np.concatenate([rows for _, rows in parts])
+        self.deltas = []
+        if len(self.index) > 0:
+            self.index.get_loc(self.index[0])
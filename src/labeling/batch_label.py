@@ -0,0 +1,337 @@
+"""
+Gán nhãn điều luật theo lô cho các file bản án lớn (CSV/JSONL)
+
+File đầu vào được đọc theo từng chunk; mỗi chunk đi qua vector hóa → chấm
+điểm → top-k rồi được ghi nối vào file kết quả (CSV, JSONL hoặc thư mục
+Parquet). Đọc, chấm điểm và ghi chạy trên ba luồng nối với nhau bằng hàng
+đợi có giới hạn, nên đọc/ghi đĩa chồng lên thời gian chấm điểm mà bộ nhớ
+chỉ giữ vài chunk.
+
+Sau mỗi chunk đã ghi xong, file checkpoint <output>.checkpoint.json lưu số
+dòng đã xử lý và kích thước file kết quả. Khi chạy lại cùng lệnh, phần ghi
+dở được cắt bỏ và việc gán nhãn tiếp tục từ chunk tiếp theo.
+
+Định dạng kết quả:
+    csv / parquet - mỗi dòng một cặp (id, rank, article, confidence)
+    jsonl         - mỗi dòng một bản án {"id": ..., "predictions": [...]}
+
+Cách chạy:
+    python src/labeling/batch_label.py new_cases.csv labels.csv --model models/law_classifier
+    python src/labeling/batch_label.py dump.jsonl labels.jsonl --chunk-size 10000 --top-k 5
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from itertools import islice
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from data_cache import source_fingerprint
+from models.predictor import load_predictor
+
+OUTPUT_FORMATS = ('csv', 'jsonl', 'parquet')
+_DONE = object()
+
+
+def detect_format(path: str) -> str:
+    """Định dạng theo phần mở rộng của file"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    return {'json': 'jsonl', 'ndjson': 'jsonl', 'pq': 'parquet'}.get(extension, extension)
+
+
+def read_chunks(path: str, chunk_size: int, id_column: str, text_column: str,
+                skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Đọc file đầu vào theo chunk, chỉ giữ cột id và văn bản
+
+    Args:
+        path: File CSV hoặc JSONL
+        chunk_size: Số bản án mỗi chunk
+        id_column: Cột id bản án
+        text_column: Cột văn bản để gán nhãn
+        skip_rows: Bỏ qua các bản án đầu (đã xử lý ở lần chạy trước)
+    """
+    if detect_format(path) == 'jsonl':
+        with open(path, 'r', encoding='utf-8') as f:
+            # Dòng trống không phải bản án: lọc trước khi bỏ qua skip_rows bản án
+            lines = islice((line for line in f if line.strip()), skip_rows, None)
+            while True:
+                batch = list(islice(lines, chunk_size))
+                if not batch:
+                    return
+                records = [json.loads(line) for line in batch]
+                yield pd.DataFrame({
+                    id_column: [record.get(id_column) for record in records],
+                    text_column: [record.get(text_column) for record in records],
+                })
+    else:
+        yield from pd.read_csv(path, encoding='utf-8-sig', usecols=[id_column, text_column],
+                               skiprows=range(1, skip_rows + 1), chunksize=chunk_size)
+
+
+class ResultWriter:
+    """Ghi nối kết quả từng chunk, có thể cắt về trạng thái của checkpoint"""
+
+    def __init__(self, path: str, output_format: str):
+        self.path = path
+        self.format = output_format
+        if output_format == 'parquet':
+            # Parquet không ghi nối được: mỗi chunk là một file part trong thư mục
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ImportError("Cần cài pyarrow để ghi kết quả Parquet (pip install pyarrow)")
+            os.makedirs(path, exist_ok=True)
+
+    def position(self) -> int:
+        """Vị trí hiện tại của kết quả: số byte (csv/jsonl) hoặc số file part"""
+        if self.format == 'parquet':
+            return len([name for name in os.listdir(self.path) if name.endswith('.parquet')])
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def truncate(self, position: int):
+        """Bỏ phần ghi sau checkpoint (chunk đang ghi dở khi bị dừng)"""
+        if self.format == 'parquet':
+            for name in os.listdir(self.path):
+                if name.endswith('.parquet') and int(name[5:-8]) >= position:
+                    os.remove(os.path.join(self.path, name))
+        elif os.path.exists(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(position)
+
+    def write(self, chunk_index: int, ids: np.ndarray, columns: Dict[str, np.ndarray]):
+        """Ghi kết quả top-k dạng cột của một chunk"""
+        frame = pd.DataFrame({
+            'id': ids[columns['doc_index']],
+            'rank': columns['rank'],
+            'article': columns['article'],
+            'confidence': columns['confidence'],
+        })
+        if self.format == 'parquet':
+            frame.to_parquet(os.path.join(self.path, f"part-{chunk_index:06d}.parquet"), index=False)
+            return
+
+        with open(self.path, 'a', encoding='utf-8', newline='') as f:
+            if self.format == 'csv':
+                frame.to_csv(f, header=f.tell() == 0, index=False)
+            else:
+                k = len(frame) // len(ids) if len(ids) else 0
+                records = frame[['rank', 'article', 'confidence']].to_dict('records')
+                for doc, doc_id in enumerate(ids):
+                    f.write(json.dumps({'id': doc_id.item() if hasattr(doc_id, 'item') else doc_id,
+                                        'predictions': records[doc * k:(doc + 1) * k]},
+                                       ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class Checkpoint:
+    """Trạng thái tiến độ lưu cạnh file kết quả, ghi nguyên tử sau mỗi chunk"""
+
+    def __init__(self, output_path: str, identity: Dict):
+        self.path = output_path.rstrip('/\\') + '.checkpoint.json'
+        self.identity = identity
+        self.state = {'rows_done': 0, 'chunks_done': 0, 'output_position': 0, 'completed': False}
+
+    def load(self) -> bool:
+        """Đọc checkpoint cũ nếu khớp với lần chạy hiện tại"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if saved.get('identity') != self.identity:
+            return False
+        self.state.update(saved['state'])
+        return True
+
+    def save(self, **updates):
+        self.state.update(updates)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'identity': self.identity, 'state': self.state}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def _put(output: queue.Queue, item, stop: threading.Event):
+    """put có chờ, bỏ cuộc khi giai đoạn phía sau đã dừng vì lỗi"""
+    while True:
+        try:
+            output.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            if stop.is_set():
+                return
+
+
+def _get(source: queue.Queue, stop: threading.Event):
+    """get có chờ, trả về _DONE khi một giai đoạn khác đã dừng vì lỗi"""
+    while True:
+        try:
+            return source.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                return _DONE
+
+
+def _produce(iterable, output: queue.Queue, stop: threading.Event):
+    """Đẩy từng phần tử vào hàng đợi có giới hạn, kết thúc bằng _DONE"""
+    try:
+        for item in iterable:
+            if stop.is_set():
+                return
+            _put(output, item, stop)
+        _put(output, _DONE, stop)
+    except BaseException as e:
+        _put(output, e, stop)
+
+
+def label_file(input_path: str, output_path: str, model_path: str = 'models/law_classifier',
+               chunk_size: int = 5000, top_k: int = 5, id_column: str = 'id',
+               text_column: str = 'text', output_format: Optional[str] = None,
+               overwrite: bool = False, queue_size: int = 2) -> Dict:
+    """
+    Gán nhãn toàn bộ file đầu vào, tiếp tục từ checkpoint nếu có
+
+    Args:
+        input_path: File bản án (CSV hoặc JSONL)
+        output_path: File (csv/jsonl) hoặc thư mục (parquet) kết quả
+        model_path: Mô hình đã lưu (thư mục, .pkl hoặc artifact tuyến tính)
+        chunk_size: Số bản án mỗi chunk
+        top_k: Số điều luật cho mỗi bản án
+        id_column: Cột id bản án
+        text_column: Cột văn bản
+        output_format: csv, jsonl hoặc parquet; mặc định theo phần mở rộng
+        overwrite: Bỏ checkpoint và kết quả cũ, chạy lại từ đầu
+        queue_size: Số chunk tối đa chờ giữa các giai đoạn
+
+    Returns:
+        Trạng thái checkpoint cuối cùng
+    """
+    output_format = output_format or detect_format(output_path)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Định dạng kết quả không hỗ trợ: {output_format}")
+
+    identity = {
+        'input': os.path.abspath(input_path),
+        'source': source_fingerprint(input_path),
+        'model': os.path.abspath(model_path),
+        'chunk_size': chunk_size,
+        'top_k': top_k,
+        'format': output_format,
+    }
+    checkpoint = Checkpoint(output_path, identity)
+    writer = ResultWriter(output_path, output_format)
+
+    if not overwrite and checkpoint.load():
+        if checkpoint.state['completed']:
+            print(f"✅ {output_path} đã hoàn thành trước đó ({checkpoint.state['rows_done']:,} bản án)")
+            return checkpoint.state
+        print(f"🔁 Tiếp tục từ chunk {checkpoint.state['chunks_done']:,} "
+              f"({checkpoint.state['rows_done']:,} bản án đã gán nhãn)")
+    elif writer.position() > 0 and not overwrite:
+        raise FileExistsError(f"{output_path} đã tồn tại nhưng không có checkpoint khớp, "
+                              f"dùng --overwrite để ghi đè")
+    writer.truncate(checkpoint.state['output_position'])
+
+    predictor = load_predictor(model_path, quiet=True)
+    print(f"✅ Đã load mô hình từ {model_path}")
+
+    stop = threading.Event()
+    chunks: queue.Queue = queue.Queue(maxsize=queue_size)
+    results: queue.Queue = queue.Queue(maxsize=queue_size)
+
+    reader = threading.Thread(target=_produce, daemon=True, args=(
+        read_chunks(input_path, chunk_size, id_column, text_column,
+                    skip_rows=checkpoint.state['rows_done']), chunks, stop))
+
+    def write_results():
+        while True:
+            item = results.get()
+            if item is _DONE:
+                return
+            chunk_index, ids, columns = item
+            writer.write(chunk_index, ids, columns)
+            checkpoint.save(rows_done=checkpoint.state['rows_done'] + len(ids),
+                            chunks_done=chunk_index + 1, output_position=writer.position())
+            print(f"  📦 Chunk {chunk_index + 1}: {checkpoint.state['rows_done']:,} bản án")
+
+    write_errors = []
+
+    def run_writer():
+        try:
+            write_results()
+        except BaseException as e:
+            write_errors.append(e)
+            stop.set()
+
+    writer_thread = threading.Thread(target=run_writer, daemon=True)
+    reader.start()
+    writer_thread.start()
+
+    started = time.perf_counter()
+    rows_before = checkpoint.state['rows_done']
+    chunk_index = checkpoint.state['chunks_done']
+    try:
+        while not stop.is_set():
+            # Luồng đọc không đẩy _DONE khi dừng vì luồng ghi lỗi, không được chờ mãi
+            chunk = _get(chunks, stop)
+            if chunk is _DONE:
+                break
+            if isinstance(chunk, BaseException):
+                raise chunk
+            texts = chunk[text_column].fillna('').astype(str).tolist()
+            columns = predictor.predict_topk(texts, top_k=top_k)
+            _put(results, (chunk_index, chunk[id_column].to_numpy(), columns), stop)
+            chunk_index += 1
+    finally:
+        stop.set()
+        # Giải phóng luồng đọc nếu đang chờ chỗ trong hàng đợi
+        while not chunks.empty():
+            chunks.get_nowait()
+        if writer_thread.is_alive():
+            results.put(_DONE)
+            writer_thread.join()
+
+    if write_errors:
+        raise write_errors[0]
+
+    checkpoint.save(completed=True)
+    elapsed = time.perf_counter() - started
+    labelled = checkpoint.state['rows_done'] - rows_before
+    print(f"✅ Đã gán nhãn {labelled:,} bản án trong {elapsed:.1f}s "
+          f"({labelled / max(elapsed, 1e-9):,.0f} bản án/giây) → {output_path}")
+    return checkpoint.state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gán nhãn điều luật theo lô cho file bản án lớn")
+    parser.add_argument('input', help='File bản án CSV hoặc JSONL')
+    parser.add_argument('output', help='File kết quả .csv/.jsonl hoặc thư mục .parquet')
+    parser.add_argument('--model', default='models/law_classifier')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--id-column', default='id')
+    parser.add_argument('--text-column', default='text')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default=None)
+    parser.add_argument('--overwrite', action='store_true', help='Bỏ checkpoint, chạy lại từ đầu')
+    args = parser.parse_args()
+
+    try:
+        label_file(args.input, args.output, args.model, args.chunk_size, args.top_k,
+                   args.id_column, args.text_column, args.format, args.overwrite)
+    except KeyboardInterrupt:
+        print("\n⏸️  Đã dừng, chạy lại cùng lệnh để tiếp tục từ checkpoint")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Mô hình truy hồi BM25 trên dữ liệu điều luật
+
+Mỗi điều luật (title + content) được vector hóa một lần thành ma trận trọng
+số BM25 thưa (n_laws × vocab). Điểm của một bản án với toàn bộ điều luật là
+một phép nhân ma trận thưa với vector từ của bản án.
+"""
+
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from data_loader import DataLoader
+from data.config import MODEL_CONFIG
+from models import ranking
+
+
+class BM25Retriever:
+    """Xếp hạng điều luật cho bản án bằng BM25"""
+
+    def __init__(self, k1: Optional[float] = None, b: Optional[float] = None,
+                 ngram_range: Tuple[int, int] = (1, 1)):
+        """
+        Args:
+            k1: Hệ số bão hòa tần suất từ, mặc định lấy từ MODEL_CONFIG['bm25']
+            b: Hệ số chuẩn hóa độ dài, mặc định lấy từ MODEL_CONFIG['bm25']
+            ngram_range: Khoảng n-gram khi tách từ
+        """
+        config = MODEL_CONFIG['bm25']
+        self.k1 = config['k1'] if k1 is None else k1
+        self.b = config['b'] if b is None else b
+        # Giữ cả âm tiết một ký tự của tiếng Việt
+        self.vectorizer = CountVectorizer(token_pattern=r"(?u)\b\w+\b", ngram_range=ngram_range)
+        self.weights_t = None
+        self.articles = None
+        self.law_ids = None
+        self.is_fitted = False
+
+    def fit(self, loader: DataLoader):
+        """
+        Đánh chỉ mục toàn bộ law_data
+
+        Args:
+            loader: DataLoader đã load dữ liệu
+        """
+        law_data = loader.law_data
+        if law_data is None or len(law_data) == 0:
+            print("❌ Không có dữ liệu điều luật để đánh chỉ mục")
+            return
+
+        print(f"📚 Đang đánh chỉ mục BM25 cho {len(law_data):,} điều luật...")
+        documents = law_data['title'].fillna('').astype(str) + ' ' + \
+            law_data['content'].fillna('').astype(str)
+
+        tf = self.vectorizer.fit_transform(documents).tocsr().astype(np.float32)
+        n_docs = tf.shape[0]
+
+        doc_lengths = np.asarray(tf.sum(axis=1)).ravel()
+        avg_length = doc_lengths.mean() if n_docs > 0 else 0.0
+        doc_freq = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+        # Chuẩn hóa độ dài của từng điều luật, lặp lại cho mọi phần tử khác 0 của dòng
+        length_norm = self.k1 * (1 - self.b + self.b * doc_lengths / max(avg_length, 1e-9))
+        row_norm = np.repeat(length_norm, np.diff(tf.indptr)).astype(np.float32)
+
+        weights = tf.copy()
+        weights.data = idf[tf.indices] * tf.data * (self.k1 + 1) / (tf.data + row_norm)
+        # Lưu dạng chuyển vị (vocab × n_laws) để nhân trực tiếp với vector truy vấn
+        self.weights_t = weights.T.tocsr()
+
+        self.articles = law_data['article'].astype(str).to_numpy()
+        self.law_ids = law_data['id'].to_numpy()
+        self.is_fitted = True
+        print(f"✅ Đã đánh chỉ mục {n_docs:,} điều luật, {tf.shape[1]:,} từ")
+
+    def _query_matrix(self, texts: Iterable[str]) -> sparse.csr_matrix:
+        queries = self.vectorizer.transform(texts).tocsr().astype(np.float32)
+        # Mỗi từ của truy vấn chỉ tính một lần
+        queries.data[:] = 1.0
+        return queries
+
+    def score_many(self, texts: Iterable[str], chunk_size: int = 1000) -> np.ndarray:
+        """
+        Tính điểm BM25 của nhiều bản án với toàn bộ điều luật
+
+        Args:
+            texts: Các nội dung bản án
+            chunk_size: Số bản án mỗi lần nhân ma trận, giới hạn bộ nhớ trung gian
+
+        Returns:
+            Ma trận điểm float32 (n_texts × n_laws)
+        """
+        queries = self._query_matrix(texts)
+        scores = np.empty((queries.shape[0], self.weights_t.shape[1]), dtype=np.float32)
+        for start in range(0, queries.shape[0], chunk_size):
+            end = start + chunk_size
+            scores[start:end] = (queries[start:end] @ self.weights_t).toarray()
+        return scores
+
+    def score(self, text: str) -> np.ndarray:
+        """Điểm BM25 của một bản án với toàn bộ điều luật"""
+        return self.score_many([text])[0]
+
+    def rank_many(self, texts: Iterable[str], top_k: int = 5,
+                  chunk_size: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Lấy top-k điều luật cho nhiều bản án, xử lý theo từng chunk
+
+        Returns:
+            Tuple (vị trí dòng trong law_data, điểm BM25), kích thước (n_texts × top_k)
+        """
+        queries = self._query_matrix(texts)
+        indices, values = [], []
+        for start in range(0, queries.shape[0], chunk_size):
+            scores = (queries[start:start + chunk_size] @ self.weights_t).toarray()
+            chunk_indices, chunk_values = ranking.top_k(scores, top_k)
+            indices.append(chunk_indices)
+            values.append(chunk_values)
+        if not indices:
+            return np.empty((0, 0), dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+        return np.vstack(indices), np.vstack(values)
+
+    def _format_results(self, indices: np.ndarray, values: np.ndarray) -> List[Dict]:
+        # Chuẩn hóa về [0, 1] theo điểm cao nhất để tương thích trường confidence
+        top_score = float(values[0]) if len(values) > 0 and values[0] > 0 else 1.0
+        return [
+            {
+                'rank': rank + 1,
+                'article': str(self.articles[idx]),
+                'confidence': float(value) / top_score,
+                'score': float(value),
+                'law_id': int(self.law_ids[idx]),
+            }
+            for rank, (idx, value) in enumerate(zip(indices, values))
+        ]
+
+    def predict(self, text: str, top_k: int = 5) -> List[Dict]:
+        """
+        Xếp hạng điều luật cho một bản án, cùng định dạng LawClassifier.predict
+
+        Args:
+            text: Nội dung bản án
+            top_k: Số điều luật trả về
+        """
+        results = self.predict_batch([text], top_k=top_k)
+        return results[0] if results else []
+
+    def predict_batch(self, texts: List[str], top_k: int = 3) -> List[List[Dict]]:
+        """
+        Xếp hạng điều luật cho nhiều bản án
+
+        Args:
+            texts: List các nội dung bản án
+            top_k: Số điều luật trả về cho mỗi bản án
+        """
+        if not self.is_fitted:
+            print("❌ Mô hình BM25 chưa được đánh chỉ mục")
+            return []
+
+        indices, values = self.rank_many(texts, top_k)
+        return [self._format_results(row_idx, row_val) for row_idx, row_val in zip(indices, values)]
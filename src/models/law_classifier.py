@@ -7,32 +7,69 @@ import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
+from sklearn.linear_model import SGDClassifier
+from sklearn.model_selection import GroupShuffleSplit, train_test_split
+from sklearn.metrics import classification_report, accuracy_score
 from sklearn.preprocessing import LabelEncoder
+from scipy import sparse
 import pickle
 import os
+import tempfile
 from typing import List, Dict, Tuple, Optional
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from data_loader import DataLoader
+from data.config import MODEL_CONFIG
+from evaluation.evaluate import evaluate_rankings, merge_reports, print_report
+from models import ranking
+from models.linear_scorer import export_naive_bayes
+from models.model_io import is_model_dir, load_model_dir, save_model_dir, training_data_hash
+from models.similarity import SimilarCaseIndex
+from models.streaming import CaseLabels, HashingTfidfVectorizer, holdout_mask
+from models.token_cache import TokenCache, VietnameseTokenizer, fit_tfidf, transform_tfidf
 
 class LawClassifier:
     """Mô hình phân loại điều luật cho bản án"""
     
-    def __init__(self, model_type: str = 'naive_bayes'):
+    def __init__(self, model_type: str = 'naive_bayes', multi_label: bool = False,
+                 use_token_cache: bool = False, vectorizer_params: Optional[Dict] = None,
+                 classifier_params: Optional[Dict] = None):
+        """
+        Args:
+            model_type: Loại mô hình (naive_bayes, random_forest, sgd)
+            multi_label: Huấn luyện đa nhãn, mỗi bản án là một mẫu với tập điều luật
+            use_token_cache: Lưu kết quả tách từ vào cache (xem models/token_cache.py),
+                các lần train sau trên cùng văn bản bỏ qua bước tách từ
+            vectorizer_params: Tham số TfidfVectorizer ghi đè MODEL_CONFIG['tfidf']
+            classifier_params: Tham số của classifier (ví dụ alpha, max_depth)
+        """
         self.model_type = model_type
-        self.vectorizer = TfidfVectorizer(
-            max_features=5000,
-            ngram_range=(1, 2),
-            stop_words=None,
-            min_df=2,
-            max_df=0.95
-        )
+        self.multi_label = multi_label
+        self.use_token_cache = use_token_cache
+        self.classifier_params = dict(classifier_params or {})
+        self.vectorizer = TfidfVectorizer(**{**MODEL_CONFIG['tfidf'], **(vectorizer_params or {})})
         self.classifier = None
         self.label_encoder = LabelEncoder()
         self.is_trained = False
+        self.training_data_hash = None
+        # Thư mục mô hình (định dạng model_io) gần nhất đã lưu/load, dùng cho n_jobs > 1
+        self.model_dir = None
+        # Pool dự đoán song song và thư mục tạm của nó, dùng lại giữa các lần
+        # predict_topk(n_jobs > 1) cho đến khi mô hình thay đổi
+        self._parallel = None
+        self._parallel_dir = None
+        # Số mẫu lúc fit từ vựng và số mẫu đã cập nhật dần sau đó (update())
+        self.vocabulary_samples = None
+        self.samples_since_refresh = 0
+        # Chỉ mục tìm bản án tương tự trên vectorizer hiện tại (find_similar_cases)
+        self.similarity_index = None
+        # Vị trí dòng case_data của từng mẫu do prepare_data/prepare_multilabel_data tạo
+        self._sample_rows = None
+        # ID các bản án không có mẫu nào trong tập train của lần train gần nhất
+        # (tập test), lưu kèm mô hình để evaluate.py đánh giá trên dữ liệu chưa thấy
+        self.test_case_ids = None
         
     def prepare_data(self, loader: DataLoader) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -60,8 +97,13 @@ class LawClassifier:
             print("❌ Không có dữ liệu hợp lệ để training")
             return np.array([]), np.array([])
         
-        # Chuẩn bị features (text của bản án)
-        texts = valid_data['text'].fillna('')
+        # Chuẩn bị features (text của bản án), đọc theo vị trí dòng của bản án
+        # (Series của case_data hoặc text store ở chế độ lazy_text)
+        rows = loader.case_index.positions(valid_data['case_id'].to_numpy())
+        self._sample_rows = rows
+        texts = loader.get_case_texts('text', rows)
+        if isinstance(texts, pd.Series):
+            texts = texts.fillna('')
         
         # Chuẩn bị labels (article thay vì law_id)
         labels = valid_data['article'].astype(str)
@@ -71,16 +113,217 @@ class LawClassifier:
         
         return texts, labels
     
-    def train(self, loader: DataLoader, test_size: float = 0.2):
+    def prepare_multilabel_data(self, loader: DataLoader) -> Tuple[object, sparse.csr_matrix]:
+        """
+        Chuẩn bị dữ liệu đa nhãn: mỗi bản án xuất hiện đúng một lần
+        
+        Đọc trực tiếp case_law_data thay vì ghép toàn bộ bảng, nhãn được lưu
+        thành ma trận chỉ thị thưa bản án × điều luật.
+        
+        Args:
+            loader: DataLoader instance
+            
+        Returns:
+            Tuple (texts, Y) - văn bản của các bản án và ma trận nhãn CSR
+        """
+        print("📊 Chuẩn bị dữ liệu training đa nhãn...")
+        
+        if loader.case_data is None or loader.case_law_data is None or len(loader.case_law_data) == 0:
+            print("❌ Không có dữ liệu để training")
+            return [], sparse.csr_matrix((0, 0))
+        
+        pairs = loader.case_law_data.dropna(subset=['article'])[['case_id', 'article']]
+        pairs = pairs.assign(article=pairs['article'].astype(str)).drop_duplicates()
+        
+        # Chỉ giữ các bản án có trong case_data (tương đương inner join trước đây)
+        case_rows = pd.Index(loader.case_data['id']).get_indexer(pairs['case_id'])
+        pairs, case_rows = pairs[case_rows >= 0], case_rows[case_rows >= 0]
+        
+        if len(pairs) == 0:
+            print("❌ Không có dữ liệu hợp lệ để training")
+            return [], sparse.csr_matrix((0, 0))
+        
+        # Mỗi bản án phân biệt là một dòng, theo thứ tự trong case_data
+        distinct_rows, sample_index = np.unique(case_rows, return_inverse=True)
+        label_index = self.label_encoder.fit_transform(pairs['article'])
+        
+        Y = sparse.csr_matrix(
+            (np.ones(len(pairs), dtype=np.int8), (sample_index, label_index)),
+            shape=(len(distinct_rows), len(self.label_encoder.classes_))
+        )
+        self._sample_rows = distinct_rows
+        texts = loader.get_case_texts('text', distinct_rows)
+        if isinstance(texts, pd.Series):
+            texts = texts.fillna('')
+        
+        print(f"✅ Đã chuẩn bị {len(distinct_rows)} bản án ({len(pairs)} cặp bản án - điều luật)")
+        print(f"📊 Số lượng điều luật khác nhau: {Y.shape[1]}")
+        
+        return texts, Y
+    
+    def _create_classifier(self):
+        """Tạo estimator theo model_type (đa nhãn cũng dùng cùng estimator, xem _fit_multi_label)"""
+        if self.model_type == 'naive_bayes':
+            return MultinomialNB(**self.classifier_params)
+        elif self.model_type == 'random_forest':
+            # RandomForest hỗ trợ đa nhãn trực tiếp với Y dạng ma trận
+            return RandomForestClassifier(**{'n_estimators': 100, 'random_state': 42, **self.classifier_params})
+        elif self.model_type == 'sgd':
+            # log_loss để có predict_proba, hỗ trợ cả fit và partial_fit
+            return SGDClassifier(**{'loss': 'log_loss', 'random_state': 42, **self.classifier_params})
+        else:
+            raise ValueError(f"Model type '{self.model_type}' không được hỗ trợ")
+    
+    def _fit_multi_label(self, X, Y: sparse.csr_matrix):
+        """
+        Fit classifier đa nhãn trên X (mỗi bản án một dòng) và ma trận nhãn Y
+        
+        RandomForest học trực tiếp Y dạng ma trận. Naive Bayes và SGD được fit
+        như một bài toán nhiều lớp trên các cặp bản án - điều luật (dòng của X
+        lặp lại cho từng điều luật của bản án, không vectorize lại): điểm của
+        một mô hình chung so sánh được giữa các điều luật, còn OneVsRest cho
+        mỗi điều luật một bộ phân loại nhị phân với thang xác suất riêng nên
+        xếp hạng top-k gần như ngẫu nhiên.
+        """
+        if isinstance(self.classifier, RandomForestClassifier):
+            self.classifier.fit(X, Y.toarray())
+            return
+        Y = sparse.csr_matrix(Y)
+        rows = np.repeat(np.arange(Y.shape[0]), np.diff(Y.indptr))
+        self.classifier.fit(X[rows], Y.indices)
+    
+    def predict_scores(self, X) -> np.ndarray:
+        """
+        Ma trận xác suất (n_samples × n_classes) cho ma trận đặc trưng X
+        
+        Cột thứ i ứng với label_encoder.classes_[i]: các điều luật không có mẫu
+        train (vd chia theo cụm với group_split) có xác suất 0. Với RandomForest
+        đa nhãn, mỗi cột là xác suất độc lập của một điều luật.
+        """
+        if self.multi_label and isinstance(self.classifier, RandomForestClassifier):
+            # predict_proba trả về list theo từng nhãn, lấy xác suất của lớp 1
+            columns = []
+            for classes, proba in zip(self.classifier.classes_, self.classifier.predict_proba(X)):
+                positive = np.flatnonzero(classes == 1)
+                columns.append(proba[:, positive[0]] if len(positive) else np.zeros(X.shape[0]))
+            return np.column_stack(columns)
+        scores = self.classifier.predict_proba(X)
+        # Cột của predict_proba là classifier.classes_ (mã nhãn đã thấy khi fit)
+        n_classes = len(getattr(self.label_encoder, 'classes_', ()))
+        if scores.shape[1] < n_classes:
+            full = np.zeros((scores.shape[0], n_classes), dtype=scores.dtype)
+            full[:, self.classifier.classes_] = scores
+            return full
+        return scores
+    
+    def _vectorize(self, loader: DataLoader, texts, train_idx: np.ndarray, test_idx: np.ndarray):
+        """
+        Fit vectorizer trên văn bản training, trả về (X_train, X_test)
+        
+        Khi bật use_token_cache, ma trận đếm n-gram của toàn bộ văn bản được
+        lấy từ cache tách từ (hoặc tính rồi ghi vào cache), vectorizer được
+        dựng từ đó với kết quả giống fit_transform/transform.
+        """
+        print("🔤 Đang vectorize text...")
+        tokenizer = VietnameseTokenizer.from_vectorizer(self.vectorizer) if self.use_token_cache else None
+        if tokenizer is None:
+            return (self.vectorizer.fit_transform(texts.take(train_idx)),
+                    self.vectorizer.transform(texts.take(test_idx)))
+        
+        cache = TokenCache(os.path.join(loader.cache_dir, 'tokens'),
+                           MODEL_CONFIG['token_cache']['max_size_mb'])
+        token_counts, rows = cache.counts_for(texts, tokenizer)
+        X_train, columns = fit_tfidf(self.vectorizer, token_counts, rows[train_idx])
+        return X_train, transform_tfidf(self.vectorizer, token_counts, rows[test_idx], columns)
+    
+    def _split(self, loader: DataLoader, n_samples: int, test_size: float, stratify=None,
+               group_split: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Chia vị trí mẫu thành tập train/test
+        
+        Với group_split, các mẫu của cùng một cụm bản án gần trùng (và các mẫu
+        của cùng một bản án) luôn nằm cùng một tập; test_size khi đó là tỷ lệ
+        số cụm và không stratify theo nhãn.
+        """
+        if not group_split:
+            # Stratify cần mỗi nhãn có ít nhất 2 mẫu: mẫu của điều luật chỉ được trích
+            # dẫn một lần luôn vào tập train để classifier có đủ mọi nhãn của label_encoder
+            single = np.bincount(stratify)[stratify] < 2 if stratify is not None else None
+            if single is not None and single.any():
+                print(f"⚠️ {int(single.sum())} mẫu thuộc điều luật chỉ có 1 mẫu, luôn được đưa vào tập train")
+                positions = np.flatnonzero(~single)
+                train_idx, test_idx = train_test_split(positions, test_size=test_size, random_state=42,
+                                                       stratify=stratify[positions])
+                return np.concatenate([train_idx, np.flatnonzero(single)]), test_idx
+            return train_test_split(np.arange(n_samples), test_size=test_size,
+                                    random_state=42, stratify=stratify)
+        groups = loader.get_duplicate_clusters()[self._sample_rows]
+        print(f"🧩 Chia train/test theo {len(np.unique(groups)):,} cụm bản án gần trùng")
+        splitter = GroupShuffleSplit(n_splits=1, test_size=test_size, random_state=42)
+        return next(splitter.split(np.arange(n_samples), groups=groups))
+    
+    def _record_test_cases(self, loader: DataLoader, train_idx: np.ndarray, test_idx: np.ndarray):
+        """Lưu ID các bản án chỉ có mẫu trong tập test (bản án có điều luật ở cả hai tập bị loại)"""
+        case_ids = loader.case_data['id'].to_numpy()
+        self.test_case_ids = np.setdiff1d(case_ids[self._sample_rows[test_idx]],
+                                          case_ids[self._sample_rows[train_idx]])
+    
+    def _train_multi_label(self, loader: DataLoader, test_size: float, group_split: bool = False):
+        """Huấn luyện đa nhãn, mỗi bản án được vectorize đúng một lần"""
+        texts, Y = self.prepare_multilabel_data(loader)
+        
+        if len(texts) == 0:
+            print("❌ Không có dữ liệu để training")
+            return
+        
+        # Không stratify được với đa nhãn, chia ngẫu nhiên theo bản án
+        train_idx, test_idx = self._split(loader, len(texts), test_size, group_split=group_split)
+        self._record_test_cases(loader, train_idx, test_idx)
+        
+        print(f"📊 Training set: {len(train_idx)} bản án")
+        print(f"📊 Test set: {len(test_idx)} bản án")
+        
+        X_train_vectorized, X_test_vectorized = self._vectorize(loader, texts, train_idx, test_idx)
+        
+        self.classifier = self._create_classifier()
+        
+        print(f"🎯 Đang training {self.model_type} (đa nhãn)...")
+        self._fit_multi_label(X_train_vectorized, Y[train_idx])
+        
+        self.evaluate_multilabel(X_test_vectorized, Y[test_idx])
+        
+        self.is_trained = True
+        print("✅ Training hoàn thành!")
+    
+    def evaluate_multilabel(self, X_test, Y_test: sparse.csr_matrix) -> Dict:
+        """Đánh giá mô hình đa nhãn bằng các chỉ số top-k của EVAL_CONFIG"""
+        report = evaluate_rankings(self.predict_scores(X_test), sparse.csr_matrix(Y_test))
+        print_report(report)
+        return report
+    
+    def train(self, loader: DataLoader, test_size: float = 0.2, group_split: bool = False):
         """
         Huấn luyện mô hình
         
         Args:
             loader: DataLoader instance
             test_size: Tỷ lệ dữ liệu test
+            group_split: Giữ mỗi cụm bản án gần trùng (loader.get_duplicate_clusters())
+                trong cùng một tập, tránh rò rỉ bản án đăng lại giữa train và test
         """
         print(f"🚀 Bắt đầu training mô hình {self.model_type}...")
         
+        # Thư mục mô hình đã lưu, pool song song và chỉ mục tương tự thuộc về mô hình cũ
+        self.model_dir = None
+        self.similarity_index = None
+        self.test_case_ids = None
+        self.close_parallel()
+        self.training_data_hash = training_data_hash(loader)
+        
+        if self.multi_label:
+            self._train_multi_label(loader, test_size, group_split)
+            return
+        
         # Chuẩn bị dữ liệu
         texts, labels = self.prepare_data(loader)
         
@@ -91,29 +334,24 @@ class LawClassifier:
         # Encode labels
         y_encoded = self.label_encoder.fit_transform(labels)
         
-        # Split dữ liệu
-        X_train, X_test, y_train, y_test = train_test_split(
-            texts, y_encoded, test_size=test_size, random_state=42, stratify=y_encoded
-        )
+        # Split dữ liệu theo vị trí để texts có thể là Series hoặc TextView
+        train_idx, test_idx = self._split(loader, len(texts), test_size, y_encoded, group_split)
+        self._record_test_cases(loader, train_idx, test_idx)
+        X_train, X_test = texts.take(train_idx), texts.take(test_idx)
+        y_train, y_test = y_encoded[train_idx], y_encoded[test_idx]
         
         print(f"📊 Training set: {len(X_train)} samples")
         print(f"📊 Test set: {len(X_test)} samples")
         
         # Vectorize text
-        print("🔤 Đang vectorize text...")
-        X_train_vectorized = self.vectorizer.fit_transform(X_train)
-        X_test_vectorized = self.vectorizer.transform(X_test)
+        X_train_vectorized, X_test_vectorized = self._vectorize(loader, texts, train_idx, test_idx)
         
         # Chọn và huấn luyện classifier
-        if self.model_type == 'naive_bayes':
-            self.classifier = MultinomialNB()
-        elif self.model_type == 'random_forest':
-            self.classifier = RandomForestClassifier(n_estimators=100, random_state=42)
-        else:
-            raise ValueError(f"Model type '{self.model_type}' không được hỗ trợ")
+        self.classifier = self._create_classifier()
         
         print(f"🎯 Đang training {self.model_type}...")
         self.classifier.fit(X_train_vectorized, y_train)
+        self.vocabulary_samples, self.samples_since_refresh = len(train_idx), 0
         
         # Đánh giá mô hình
         self.evaluate_model(X_test_vectorized, y_test)
@@ -121,6 +359,241 @@ class LawClassifier:
         self.is_trained = True
         print("✅ Training hoàn thành!")
     
+    def update(self, loader: DataLoader, case_law_rows: np.ndarray,
+               refresh_vocabulary: Optional[bool] = None) -> Optional[Dict]:
+        """
+        Cập nhật mô hình với các trích dẫn mới mà không huấn luyện lại từ đầu
+        
+        Dùng sau DataLoader.append_data(): văn bản các bản án mới được vector
+        hóa bằng từ vựng/IDF đã fit (HashingTfidfVectorizer thì cập nhật IDF
+        như train_streaming) rồi partial_fit MultinomialNB. Điều luật chưa có
+        trong mô hình được thêm vào LabelEncoder và các mảng đếm của NB. Trước
+        khi fit, mô hình được đánh giá trên chính lô mới (accuracy prequential).
+        
+        Từ vựng không đổi giữa các lần cập nhật nên từ mới bị bỏ qua; khi số mẫu
+        cập nhật vượt MODEL_CONFIG['incremental']['refresh_ratio'] so với số mẫu
+        lúc fit từ vựng thì huấn luyện lại toàn bộ bằng train().
+        
+        Args:
+            loader: DataLoader đã append_data()
+            case_law_rows: Vị trí các dòng case_law_data mới (append_data()['case_law_rows'])
+            refresh_vocabulary: True luôn huấn luyện lại, False không bao giờ, None theo refresh_ratio
+            
+        Returns:
+            Dict gồm samples, new_labels, accuracy (trên lô mới, trước khi fit), retrained
+        """
+        if not self.is_trained:
+            print("❌ Mô hình chưa được training")
+            return None
+        if self.multi_label or self.model_type != 'naive_bayes':
+            print("❌ Cập nhật dần chỉ hỗ trợ naive_bayes đơn nhãn")
+            return None
+        
+        links = loader.case_law_data.iloc[np.asarray(case_law_rows, dtype=np.int64)].dropna(subset=['article'])
+        rows = loader.case_index.positions(links['case_id'].to_numpy())
+        links, rows = links[rows >= 0], rows[rows >= 0]
+        report = {'samples': len(links), 'new_labels': 0, 'accuracy': None, 'retrained': False}
+        if len(links) == 0:
+            print("⚠️ Không có trích dẫn mới để cập nhật")
+            return report
+        
+        # Mỗi bản án vector hóa một lần, lặp dòng cho từng điều luật của nó
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        texts = loader.get_case_texts('text', unique_rows)
+        if isinstance(texts, pd.Series):
+            texts = texts.fillna('')
+        if isinstance(self.vectorizer, HashingTfidfVectorizer):
+            X = self.vectorizer.partial_fit_transform(texts)[inverse]
+        else:
+            X = self.vectorizer.transform(texts)[inverse]
+        labels = links['article'].astype(str).to_numpy()
+        
+        predicted = self.label_encoder.classes_[self.classifier.predict(X)]
+        report['accuracy'] = float(accuracy_score(labels, predicted.astype(str)))
+        print(f"🎯 Accuracy trên {len(labels):,} mẫu mới (trước khi cập nhật): {report['accuracy']:.4f}")
+        
+        if self.vocabulary_samples is None:
+            self.vocabulary_samples = int(self.classifier.class_count_.sum())
+        self.samples_since_refresh += len(labels)
+        ratio = MODEL_CONFIG['incremental']['refresh_ratio']
+        if not isinstance(self.vectorizer, HashingTfidfVectorizer) and (
+                refresh_vocabulary or (refresh_vocabulary is None
+                                       and self.samples_since_refresh > ratio * self.vocabulary_samples)):
+            print(f"🔄 {self.samples_since_refresh:,} mẫu kể từ lần fit từ vựng, huấn luyện lại toàn bộ...")
+            self.train(loader)
+            report['retrained'] = True
+            return report
+        
+        report['new_labels'] = self._extend_classes(np.unique(labels))
+        self.classifier.partial_fit(X, self.label_encoder.transform(labels))
+        self.training_data_hash = training_data_hash(loader)
+        if self.test_case_ids is not None:
+            self.test_case_ids = np.setdiff1d(self.test_case_ids, links['case_id'].to_numpy())
+        # Thư mục mô hình đã lưu và pool song song không còn khớp với mô hình trong bộ nhớ
+        self.model_dir = None
+        self.close_parallel()
+        print(f"✅ Đã cập nhật mô hình với {len(labels):,} mẫu ({report['new_labels']} điều luật mới)")
+        return report
+    
+    def find_similar_cases(self, loader: DataLoader, query, k: int = 10,
+                           approximate: bool = False) -> pd.DataFrame:
+        """
+        Tìm các bản án tương tự trong không gian TF-IDF của mô hình
+        
+        Chỉ mục (models/similarity.py) được dựng ở lần gọi đầu, vector hóa bổ
+        sung các bản án nối thêm bằng append_data() và dựng lại khi mô hình
+        được train/load lại.
+        
+        Args:
+            loader: DataLoader đã load dữ liệu
+            query: Nội dung bản án (str) hoặc case_id (int)
+            k: Số bản án cần lấy
+            approximate: Cắt bớt từ của truy vấn khi lấy ứng viên, nhanh hơn trên kho rất lớn
+            
+        Returns:
+            DataFrame metadata các bản án (case_data bỏ cột văn bản) kèm rank, similarity
+        """
+        if not self.is_trained:
+            print("❌ Mô hình chưa được training")
+            return pd.DataFrame()
+        if self.similarity_index is None or self.similarity_index.loader is not loader:
+            self.similarity_index = SimilarCaseIndex(self.vectorizer)
+        self.similarity_index.update(loader)
+        return self.similarity_index.find_similar_cases(query, k, approximate)
+    
+    def _extend_classes(self, labels: np.ndarray) -> int:
+        """
+        Thêm các điều luật chưa có vào LabelEncoder và các mảng đếm của NB
+        
+        Các lớp giữ thứ tự đã sắp xếp như LabelEncoder.fit, dòng đếm của lớp
+        cũ được chuyển sang vị trí mới. NB chỉ có các lớp đã thấy khi fit
+        (classifier.classes_ là mã nhãn, có thể ít hơn label_encoder.classes_)
+        cộng với các nhãn của lô mới. Các mảng luôn được chép lại vì mô hình
+        load với mmap=True chỉ đọc được.
+
+        Returns:
+            Số điều luật mới
+        """
+        known = self.label_encoder.classes_
+        classes = np.union1d(known, labels)
+        classifier = self.classifier
+        fitted = known[classifier.classes_]
+        model_classes = np.union1d(fitted, labels)
+        positions = np.searchsorted(model_classes, fitted)
+        class_count = np.zeros(len(model_classes), dtype=np.float64)
+        feature_count = np.zeros((len(model_classes), classifier.feature_count_.shape[1]), dtype=np.float64)
+        class_count[positions] = classifier.class_count_
+        feature_count[positions] = classifier.feature_count_
+        classifier.class_count_, classifier.feature_count_ = class_count, feature_count
+        classifier.classes_ = np.searchsorted(classes, model_classes)
+        self.label_encoder.classes_ = classes
+        return len(classes) - len(known)
+    
+    def train_streaming(self, loader: DataLoader, chunk_size: Optional[int] = None,
+                        test_size: float = 0.2) -> Optional[Dict]:
+        """
+        Huấn luyện out-of-core: đọc CSV theo chunk và partial_fit từng chunk
+        
+        Không cần load_all_data(): nhãn được đọc trước từ case_law_data.csv
+        thành các mảng số nguyên, văn bản bản án được đọc từng chunk từ
+        case_data.csv, vector hóa bằng HashingTfidfVectorizer (IDF cập nhật
+        dần) rồi partial_fit. Bộ nhớ đỉnh phụ thuộc chunk_size chứ không phụ
+        thuộc số bản án. Tập holdout chọn theo băm case_id và được đánh giá
+        bằng một lượt đọc chunk thứ hai.
+        
+        Args:
+            loader: DataLoader (chỉ cần data_dir)
+            chunk_size: Số bản án mỗi chunk, mặc định MODEL_CONFIG['streaming']
+            test_size: Tỷ lệ bản án đưa vào holdout
+            
+        Returns:
+            Báo cáo đánh giá holdout (như evaluate_rankings) kèm accuracy
+        """
+        if self.multi_label or self.model_type not in ('naive_bayes', 'sgd'):
+            print("❌ Training streaming chỉ hỗ trợ naive_bayes hoặc sgd đơn nhãn")
+            return None
+        
+        config = MODEL_CONFIG['streaming']
+        chunk_size = chunk_size or config['chunk_size']
+        print(f"🚀 Bắt đầu training streaming {self.model_type} (chunk {chunk_size:,} bản án)...")
+        
+        labels = CaseLabels.from_chunks(
+            loader.iter_chunks("case_law_data.csv", chunk_size * 4, ['case_id', 'article'],
+                               table='case_law'))
+        if len(labels) == 0:
+            print("❌ Không có dữ liệu để training")
+            return None
+        print(f"📊 {len(labels):,} cặp bản án - điều luật, {len(labels.classes)} điều luật khác nhau")
+        
+        self.model_dir = None
+        self.similarity_index = None
+        self.test_case_ids = None
+        self.close_parallel()
+        self.label_encoder.classes_ = labels.classes
+        classes = np.arange(len(labels.classes))
+        self.vectorizer = HashingTfidfVectorizer(n_features=config['n_features'],
+                                                 ngram_range=MODEL_CONFIG['tfidf']['ngram_range'],
+                                                 use_idf=config['use_idf'])
+        self.classifier = self._create_classifier()
+        self.training_data_hash = training_data_hash(loader)
+        
+        n_samples = 0
+        chunks = loader.iter_chunks("case_data.csv", chunk_size, ['id', 'text'], table='case')
+        for i, chunk in enumerate(chunks, 1):
+            case_ids = chunk['id'].to_numpy(dtype=np.int64)
+            train = ~holdout_mask(case_ids, test_size)
+            rows, codes = labels.lookup(case_ids[train])
+            if len(rows) == 0:
+                continue
+            
+            # Mỗi bản án vector hóa một lần, lặp dòng cho từng điều luật của nó
+            X = self.vectorizer.partial_fit_transform(chunk['text'].fillna('').astype(str)[train])
+            self.classifier.partial_fit(X[rows], codes, classes=classes)
+            n_samples += len(rows)
+            print(f"  📦 Chunk {i}: {n_samples:,} samples đã training")
+        
+        if n_samples == 0:
+            print("❌ Không có dữ liệu hợp lệ để training")
+            return None
+        
+        self.is_trained = True
+        report = self.evaluate_streaming(loader, labels, chunk_size, test_size)
+        print("✅ Training hoàn thành!")
+        return report
+    
+    def evaluate_streaming(self, loader: DataLoader, labels: CaseLabels, chunk_size: int,
+                           test_size: float) -> Dict:
+        """Đánh giá tập holdout của train_streaming, đọc case_data.csv theo chunk"""
+        print("\n📈 ĐÁNH GIÁ HOLDOUT (STREAMING):")
+        print("=" * 50)
+        
+        reports, held_out = [], []
+        correct = total = 0
+        for chunk in loader.iter_chunks("case_data.csv", chunk_size, ['id', 'text'], table='case'):
+            case_ids = chunk['id'].to_numpy(dtype=np.int64)
+            test = holdout_mask(case_ids, test_size)
+            rows, codes = labels.lookup(case_ids[test])
+            if len(rows) == 0:
+                continue
+            held_out.append(case_ids[test][np.unique(rows)])
+            
+            scores = self.predict_scores(
+                self.vectorizer.transform(chunk['text'].fillna('').astype(str)[test]))
+            truth = sparse.csr_matrix((np.ones(len(rows), dtype=bool), (rows, codes)),
+                                      shape=scores.shape)
+            reports.append(evaluate_rankings(scores, truth))
+            # Accuracy theo cặp bản án - điều luật, giống evaluate_model
+            correct += int((scores.argmax(axis=1)[rows] == codes).sum())
+            total += len(rows)
+        
+        report = merge_reports(reports)
+        self.test_case_ids = np.concatenate(held_out) if held_out else np.empty(0, dtype=np.int64)
+        report['accuracy'] = correct / total if total else 0.0
+        print(f"🎯 Accuracy: {report['accuracy']:.4f} ({total:,} samples holdout)")
+        if report['n_cases']:
+            print_report(report)
+        return report
+    
     def evaluate_model(self, X_test: np.ndarray, y_test: np.ndarray):
         """Đánh giá mô hình"""
         print("\n📈 ĐÁNH GIÁ MÔ HÌNH:")
@@ -135,14 +608,13 @@ class LawClassifier:
         
         # Classification report - chỉ định labels để tránh lỗi
         unique_labels = np.unique(np.concatenate([y_test, y_pred]))
-        target_names = [self.label_encoder.inverse_transform([label])[0] for label in unique_labels]
+        target_names = self.label_encoder.classes_[unique_labels].astype(str)
         
         print("\n📊 Classification Report:")
         print(classification_report(y_test, y_pred, labels=unique_labels, target_names=target_names))
         
-        # Confusion matrix
-        cm = confusion_matrix(y_test, y_pred)
-        print(f"\n📋 Confusion Matrix Shape: {cm.shape}")
+        # Confusion matrix có kích thước bằng số nhãn xuất hiện, không cần tạo cả ma trận
+        print(f"\n📋 Confusion Matrix Shape: {(len(unique_labels), len(unique_labels))}")
         
         # Top predictions
         print(f"\n🔝 Top 10 predictions:")
@@ -150,15 +622,98 @@ class LawClassifier:
         top_predictions = sorted(zip(unique, counts), key=lambda x: x[1], reverse=True)[:10]
         
         for i, (pred_class, count) in enumerate(top_predictions, 1):
-            article = self.label_encoder.inverse_transform([pred_class])[0]
+            article = self.label_encoder.classes_[pred_class]
             print(f"  {i:2d}. Article {article}: {count} predictions")
     
-    def predict(self, text: str) -> List[Dict]:
+    def predict_topk(self, texts: List[str], top_k: int = 3, chunk_size: int = 10000,
+                     as_frame: bool = False, n_jobs: int = 1):
+        """
+        Dự đoán top-k điều luật cho nhiều bản án, trả về dạng cột
+        
+        Xác suất được tính theo từng chunk, top-k lấy bằng argpartition trên
+        cả ma trận của chunk và nhãn được ánh xạ qua mảng classes_.
+        
+        Args:
+            texts: List các nội dung bản án
+            top_k: Số điều luật trả về cho mỗi bản án
+            chunk_size: Số bản án mỗi lần tính xác suất, giới hạn bộ nhớ
+            as_frame: Trả về DataFrame thay vì dict các mảng NumPy
+            n_jobs: Số tiến trình dự đoán song song (-1 là toàn bộ CPU),
+                xem models/parallel_predict.py; pool được dùng lại giữa các
+                lần gọi cho đến khi mô hình thay đổi hoặc close_parallel()
+            
+        Returns:
+            Dict (hoặc DataFrame) các cột doc_index, rank, article, confidence,
+            mỗi bản án chiếm top_k dòng liên tiếp theo thứ tự rank; các cột
+            rỗng nếu mô hình chưa được training
+        """
+        if not self.is_trained:
+            print("❌ Mô hình chưa được training")
+            columns = {
+                'doc_index': np.empty(0, dtype=np.int64),
+                'rank': np.empty(0, dtype=np.int64),
+                'article': np.empty(0, dtype=str),
+                'confidence': np.empty(0, dtype=np.float64),
+            }
+            return pd.DataFrame(columns) if as_frame else columns
+        
+        if n_jobs != 1:
+            columns = self._predict_topk_parallel(texts, top_k, n_jobs)
+            return pd.DataFrame(columns) if as_frame else columns
+        
+        classes = self.label_encoder.classes_.astype(str)
+        indices, values = [], []
+        for start in range(0, len(texts), chunk_size):
+            probabilities = self.predict_scores(self.vectorizer.transform(texts[start:start + chunk_size]))
+            chunk_indices, chunk_values = ranking.top_k(probabilities, top_k)
+            indices.append(chunk_indices)
+            values.append(chunk_values)
+        
+        k = indices[0].shape[1] if indices else 0
+        indices = np.vstack(indices) if indices else np.empty((0, k), dtype=np.int64)
+        values = np.vstack(values) if values else np.empty((0, k))
+        
+        columns = {
+            'doc_index': np.repeat(np.arange(len(indices)), k),
+            'rank': np.tile(np.arange(1, k + 1), len(indices)),
+            'article': classes[indices.ravel()],
+            'confidence': values.ravel().astype(np.float64),
+        }
+        return pd.DataFrame(columns) if as_frame else columns
+    
+    def _predict_topk_parallel(self, texts: List[str], top_k: int, n_jobs: int) -> Dict[str, np.ndarray]:
+        from models.parallel_predict import ParallelPredictor
+        
+        n_workers = os.cpu_count() if n_jobs < 0 else n_jobs
+        if self._parallel is not None and self._parallel.n_workers != n_workers:
+            self.close_parallel()
+        if self._parallel is None:
+            if self.model_dir is not None and is_model_dir(self.model_dir):
+                self._parallel = ParallelPredictor(self.model_dir, n_workers)
+            else:
+                # Mô hình chưa lưu dạng thư mục: lưu tạm để các worker memory-map
+                self._parallel_dir = tempfile.TemporaryDirectory()
+                save_model_dir(self._parallel_dir.name, self.vectorizer, self.classifier, self.label_encoder,
+                               self.model_type, self.multi_label, self.training_data_hash)
+                self._parallel = ParallelPredictor(self._parallel_dir.name, n_workers)
+        return self._parallel.predict_topk(texts, top_k=top_k)
+    
+    def close_parallel(self):
+        """Đóng pool dự đoán song song (nếu có) và xóa thư mục tạm của nó"""
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+        if self._parallel_dir is not None:
+            self._parallel_dir.cleanup()
+            self._parallel_dir = None
+    
+    def predict(self, text: str, top_k: int = 5) -> List[Dict]:
         """
         Dự đoán điều luật cho một bản án
         
         Args:
             text: Nội dung bản án
+            top_k: Số điều luật trả về
             
         Returns:
             List các dict chứa thông tin dự đoán
@@ -167,36 +722,27 @@ class LawClassifier:
             print("❌ Mô hình chưa được training")
             return []
         
-        # Vectorize text
-        text_vectorized = self.vectorizer.transform([text])
-        
-        # Predict
-        prediction = self.classifier.predict(text_vectorized)[0]
-        probabilities = self.classifier.predict_proba(text_vectorized)[0]
-        
-        # Lấy top 5 predictions
-        top_indices = np.argsort(probabilities)[::-1][:5]
-        
-        results = []
-        for i, idx in enumerate(top_indices):
-            article = self.label_encoder.inverse_transform([idx])[0]
-            confidence = probabilities[idx]
-            
-            results.append({
-                'rank': i + 1,
+        columns = self.predict_topk([text], top_k=top_k)
+        return [
+            {
+                'rank': int(rank),
                 'article': str(article),
                 'confidence': float(confidence),
                 'probability': float(confidence)
-            })
-        
-        return results
+            }
+            for rank, article, confidence in zip(columns['rank'], columns['article'], columns['confidence'])
+        ]
     
-    def predict_batch(self, texts: List[str]) -> List[List[Dict]]:
+    def predict_batch(self, texts: List[str], top_k: int = 3, n_jobs: int = 1) -> List[List[Dict]]:
         """
         Dự đoán cho nhiều bản án
         
+        Bọc predict_topk để giữ định dạng list các dict cho từng bản án.
+        
         Args:
             texts: List các nội dung bản án
+            top_k: Số điều luật trả về cho mỗi bản án
+            n_jobs: Số tiến trình dự đoán song song (-1 là toàn bộ CPU)
             
         Returns:
             List các predictions cho từng bản án
@@ -205,44 +751,42 @@ class LawClassifier:
             print("❌ Mô hình chưa được training")
             return []
         
-        # Vectorize texts
-        texts_vectorized = self.vectorizer.transform(texts)
-        
-        # Predict
-        predictions = self.classifier.predict(texts_vectorized)
-        probabilities = self.classifier.predict_proba(texts_vectorized)
-        
-        results = []
-        for i, (pred, probs) in enumerate(zip(predictions, probabilities)):
-            # Lấy top 3 predictions cho mỗi bản án
-            top_indices = np.argsort(probs)[::-1][:3]
-            
-            sample_results = []
-            for j, idx in enumerate(top_indices):
-                article = self.label_encoder.inverse_transform([idx])[0]
-                confidence = probs[idx]
-                
-                sample_results.append({
-                    'rank': j + 1,
-                    'article': str(article),
-                    'confidence': float(confidence)
-                })
-            
-            results.append(sample_results)
-        
-        return results
+        columns = self.predict_topk(texts, top_k=top_k, n_jobs=n_jobs)
+        records = [
+            {'rank': int(rank), 'article': str(article), 'confidence': float(confidence)}
+            for rank, article, confidence in zip(columns['rank'], columns['article'], columns['confidence'])
+        ]
+        k = len(records) // len(texts) if len(texts) else 0
+        return [records[i:i + k] for i in range(0, len(records), k)] if k else [[] for _ in texts]
     
     def save_model(self, filepath: str):
-        """Lưu mô hình"""
+        """
+        Lưu mô hình
+        
+        Mặc định lưu theo định dạng thư mục có phiên bản (models/model_io.py);
+        nếu filepath kết thúc bằng .pkl thì lưu pickle như định dạng cũ.
+        """
         if not self.is_trained:
             print("❌ Mô hình chưa được training")
             return
         
+        if not filepath.endswith('.pkl'):
+            # Ghi đè thư mục mà các worker đang memory-map sẽ cắt cụt file dưới chân chúng
+            if self._parallel is not None and os.path.abspath(self._parallel.model_path) == os.path.abspath(filepath):
+                self.close_parallel()
+            save_model_dir(filepath, self.vectorizer, self.classifier, self.label_encoder,
+                           self.model_type, self.multi_label, self.training_data_hash, self.test_case_ids)
+            self.model_dir = filepath
+            print(f"✅ Đã lưu mô hình vào {filepath}")
+            return
+        
         model_data = {
             'vectorizer': self.vectorizer,
             'classifier': self.classifier,
             'label_encoder': self.label_encoder,
-            'model_type': self.model_type
+            'model_type': self.model_type,
+            'multi_label': self.multi_label,
+            'test_case_ids': self.test_case_ids
         }
         
         with open(filepath, 'wb') as f:
@@ -250,22 +794,61 @@ class LawClassifier:
         
         print(f"✅ Đã lưu mô hình vào {filepath}")
     
-    def load_model(self, filepath: str):
-        """Load mô hình"""
+    def load_model(self, filepath: str, mmap: bool = False):
+        """
+        Load mô hình, hỗ trợ cả thư mục định dạng mới và file pickle cũ
+        
+        Args:
+            filepath: Thư mục mô hình hoặc file .pkl
+            mmap: Memory-map các mảng của định dạng thư mục
+        """
         if not os.path.exists(filepath):
             print(f"❌ Không tìm thấy file {filepath}")
             return
         
-        with open(filepath, 'rb') as f:
-            model_data = pickle.load(f)
+        self.close_parallel()
+        if is_model_dir(filepath):
+            model_data = load_model_dir(filepath, mmap=mmap)
+            self.training_data_hash = model_data['manifest'].get('training_data_hash')
+            self.model_dir = filepath
+        else:
+            with open(filepath, 'rb') as f:
+                model_data = pickle.load(f)
+            self.model_dir = None
         
         self.vectorizer = model_data['vectorizer']
         self.classifier = model_data['classifier']
         self.label_encoder = model_data['label_encoder']
         self.model_type = model_data['model_type']
+        self.multi_label = model_data.get('multi_label', False)
+        self.test_case_ids = model_data.get('test_case_ids')
+        self.vocabulary_samples, self.samples_since_refresh = None, 0
+        self.similarity_index = None
         self.is_trained = True
         
         print(f"✅ Đã load mô hình từ {filepath}")
+    
+    def export_linear(self, directory: str):
+        """
+        Xuất mô hình Naive Bayes ra artifact tuyến tính cho LinearScorer
+        
+        Artifact chỉ gồm các mảng float32 và JSON, load được mà không cần
+        scikit-learn (xem models/linear_scorer.py).
+        """
+        if not self.is_trained:
+            print("❌ Mô hình chưa được training")
+            return
+        if self.model_type != 'naive_bayes' or self.multi_label:
+            print("❌ Chỉ xuất được mô hình naive_bayes đơn nhãn")
+            return
+        if isinstance(self.vectorizer, HashingTfidfVectorizer):
+            print("❌ Chưa hỗ trợ xuất mô hình huấn luyện streaming (HashingTfidfVectorizer)")
+            return
+        
+        # Các lớp của NB là mã nhãn đã thấy khi fit, có thể ít hơn label_encoder.classes_
+        export_naive_bayes(self.vectorizer, self.classifier,
+                           self.label_encoder.classes_[self.classifier.classes_], directory)
+        print(f"✅ Đã xuất mô hình tuyến tính vào {directory}")
 
 
 def demo_classifier():
@@ -305,7 +888,7 @@ def demo_classifier():
             print(f"    {pred['rank']}. Article {pred['article']}: {pred['confidence']:.3f}")
     
     # Lưu mô hình
-    classifier.save_model('models/law_classifier.pkl')
+    classifier.save_model('models/law_classifier')
     
     print("\n✅ Demo hoàn thành!")
 
@@ -0,0 +1,196 @@
+"""
+Bộ chấm điểm tuyến tính gọn nhẹ cho mô hình Naive Bayes đã train
+
+Mô hình TF-IDF + MultinomialNB là tuyến tính trên vector TF-IDF, nên có thể
+xuất ra một thư mục gồm các mảng float32 và dùng lại chỉ với NumPy/SciPy,
+không cần import scikit-learn hay unpickle TfidfVectorizer:
+
+    manifest.json             - cấu hình tách từ/TF-IDF và kích thước các mảng
+    terms.json                - từ vựng, terms[i] là cột thứ i
+    classes.json              - nhãn (article) theo thứ tự lớp
+    idf.npy                   - float32 (n_features,)
+    class_log_prior.npy       - float32 (n_classes,)
+    feature_log_prob_t.npy    - float32 (n_features × n_classes), chuyển vị
+                                để lấy liên tục các dòng theo từ
+
+Các file .npy được memory-map khi load.
+"""
+
+import json
+import os
+import re
+from typing import Dict, List
+
+import numpy as np
+from scipy import sparse
+
+from models import ranking
+
+FORMAT_NAME = 'linear_nb'
+FORMAT_VERSION = 1
+
+
+def export_naive_bayes(vectorizer, classifier, classes, directory: str):
+    """
+    Xuất TfidfVectorizer + MultinomialNB đã fit ra thư mục dạng mảng
+
+    Args:
+        vectorizer: TfidfVectorizer đã fit (analyzer='word', không stop_words)
+        classifier: MultinomialNB đã fit
+        classes: Tên nhãn theo thứ tự lớp của classifier
+        directory: Thư mục đích
+    """
+    if not hasattr(classifier, 'feature_log_prob_'):
+        raise ValueError("Chỉ hỗ trợ xuất mô hình Naive Bayes (MultinomialNB)")
+    if (vectorizer.analyzer != 'word' or vectorizer.tokenizer is not None
+            or vectorizer.preprocessor is not None or vectorizer.stop_words is not None
+            or vectorizer.strip_accents):
+        raise ValueError("Chỉ hỗ trợ TfidfVectorizer với analyzer/tokenizer mặc định")
+
+    os.makedirs(directory, exist_ok=True)
+    vocabulary = vectorizer.vocabulary_
+    terms = [None] * len(vocabulary)
+    for term, column in vocabulary.items():
+        terms[column] = term
+
+    use_idf = bool(vectorizer.use_idf)
+    idf = vectorizer.idf_ if use_idf else np.ones(len(terms))
+
+    arrays = {
+        'idf': np.asarray(idf, dtype=np.float32),
+        'class_log_prior': np.asarray(classifier.class_log_prior_, dtype=np.float32),
+        'feature_log_prob_t': np.ascontiguousarray(classifier.feature_log_prob_.T, dtype=np.float32),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f"{name}.npy"), array)
+
+    with open(os.path.join(directory, 'terms.json'), 'w', encoding='utf-8') as f:
+        json.dump(terms, f, ensure_ascii=False)
+    with open(os.path.join(directory, 'classes.json'), 'w', encoding='utf-8') as f:
+        json.dump([str(label) for label in classes], f, ensure_ascii=False)
+
+    manifest = {
+        'format': FORMAT_NAME,
+        'format_version': FORMAT_VERSION,
+        'n_features': len(terms),
+        'n_classes': len(classes),
+        'lowercase': bool(vectorizer.lowercase),
+        'token_pattern': vectorizer.token_pattern,
+        'ngram_range': list(vectorizer.ngram_range),
+        'sublinear_tf': bool(vectorizer.sublinear_tf),
+        'norm': vectorizer.norm,
+    }
+    # manifest ghi sau cùng, là dấu hiệu artifact đã ghi xong
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+class LinearScorer:
+    """Chấm điểm điều luật từ artifact tuyến tính, chỉ dùng NumPy/SciPy"""
+
+    def __init__(self, directory: str, mmap: bool = True):
+        """
+        Args:
+            directory: Thư mục artifact do export_naive_bayes tạo
+            mmap: Memory-map các mảng thay vì đọc toàn bộ vào RAM
+        """
+        with open(os.path.join(directory, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format') != FORMAT_NAME:
+            raise ValueError(f"Artifact {directory} không phải định dạng {FORMAT_NAME}")
+
+        with open(os.path.join(directory, 'terms.json'), 'r', encoding='utf-8') as f:
+            self.vocabulary = {term: i for i, term in enumerate(json.load(f))}
+        with open(os.path.join(directory, 'classes.json'), 'r', encoding='utf-8') as f:
+            self.classes = np.asarray(json.load(f))
+
+        mmap_mode = 'r' if mmap else None
+        self.idf = np.load(os.path.join(directory, 'idf.npy'), mmap_mode=mmap_mode)
+        self.class_log_prior = np.load(os.path.join(directory, 'class_log_prior.npy'))
+        self.feature_log_prob_t = np.load(os.path.join(directory, 'feature_log_prob_t.npy'),
+                                          mmap_mode=mmap_mode)
+
+        self.token_pattern = re.compile(self.manifest['token_pattern'])
+        self.min_n, self.max_n = self.manifest['ngram_range']
+        self.is_trained = True
+
+    def _analyze(self, text: str) -> List[str]:
+        """Tách từ và sinh n-gram giống TfidfVectorizer (analyzer='word')"""
+        if self.manifest['lowercase']:
+            text = text.lower()
+        tokens = self.token_pattern.findall(text)
+        if self.max_n == 1:
+            return tokens
+
+        n_tokens = len(tokens)
+        grams = list(tokens) if self.min_n == 1 else []
+        for n in range(max(self.min_n, 2), min(self.max_n + 1, n_tokens + 1)):
+            grams.extend(' '.join(tokens[i:i + n]) for i in range(n_tokens - n + 1))
+        return grams
+
+    def transform(self, texts: List[str]) -> sparse.csr_matrix:
+        """Vector hóa TF-IDF các văn bản thành ma trận CSR float32"""
+        indptr = [0]
+        indices: List[int] = []
+        counts: List[int] = []
+        vocabulary = self.vocabulary
+        for text in texts:
+            doc_counts: Dict[int, int] = {}
+            for gram in self._analyze(text if isinstance(text, str) else ''):
+                column = vocabulary.get(gram)
+                if column is not None:
+                    doc_counts[column] = doc_counts.get(column, 0) + 1
+            indices.extend(doc_counts.keys())
+            counts.extend(doc_counts.values())
+            indptr.append(len(indices))
+
+        indices = np.asarray(indices, dtype=np.int32)
+        data = np.asarray(counts, dtype=np.float32)
+        if self.manifest['sublinear_tf']:
+            data = 1 + np.log(data)
+        data *= self.idf[indices]
+
+        X = sparse.csr_matrix((data, indices, np.asarray(indptr, dtype=np.int64)),
+                              shape=(len(indptr) - 1, self.manifest['n_features']))
+        norm = self.manifest['norm']
+        if norm in ('l1', 'l2'):
+            squared = X.multiply(X) if norm == 'l2' else abs(X)
+            row_norms = np.asarray(squared.sum(axis=1)).ravel()
+            if norm == 'l2':
+                row_norms = np.sqrt(row_norms)
+            row_norms[row_norms == 0] = 1
+            X = sparse.diags((1 / row_norms).astype(np.float32)) @ X
+        return X.tocsr()
+
+    def predict_scores(self, texts: List[str]) -> np.ndarray:
+        """Ma trận xác suất (n_texts × n_classes) giống MultinomialNB.predict_proba"""
+        jll = self.transform(texts) @ self.feature_log_prob_t + self.class_log_prior
+        jll = np.asarray(jll, dtype=np.float64)
+        jll -= jll.max(axis=1, keepdims=True)
+        np.exp(jll, out=jll)
+        jll /= jll.sum(axis=1, keepdims=True)
+        return jll
+
+    def predict_topk(self, texts: List[str], top_k: int = 3) -> Dict[str, np.ndarray]:
+        """Top-k dạng cột (doc_index, rank, article, confidence), giống LawClassifier"""
+        indices, values = ranking.top_k(self.predict_scores(texts), top_k)
+        k = indices.shape[1]
+        return {
+            'doc_index': np.repeat(np.arange(len(indices)), k),
+            'rank': np.tile(np.arange(1, k + 1), len(indices)),
+            'article': self.classes[indices.ravel()],
+            'confidence': values.ravel(),
+        }
+
+    def predict(self, text: str, top_k: int = 5) -> List[Dict]:
+        """Dự đoán điều luật cho một bản án, cùng định dạng LawClassifier.predict"""
+        columns = self.predict_topk([text], top_k=top_k)
+        return [
+            {
+                'rank': int(rank),
+                'article': str(article),
+                'confidence': float(confidence),
+                'probability': float(confidence)
+            }
+            for rank, article, confidence in zip(columns['rank'], columns['article'], columns['confidence'])
+        ]
@@ -0,0 +1,217 @@
+"""
+Định dạng lưu mô hình dạng thư mục, có phiên bản, thay cho pickle
+
+Cấu trúc thư mục:
+
+    manifest.json          - schema_version, model_type, multi_label,
+                             hyperparameters, training_data_hash, danh sách mảng
+    terms.npy              - từ vựng đã sắp xếp, terms[i] là cột thứ i
+    idf.npy                - trọng số IDF của TfidfVectorizer
+    document_frequency.npy - tần suất văn bản của HashingTfidfVectorizer (mô
+                             hình huấn luyện streaming, không có terms/idf)
+    labels.npy             - nhãn (article) theo thứ tự lớp
+    test_case_ids.npy      - ID các bản án của tập test lúc train (nếu có)
+    nb_*.npy               - các mảng của MultinomialNB (class_count, feature_count,
+                             class_log_prior, feature_log_prob) và nb_classes: mã
+                             nhãn (vị trí trong labels) của từng lớp NB, có thể ít
+                             hơn labels khi một số điều luật không có mẫu train
+    classifier.pkl         - chỉ dùng cho các classifier không có dạng mảng
+                             phẳng (RandomForest, SGD)
+
+Không lưu stop_words_ của TfidfVectorizer (tập các từ bị loại khi fit, không
+cần cho transform). Các mảng .npy có thể được memory-map khi load.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.preprocessing import LabelEncoder
+
+from models.streaming import HashingTfidfVectorizer
+
+SCHEMA_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+
+VECTORIZER_PARAMS = ('lowercase', 'token_pattern', 'ngram_range', 'max_df', 'min_df',
+                     'max_features', 'binary', 'norm', 'use_idf', 'smooth_idf', 'sublinear_tf')
+NB_ARRAYS = ('class_count_', 'feature_count_', 'class_log_prior_', 'feature_log_prob_')
+
+
+def _json_safe(params: Dict) -> Dict:
+    """Chỉ giữ các tham số có thể ghi ra JSON"""
+    safe = {}
+    for key, value in params.items():
+        if isinstance(value, tuple):
+            value = list(value)
+        if value is None or isinstance(value, (bool, int, float, str, list)):
+            safe[key] = value
+    return safe
+
+
+def training_data_hash(loader) -> Optional[str]:
+    """
+    Dấu vết SHA-1 của dữ liệu training
+
+    Tính trên toàn bộ case_law_data và các cột metadata của case_data.
+    """
+    if loader.case_data is None or loader.case_law_data is None:
+        return None
+    digest = hashlib.sha1()
+    for frame in (loader.case_law_data, loader.case_data.drop(columns=['content', 'text'], errors='ignore')):
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def is_model_dir(path: str) -> bool:
+    """Kiểm tra path có phải thư mục mô hình định dạng mới hay không"""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+
+def save_model_dir(directory: str, vectorizer: TfidfVectorizer, classifier,
+                   label_encoder: LabelEncoder, model_type: str, multi_label: bool = False,
+                   data_hash: Optional[str] = None, test_case_ids: Optional[np.ndarray] = None):
+    """
+    Lưu mô hình ra thư mục theo định dạng mảng + manifest
+
+    Args:
+        directory: Thư mục đích
+        vectorizer: TfidfVectorizer đã fit
+        classifier: Classifier đã fit
+        label_encoder: LabelEncoder đã fit
+        model_type: Loại mô hình (naive_bayes, random_forest)
+        multi_label: Mô hình đa nhãn hay không
+        data_hash: Dấu vết dữ liệu training
+        test_case_ids: ID các bản án không dùng để train (tập test)
+    """
+    os.makedirs(directory, exist_ok=True)
+    # Xóa manifest cũ trước để thư mục ghi dở không bị coi là hợp lệ
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    arrays = {'labels': np.asarray(label_encoder.classes_).astype(str)}
+    if test_case_ids is not None:
+        arrays['test_case_ids'] = np.asarray(test_case_ids, dtype=np.int64)
+    if isinstance(vectorizer, HashingTfidfVectorizer):
+        arrays['document_frequency'] = vectorizer.document_frequency
+        vectorizer_params = {
+            'type': 'hashing',
+            'n_features': vectorizer.n_features,
+            'ngram_range': list(vectorizer.ngram_range),
+            'use_idf': vectorizer.use_idf,
+            'norm': vectorizer.norm,
+            'n_documents': vectorizer.n_documents,
+        }
+        n_features = vectorizer.n_features
+    else:
+        terms = np.empty(len(vectorizer.vocabulary_), dtype=object)
+        for term, column in vectorizer.vocabulary_.items():
+            terms[column] = term
+        arrays['terms'] = terms.astype(str)
+        if vectorizer.use_idf:
+            arrays['idf'] = np.asarray(vectorizer.idf_)
+        vectorizer_params = _json_safe({k: getattr(vectorizer, k) for k in VECTORIZER_PARAMS})
+        n_features = len(terms)
+
+    if type(classifier) is MultinomialNB:
+        for name in NB_ARRAYS:
+            arrays['nb_' + name.rstrip('_')] = np.asarray(getattr(classifier, name))
+        arrays['nb_classes'] = np.asarray(classifier.classes_, dtype=np.int64)
+        classifier_file = None
+    else:
+        classifier_file = 'classifier.pkl'
+        with open(os.path.join(directory, classifier_file), 'wb') as f:
+            pickle.dump(classifier, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f"{name}.npy"), array, allow_pickle=False)
+
+    manifest = {
+        'schema_version': SCHEMA_VERSION,
+        'model_type': model_type,
+        'multi_label': multi_label,
+        'classifier_class': type(classifier).__name__,
+        'classifier_file': classifier_file,
+        'hyperparameters': {
+            'vectorizer': vectorizer_params,
+            'classifier': _json_safe(classifier.get_params(deep=False)),
+        },
+        'training_data_hash': data_hash,
+        'arrays': sorted(arrays),
+        'n_features': n_features,
+        'n_classes': len(arrays['labels']),
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def load_model_dir(directory: str, mmap: bool = False) -> Dict:
+    """
+    Load mô hình từ thư mục định dạng mới
+
+    Args:
+        directory: Thư mục mô hình
+        mmap: Memory-map các mảng lớn thay vì đọc vào RAM
+
+    Returns:
+        Dict gồm vectorizer, classifier, label_encoder, model_type,
+        multi_label, test_case_ids (None nếu không lưu) và manifest
+    """
+    with open(os.path.join(directory, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('schema_version') != SCHEMA_VERSION:
+        raise ValueError(f"Không hỗ trợ schema_version {manifest.get('schema_version')}")
+
+    mmap_mode = 'r' if mmap else None
+
+    def load_array(name: str) -> np.ndarray:
+        return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode,
+                       allow_pickle=False)
+
+    vectorizer_params = dict(manifest['hyperparameters']['vectorizer'])
+    vectorizer_params['ngram_range'] = tuple(vectorizer_params['ngram_range'])
+    if vectorizer_params.pop('type', None) == 'hashing':
+        n_documents = vectorizer_params.pop('n_documents')
+        vectorizer = HashingTfidfVectorizer(**vectorizer_params)
+        # Sao chép để vẫn có thể tiếp tục partial_fit sau khi load
+        vectorizer.document_frequency = np.array(load_array('document_frequency'))
+        vectorizer.n_documents = n_documents
+    else:
+        vectorizer = TfidfVectorizer(**vectorizer_params)
+        terms = np.load(os.path.join(directory, 'terms.npy'), allow_pickle=False)
+        vectorizer.vocabulary_ = {str(term): i for i, term in enumerate(terms)}
+        if vectorizer.use_idf:
+            vectorizer.idf_ = load_array('idf')
+
+    label_encoder = LabelEncoder()
+    label_encoder.classes_ = np.load(os.path.join(directory, 'labels.npy'), allow_pickle=False)
+
+    if manifest['classifier_file']:
+        with open(os.path.join(directory, manifest['classifier_file']), 'rb') as f:
+            classifier = pickle.load(f)
+    else:
+        classifier = MultinomialNB(**manifest['hyperparameters']['classifier'])
+        for name in NB_ARRAYS:
+            setattr(classifier, name, load_array('nb_' + name.rstrip('_')))
+        # Thư mục lưu trước khi có nb_classes luôn có đủ mọi lớp
+        classifier.classes_ = (np.array(load_array('nb_classes')) if 'nb_classes' in manifest['arrays']
+                               else np.arange(len(classifier.class_count_)))
+        classifier.n_features_in_ = manifest['n_features']
+
+    return {
+        'vectorizer': vectorizer,
+        'classifier': classifier,
+        'label_encoder': label_encoder,
+        'model_type': manifest['model_type'],
+        'multi_label': manifest.get('multi_label', False),
+        'test_case_ids': (np.load(os.path.join(directory, 'test_case_ids.npy'), allow_pickle=False)
+                          if 'test_case_ids' in manifest['arrays'] else None),
+        'manifest': manifest,
+    }
@@ -0,0 +1,112 @@
+"""
+Dự đoán theo lô song song trên nhiều tiến trình
+
+Mỗi worker load mô hình từ thư mục đã lưu (định dạng model_io hoặc artifact
+tuyến tính) với mmap=True: các mảng lớn (IDF, xác suất đặc trưng của Naive
+Bayes) nằm trong page cache của hệ điều hành và được mọi worker dùng chung
+ở chế độ chỉ đọc, thay vì mỗi worker nhận một bản pickle riêng. Bản án được
+chia thành các chunk, mỗi chunk chấm điểm bằng predict_topk trong một worker
+và kết quả được ghép lại đúng thứ tự đầu vào.
+
+Chỉ Naive Bayes (mảng nb_*.npy) và artifact tuyến tính được memory-map;
+RandomForest và SGD nằm trong classifier.pkl nên mỗi worker unpickle
+một bản đầy đủ, bộ nhớ tăng theo số worker. Tạo pool tốn thời gian load mô
+hình ở mọi worker, nên một ParallelPredictor nên được dùng cho nhiều lần
+predict_topk (LawClassifier giữ lại pool giữa các lần gọi với n_jobs > 1).
+"""
+
+import multiprocessing
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from models.predictor import load_predictor
+
+_worker_predictor = None
+
+
+def _init_worker(model_path: str):
+    global _worker_predictor
+    _worker_predictor = load_predictor(model_path, mmap=True, quiet=True)
+
+
+def _predict_chunk(task: Tuple[int, List[str], int]) -> Tuple[int, Dict[str, np.ndarray]]:
+    start, texts, top_k = task
+    return start, _worker_predictor.predict_topk(texts, top_k=top_k)
+
+
+class ParallelPredictor:
+    """Pool tiến trình dự đoán top-k, dùng chung trọng số mô hình qua mmap"""
+
+    def __init__(self, model_path: str, n_workers: Optional[int] = None,
+                 start_method: Optional[str] = None):
+        """
+        Args:
+            model_path: Thư mục mô hình (save_model) hoặc artifact tuyến tính (export_linear)
+            n_workers: Số tiến trình, mặc định bằng số CPU
+            start_method: Cách tạo tiến trình của multiprocessing (fork, spawn, forkserver)
+        """
+        if not os.path.isdir(model_path):
+            raise ValueError(f"Cần thư mục mô hình để memory-map, nhận được {model_path}")
+        self.model_path = model_path
+        self.n_workers = n_workers or os.cpu_count() or 1
+        context = multiprocessing.get_context(start_method)
+        self.pool = context.Pool(self.n_workers, initializer=_init_worker, initargs=(model_path,))
+
+    def __enter__(self) -> 'ParallelPredictor':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def worker_pids(self) -> List[int]:
+        """PID của các worker (dùng để đo bộ nhớ)"""
+        return [process.pid for process in self.pool._pool]
+
+    def _chunks(self, texts: List[str], top_k: int, chunk_size: int) -> Iterator[Tuple[int, List[str], int]]:
+        for start in range(0, len(texts), chunk_size):
+            yield start, list(texts[start:start + chunk_size]), top_k
+
+    def predict_topk(self, texts: List[str], top_k: int = 3,
+                     chunk_size: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Top-k dạng cột (doc_index, rank, article, confidence), giống LawClassifier.predict_topk
+
+        Args:
+            texts: Các nội dung bản án
+            top_k: Số điều luật cho mỗi bản án
+            chunk_size: Số bản án mỗi task, mặc định chia mỗi worker khoảng 4 chunk
+        """
+        if chunk_size is None:
+            chunk_size = max(1, min(10000, -(-len(texts) // (self.n_workers * 4))))
+
+        parts = []
+        # imap giữ thứ tự chunk nên chỉ cần cộng vị trí bắt đầu vào doc_index
+        for start, columns in self.pool.imap(_predict_chunk, self._chunks(texts, top_k, chunk_size)):
+            columns['doc_index'] = columns['doc_index'] + start
+            parts.append(columns)
+
+        if not parts:
+            return {
+                'doc_index': np.empty(0, dtype=np.int64),
+                'rank': np.empty(0, dtype=np.int64),
+                'article': np.empty(0, dtype=str),
+                'confidence': np.empty(0, dtype=np.float64),
+            }
+        return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+    def predict_batch(self, texts: List[str], top_k: int = 3,
+                      chunk_size: Optional[int] = None) -> List[List[Dict]]:
+        """List các dự đoán cho từng bản án, giống LawClassifier.predict_batch"""
+        columns = self.predict_topk(texts, top_k=top_k, chunk_size=chunk_size)
+        records = [
+            {'rank': int(rank), 'article': str(article), 'confidence': float(confidence)}
+            for rank, article, confidence in zip(columns['rank'], columns['article'], columns['confidence'])
+        ]
+        k = len(records) // len(texts) if len(texts) else 0
+        return [records[i:i + k] for i in range(0, len(records), k)] if k else [[] for _ in texts]
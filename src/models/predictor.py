@@ -0,0 +1,38 @@
+"""
+Load mô hình đã lưu thành đối tượng dự đoán dùng chung cho server và
+các tiến trình dự đoán song song
+"""
+
+import contextlib
+import io
+import json
+import os
+
+
+def load_predictor(path: str, mmap: bool = False, quiet: bool = False):
+    """
+    Load mô hình để phục vụ dự đoán
+
+    Args:
+        path: Artifact tuyến tính (export_linear), thư mục mô hình hoặc file .pkl
+        mmap: Memory-map các mảng của mô hình thay vì đọc vào RAM
+        quiet: Không in thông báo khi load
+
+    Returns:
+        Đối tượng có predict_topk(texts, top_k) (LinearScorer hoặc LawClassifier)
+    """
+    manifest_path = os.path.join(path, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            if json.load(f).get('format') == 'linear_nb':
+                # Không import scikit-learn khi chỉ cần artifact tuyến tính
+                from models.linear_scorer import LinearScorer
+                return LinearScorer(path, mmap=mmap)
+
+    from models.law_classifier import LawClassifier
+    classifier = LawClassifier()
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        classifier.load_model(path, mmap=mmap)
+    if not classifier.is_trained:
+        raise ValueError(f"Không load được mô hình từ {path}")
+    return classifier
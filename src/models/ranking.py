@@ -0,0 +1,37 @@
+"""
+Các hàm xếp hạng top-k dùng chung cho các mô hình
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lấy top-k theo từng dòng của ma trận điểm bằng argpartition
+
+    Chỉ k phần tử lớn nhất của mỗi dòng được sắp xếp, thay vì sắp xếp toàn bộ.
+
+    Args:
+        scores: Ma trận điểm (n_samples × n_classes) hoặc vector 1 chiều
+        k: Số phần tử cần lấy
+
+    Returns:
+        Tuple (indices, values) kích thước (n_samples × k), giảm dần theo điểm
+    """
+    scores = np.atleast_2d(scores)
+    k = max(0, min(k, scores.shape[1]))
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(scores.dtype)
+
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind='stable')
+    indices = np.take_along_axis(candidates, order, axis=1)
+    return indices, np.take_along_axis(candidate_scores, order, axis=1)
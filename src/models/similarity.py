@@ -0,0 +1,224 @@
+"""
+Tìm bản án tương tự theo độ tương đồng cosine trong không gian TF-IDF
+
+Mỗi bản án được vector hóa một lần bằng vectorizer đã fit của LawClassifier
+và chuẩn hóa L2, nên cosine của hai bản án là tích vô hướng của hai vector.
+Ma trận bản án × từ được giữ ở hai dạng CSR:
+
+    matrix     (n_cases × vocab) - vector của từng bản án (truy vấn theo case_id,
+                                   chấm lại điểm chính xác cho các ứng viên)
+    blocks     (vocab × block)   - dạng chuyển vị chia theo khối bản án; điểm của
+                                   truy vấn với một khối chỉ duyệt các dòng ứng với
+                                   từ có trong truy vấn
+
+Truy vấn được xử lý theo từng chunk, mỗi khối bản án lấy top-k bằng
+argpartition rồi gộp, nên bộ nhớ trung gian không vượt chunk_size × block_size.
+Chế độ approximate chỉ giữ max_query_terms từ có trọng số lớn nhất của truy
+vấn để lấy ứng viên, rồi chấm lại điểm chính xác cho các ứng viên đó.
+"""
+
+import json
+import os
+import sys
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from data_loader import DataLoader
+from data.config import MODEL_CONFIG
+from models import ranking
+
+
+def prune_queries(queries: sparse.csr_matrix, max_terms: int) -> sparse.csr_matrix:
+    """Giữ max_terms phần tử có trọng số lớn nhất của mỗi dòng"""
+    queries = queries.tocsr(copy=True)
+    lengths = np.diff(queries.indptr)
+    for row in np.flatnonzero(lengths > max_terms):
+        data = queries.data[queries.indptr[row]:queries.indptr[row + 1]]
+        data[np.argpartition(-data, max_terms - 1)[max_terms:]] = 0
+    queries.eliminate_zeros()
+    return queries
+
+
+class SimilarCaseIndex:
+    """Chỉ mục cosine trên vector TF-IDF của toàn bộ case_data"""
+
+    def __init__(self, vectorizer, block_size: Optional[int] = None, chunk_size: Optional[int] = None):
+        """
+        Args:
+            vectorizer: Vectorizer đã fit (LawClassifier.vectorizer)
+            block_size: Số bản án mỗi khối, mặc định MODEL_CONFIG['similarity']
+            chunk_size: Số truy vấn mỗi lần nhân ma trận, mặc định MODEL_CONFIG['similarity']
+        """
+        config = MODEL_CONFIG['similarity']
+        self.vectorizer = vectorizer
+        self.block_size = block_size or config['block_size']
+        self.chunk_size = chunk_size or config['chunk_size']
+        self.matrix: Optional[sparse.csr_matrix] = None
+        self.blocks = []
+        self.loader: Optional[DataLoader] = None
+        self.is_fitted = False
+
+    @property
+    def num_rows(self) -> int:
+        return 0 if self.matrix is None else self.matrix.shape[0]
+
+    def _vectorize(self, texts) -> sparse.csr_matrix:
+        if isinstance(texts, pd.Series):
+            texts = texts.fillna('')
+        vectors = self.vectorizer.transform(texts)
+        return normalize(vectors, norm='l2', copy=False).astype(np.float32).tocsr()
+
+    def _vectorize_rows(self, loader: DataLoader, start: int, end: int,
+                        batch_size: int = 10000) -> sparse.csr_matrix:
+        """Vector hóa văn bản các dòng [start, end) của case_data theo từng lô"""
+        texts = loader.get_case_texts('text')
+        parts = [self._vectorize(texts.take(np.arange(begin, min(begin + batch_size, end))))
+                 for begin in range(start, end, batch_size)]
+        return sparse.vstack(parts, format='csr')
+
+    def _build_blocks(self):
+        """Chia dạng chuyển vị của ma trận thành các khối bản án liên tiếp"""
+        self.blocks = [(start, self.matrix[start:start + self.block_size].T.tocsr())
+                       for start in range(0, self.num_rows, self.block_size)]
+
+    def fit(self, loader: DataLoader):
+        """
+        Vector hóa toàn bộ văn bản bản án
+
+        Args:
+            loader: DataLoader đã load dữ liệu
+        """
+        if loader.case_data is None or len(loader.case_data) == 0:
+            print("❌ Không có dữ liệu bản án để đánh chỉ mục")
+            return
+        print(f"📐 Đang vector hóa {len(loader.case_data):,} bản án cho tìm kiếm tương tự...")
+        self.loader = loader
+        self.matrix = self._vectorize_rows(loader, 0, len(loader.case_data))
+        self._build_blocks()
+        self.is_fitted = True
+        print(f"✅ Đã đánh chỉ mục {self.num_rows:,} bản án ({self.matrix.nnz:,} phần tử khác 0)")
+
+    def update(self, loader: DataLoader):
+        """Vector hóa thêm các bản án mới nối vào cuối case_data (vd sau append_data())"""
+        if not self.is_fitted or len(loader.case_data) < self.num_rows:
+            self.fit(loader)
+            return
+        self.loader = loader
+        if len(loader.case_data) == self.num_rows:
+            return
+        new = self._vectorize_rows(loader, self.num_rows, len(loader.case_data))
+        self.matrix = sparse.vstack([self.matrix, new], format='csr')
+        self._build_blocks()
+
+    def _exact_scores(self, queries: sparse.csr_matrix, rows: np.ndarray) -> np.ndarray:
+        """Cosine chính xác của mỗi truy vấn với các bản án ứng viên của nó"""
+        pairs = self.matrix[rows.ravel()].multiply(queries[np.repeat(np.arange(rows.shape[0]), rows.shape[1])])
+        return np.asarray(pairs.sum(axis=1), dtype=np.float32).reshape(rows.shape)
+
+    def rank_many(self, queries: sparse.csr_matrix, top_k: int = 10, approximate: bool = False,
+                  exclude: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k bản án gần nhất cho nhiều vector truy vấn (đã chuẩn hóa L2)
+
+        Args:
+            queries: Ma trận truy vấn (n_queries × vocab)
+            top_k: Số bản án cần lấy
+            approximate: Lấy ứng viên bằng truy vấn đã cắt bớt từ rồi chấm lại chính xác
+            exclude: Vị trí dòng cần loại khỏi kết quả của từng truy vấn (-1 là không loại)
+
+        Returns:
+            Tuple (vị trí dòng trong case_data, cosine), kích thước (n_queries × top_k)
+        """
+        config = MODEL_CONFIG['similarity']
+        top_k = max(0, min(top_k, self.num_rows - (exclude is not None)))
+        wanted = top_k + (exclude is not None)
+        pool = wanted * config['candidate_factor'] if approximate else wanted
+        search = prune_queries(queries, config['max_query_terms']) if approximate else queries
+
+        indices, values = [], []
+        for start in range(0, queries.shape[0], self.chunk_size):
+            end = min(start + self.chunk_size, queries.shape[0])
+            candidates, scores = [], []
+            for offset, block in self.blocks:
+                block_indices, block_values = ranking.top_k((search[start:end] @ block).toarray(), pool)
+                candidates.append(block_indices + offset)
+                scores.append(block_values)
+            candidates, scores = np.hstack(candidates), np.hstack(scores)
+            if approximate:
+                scores = self._exact_scores(queries[start:end], candidates)
+            if exclude is not None:
+                scores[candidates == np.asarray(exclude[start:end])[:, None]] = -np.inf
+            order, chunk_values = ranking.top_k(scores, top_k)
+            indices.append(np.take_along_axis(candidates, order, axis=1))
+            values.append(chunk_values)
+        if not indices:
+            return np.empty((0, top_k), dtype=np.int64), np.empty((0, top_k), dtype=np.float32)
+        return np.vstack(indices), np.vstack(values)
+
+    def find_similar_cases(self, query: Union[str, int], k: int = 10,
+                           approximate: bool = False) -> pd.DataFrame:
+        """
+        Tìm các bản án tương tự một văn bản hoặc một bản án đã có
+
+        Args:
+            query: Nội dung bản án (str) hoặc case_id (int, bản án này bị loại khỏi kết quả)
+            k: Số bản án cần lấy
+            approximate: Chế độ cắt bớt từ của truy vấn, nhanh hơn trên kho rất lớn
+
+        Returns:
+            DataFrame các dòng case_data (bỏ cột văn bản) kèm rank và similarity,
+            chỉ gồm các bản án có similarity > 0
+        """
+        if not self.is_fitted:
+            print("❌ Chỉ mục chưa được fit")
+            return pd.DataFrame()
+
+        exclude = None
+        if isinstance(query, str):
+            vector = self._vectorize([query])
+        else:
+            row = self.loader.case_index.position(query)
+            if row is None or row >= self.num_rows:
+                print(f"❌ Không tìm thấy bản án {query} trong chỉ mục")
+                return pd.DataFrame()
+            vector, exclude = self.matrix[[row]], np.array([row])
+
+        indices, values = self.rank_many(vector, k, approximate, exclude)
+        keep = values[0] > 0
+        rows, similarity = indices[0][keep], values[0][keep]
+        results = self.loader.case_data.iloc[rows].drop(columns=['content', 'text'], errors='ignore')
+        return results.assign(rank=np.arange(1, len(rows) + 1), similarity=similarity)
+
+    def save(self, directory: str):
+        """Lưu ma trận bản án × từ ra thư mục (vectorizer lưu riêng cùng mô hình)"""
+        os.makedirs(directory, exist_ok=True)
+        sparse.save_npz(os.path.join(directory, 'matrix.npz'), self.matrix, compressed=False)
+        # meta.json ghi sau cùng, là dấu hiệu chỉ mục đã ghi xong
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'num_rows': self.num_rows, 'n_features': self.matrix.shape[1]}, f, indent=2)
+
+    @classmethod
+    def load(cls, directory: str, loader: DataLoader, vectorizer) -> Optional['SimilarCaseIndex']:
+        """Load chỉ mục đã lưu, trả về None nếu chưa có, hỏng hoặc không khớp dữ liệu"""
+        try:
+            with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            matrix = sparse.load_npz(os.path.join(directory, 'matrix.npz')).tocsr()
+        except (OSError, ValueError):
+            return None
+        n_features = getattr(vectorizer, 'n_features', None) or len(vectorizer.vocabulary_)
+        if meta['num_rows'] > len(loader.case_data) or matrix.shape[1] != n_features:
+            return None
+        index = cls(vectorizer)
+        index.matrix, index.loader, index.is_fitted = matrix, loader, True
+        index._build_blocks()
+        # Các bản án nối thêm sau lần lưu được vector hóa bổ sung
+        index.update(loader)
+        return index
@@ -0,0 +1,139 @@
+"""
+Các thành phần cho huấn luyện streaming (out-of-core)
+
+Văn bản được vector hóa bằng HashingVectorizer (không cần từ vựng, không cần
+fit), tùy chọn nhân với IDF được cập nhật dần theo số văn bản đã thấy. Nhãn
+được đọc trước từ case_law_data.csv theo từng chunk thành các mảng số
+nguyên (case_id, mã nhãn) đã sắp xếp, nên bộ nhớ chỉ tỉ lệ với số cặp bản
+án - điều luật chứ không với lượng văn bản. Tập holdout được chọn theo băm
+case_id, không phụ thuộc thứ tự hay kích thước chunk.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+
+class HashingTfidfVectorizer:
+    """TF-IDF trên không gian băm, IDF cập nhật dần qua partial_fit"""
+
+    def __init__(self, n_features: int = 2 ** 16, ngram_range: Tuple[int, int] = (1, 2),
+                 use_idf: bool = True, norm: Optional[str] = 'l2'):
+        """
+        Args:
+            n_features: Số chiều của không gian băm
+            ngram_range: Khoảng n-gram khi tách từ
+            use_idf: Nhân với IDF tính trên các văn bản đã partial_fit
+            norm: Chuẩn hóa mỗi dòng ('l1', 'l2' hoặc None)
+        """
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.use_idf = use_idf
+        self.norm = norm
+        # Đếm nguyên lần xuất hiện, không đổi dấu để dùng được với MultinomialNB
+        self.hasher = HashingVectorizer(n_features=n_features, ngram_range=self.ngram_range,
+                                        alternate_sign=False, norm=None)
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+        self.n_documents = 0
+
+    @property
+    def idf_(self) -> np.ndarray:
+        """IDF làm trơn giống TfidfVectorizer(smooth_idf=True)"""
+        return np.log((1 + self.n_documents) / (1 + self.document_frequency)) + 1
+
+    def _weight(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        X = counts.astype(np.float64)
+        if self.use_idf:
+            X.data *= self.idf_[X.indices]
+        if self.norm:
+            X = normalize(X, norm=self.norm, copy=False)
+        return X
+
+    def partial_fit_transform(self, texts: Iterable[str]) -> sparse.csr_matrix:
+        """Cập nhật tần suất văn bản với texts rồi vector hóa chúng (băm một lần)"""
+        counts = self.hasher.transform(texts).tocsr()
+        counts.sum_duplicates()
+        self.document_frequency += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents += counts.shape[0]
+        return self._weight(counts)
+
+    def partial_fit(self, texts: Iterable[str]) -> 'HashingTfidfVectorizer':
+        self.partial_fit_transform(texts)
+        return self
+
+    def transform(self, texts: Iterable[str]) -> sparse.csr_matrix:
+        return self._weight(self.hasher.transform(texts).tocsr())
+
+
+class CaseLabels:
+    """Nhãn (article) của từng bản án, lưu dạng mảng số nguyên đã sắp xếp theo case_id"""
+
+    def __init__(self, case_ids: np.ndarray, codes: np.ndarray, classes: np.ndarray):
+        order = np.lexsort((codes, case_ids))
+        self.case_ids = case_ids[order]
+        self.codes = codes[order]
+        self.classes = classes
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame]) -> 'CaseLabels':
+        """
+        Đọc các cặp (case_id, article) từ các chunk của case_law_data
+
+        Cặp trùng lặp được loại bỏ, giống prepare_multilabel_data.
+        """
+        label_codes: Dict[str, int] = {}
+        case_parts, code_parts = [], []
+        for chunk in chunks:
+            chunk = chunk.dropna(subset=['case_id', 'article'])
+            articles = chunk['article']
+            if pd.api.types.is_float_dtype(articles.dtype):
+                # Chunk đọc không theo schema có NaN thành float ('10.0'), đưa về
+                # dạng số nguyên để nhãn giống nhau giữa các chunk
+                articles = articles.astype('Int64')
+            articles = articles.astype(str)
+            for article in articles.unique():
+                label_codes.setdefault(article, len(label_codes))
+            case_parts.append(chunk['case_id'].to_numpy(dtype=np.int64))
+            code_parts.append(articles.map(label_codes).to_numpy(dtype=np.int32))
+
+        case_ids = np.concatenate(case_parts) if case_parts else np.empty(0, dtype=np.int64)
+        codes = np.concatenate(code_parts) if code_parts else np.empty(0, dtype=np.int32)
+
+        # Mã nhãn theo thứ tự sắp xếp của tên, giống LabelEncoder
+        classes = np.array(sorted(label_codes), dtype=str)
+        remap = np.empty(len(classes), dtype=np.int32)
+        for new_code, article in enumerate(classes):
+            remap[label_codes[article]] = new_code
+        codes = remap[codes] if len(codes) else codes
+
+        pairs = np.unique(np.column_stack([case_ids, codes.astype(np.int64)]), axis=0)
+        return cls(pairs[:, 0], pairs[:, 1].astype(np.int32), classes)
+
+    def __len__(self) -> int:
+        return len(self.case_ids)
+
+    def lookup(self, case_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Các cặp nhãn của một nhóm bản án
+
+        Returns:
+            Tuple (vị trí bản án trong case_ids đầu vào, mã nhãn), mỗi cặp một phần tử
+        """
+        case_ids = np.asarray(case_ids, dtype=np.int64)
+        starts = np.searchsorted(self.case_ids, case_ids, side='left')
+        ends = np.searchsorted(self.case_ids, case_ids, side='right')
+        counts = ends - starts
+        rows = np.repeat(np.arange(len(case_ids)), counts)
+        # Vị trí của từng cặp: start của bản án + thứ tự trong nhóm
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return rows, self.codes[np.repeat(starts, counts) + offsets]
+
+
+def holdout_mask(case_ids: np.ndarray, test_size: float, seed: int = 42) -> np.ndarray:
+    """Chọn bản án vào tập holdout theo băm case_id (ổn định giữa các lần chạy)"""
+    hashed = pd.util.hash_array(np.asarray(case_ids, dtype=np.int64), hash_key=f"{seed:016d}")
+    return (hashed % 10000) < int(test_size * 10000)
@@ -0,0 +1,445 @@
+"""
+Cache tách từ theo nội dung cho các lần huấn luyện lặp lại
+
+Mỗi văn bản phân biệt được tách âm tiết (chữ thường, cùng token_pattern với
+TfidfVectorizer và không chuẩn hóa Unicode, vì transform() lúc dự đoán cũng
+không chuẩn hóa) và sinh bigram đúng một lần thành ma trận đếm thưa văn bản ×
+n-gram trên toàn bộ từ vựng (chưa lọc min_df/max_df/max_features). Ma trận
+được lưu trong thư mục cache, khóa là hash của cấu hình tách từ và tập hash
+nội dung các văn bản, nên đổi classifier, test_size hay thứ tự văn bản vẫn
+dùng lại được cache. Từ ma trận đếm, fit_tfidf() dựng lại đúng
+vocabulary_/idf_ mà TfidfVectorizer.fit_transform sẽ cho, nên lưu/load và dự
+đoán không thay đổi.
+
+Cấu trúc một mục cache (thư mục <khóa>/):
+
+    meta.json          - cấu hình tách từ, số văn bản, số unigram/bigram
+    digests.npy        - hash nội dung đã sắp xếp, dòng i của ma trận đếm
+    unigrams.txt       - các âm tiết, mỗi dòng một âm tiết (cột 0..n_unigrams-1)
+    bigrams.npy        - cặp chỉ số unigram của các cột bigram
+    counts_*.npy       - data/indices/indptr của ma trận đếm CSR
+
+Cache bị giới hạn theo tổng dung lượng, các mục ít được dùng gần đây nhất
+(theo mtime của meta.json) bị xóa trước.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from collections import defaultdict
+from numbers import Integral
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+# Phiên bản 1 chuẩn hóa NFC trước khi tách, khác với TfidfVectorizer
+TOKEN_CACHE_VERSION = 2
+META_FILE = 'meta.json'
+# Số văn bản mỗi lô khi đếm, giới hạn bộ nhớ của các mảng token tạm
+COUNT_BATCH_DOCS = 1000
+
+
+class VietnameseTokenizer:
+    """Tách âm tiết tiếng Việt và sinh n-gram (tối đa bigram) dạng chỉ số"""
+
+    def __init__(self, ngram_range: Tuple[int, int] = (1, 2), lowercase: bool = True,
+                 token_pattern: str = r"(?u)\b\w\w+\b"):
+        """
+        Args:
+            ngram_range: Khoảng n-gram, chỉ hỗ trợ n <= 2
+            lowercase: Chuyển chữ thường trước khi tách
+            token_pattern: Regex một âm tiết (mặc định giống TfidfVectorizer)
+        """
+        if not 1 <= ngram_range[0] <= ngram_range[1] <= 2:
+            raise ValueError(f"ngram_range {ngram_range} không được hỗ trợ (chỉ unigram/bigram)")
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.token_pattern = token_pattern
+        self._pattern = re.compile(token_pattern)
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer) -> Optional['VietnameseTokenizer']:
+        """Tokenizer tương đương bộ tách từ của một TfidfVectorizer, None nếu không tương đương được"""
+        if not isinstance(vectorizer, TfidfVectorizer):
+            return None
+        if (vectorizer.analyzer != 'word' or vectorizer.tokenizer is not None
+                or vectorizer.preprocessor is not None or vectorizer.stop_words is not None
+                or vectorizer.vocabulary is not None or vectorizer.strip_accents is not None
+                or vectorizer.ngram_range[1] > 2):
+            return None
+        return cls(vectorizer.ngram_range, vectorizer.lowercase, vectorizer.token_pattern)
+
+    def config(self) -> Dict:
+        return {
+            'version': TOKEN_CACHE_VERSION,
+            'ngram_range': list(self.ngram_range),
+            'lowercase': self.lowercase,
+            'token_pattern': self.token_pattern,
+        }
+
+    def syllables(self, text: str) -> List[str]:
+        """Các âm tiết của một văn bản, giống build_analyzer() của TfidfVectorizer"""
+        return self._pattern.findall(text.lower() if self.lowercase else text)
+
+    def count(self, texts: Iterable[str]) -> 'TokenCounts':
+        """
+        Đếm n-gram của các văn bản thành ma trận thưa trên toàn bộ từ vựng
+
+        Unigram được đánh số bằng dict, bigram được mã hóa thành cặp chỉ số
+        unigram (id1 << 32 | id2) và gom bằng NumPy, không tạo chuỗi bigram.
+        """
+        vocabulary = defaultdict()
+        vocabulary.default_factory = vocabulary.__len__
+        rows, keys, values = [], [], []
+        n_docs = 0
+
+        def flush(batch: List[np.ndarray], first_doc: int):
+            lengths = np.array([len(ids) for ids in batch], dtype=np.int64)
+            ids = np.concatenate(batch)
+            docs = np.repeat(np.arange(len(batch), dtype=np.int64), lengths)
+            batch_keys, batch_docs = [], []
+            if self.ngram_range[0] == 1:
+                # Unigram mang bit 62 để không trùng khóa với bigram
+                batch_keys.append(ids | (1 << 62))
+                batch_docs.append(docs)
+            if self.ngram_range[1] == 2 and len(ids) > 1:
+                same_doc = docs[1:] == docs[:-1]
+                batch_keys.append(((ids[:-1] << 32) | ids[1:])[same_doc])
+                batch_docs.append(docs[1:][same_doc])
+            if not batch_keys:
+                return
+            batch_keys = np.concatenate(batch_keys)
+            batch_docs = np.concatenate(batch_docs)
+            unique_keys, columns = np.unique(batch_keys, return_inverse=True)
+            matrix = sparse.csr_matrix(
+                (np.ones(len(columns), dtype=np.int32), (batch_docs, columns)),
+                shape=(len(batch), len(unique_keys)))
+            matrix.sum_duplicates()
+            matrix = matrix.tocoo()
+            rows.append(matrix.row.astype(np.int64) + first_doc)
+            keys.append(unique_keys[matrix.col])
+            values.append(matrix.data)
+
+        lookup = vocabulary.__getitem__
+        batch: List[np.ndarray] = []
+        for text in texts:
+            tokens = self.syllables(text) if isinstance(text, str) else []
+            batch.append(np.fromiter(map(lookup, tokens), dtype=np.int64, count=len(tokens)))
+            if len(batch) >= COUNT_BATCH_DOCS:
+                flush(batch, n_docs)
+                n_docs += len(batch)
+                batch = []
+        if batch:
+            flush(batch, n_docs)
+            n_docs += len(batch)
+
+        unigrams = np.empty(len(vocabulary), dtype=object)
+        for token, index in vocabulary.items():
+            unigrams[index] = token
+
+        all_keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+        unique_keys, columns = np.unique(all_keys, return_inverse=True)
+        # Sau np.unique các bigram (bit 62 = 0) đứng trước các unigram
+        n_bigrams = int(np.searchsorted(unique_keys, 1 << 62))
+        bigram_keys = unique_keys[:n_bigrams]
+        unigram_ids = unique_keys[n_bigrams:] & ((1 << 62) - 1)
+        # Cột: unigram theo chỉ số vocabulary trước, rồi tới bigram
+        n_unigrams = len(unigrams) if self.ngram_range[0] == 1 else 0
+        column_map = np.concatenate([n_unigrams + np.arange(n_bigrams), unigram_ids]).astype(np.int64)
+        counts = sparse.csr_matrix(
+            (np.concatenate(values) if values else np.empty(0, dtype=np.int32),
+             (np.concatenate(rows) if rows else np.empty(0, dtype=np.int64), column_map[columns])),
+            shape=(n_docs, n_unigrams + n_bigrams))
+        counts.sum_duplicates()
+        bigrams = np.column_stack([bigram_keys >> 32, bigram_keys & 0xFFFFFFFF]).astype(np.int32)
+        return TokenCounts(counts, unigrams, bigrams, n_unigrams)
+
+
+class TokenCounts:
+    """Ma trận đếm văn bản × n-gram cùng từ vựng dạng chỉ số"""
+
+    def __init__(self, counts: sparse.csr_matrix, unigrams: np.ndarray, bigrams: np.ndarray,
+                 n_unigram_columns: int):
+        """
+        Args:
+            counts: Ma trận đếm CSR (văn bản × cột)
+            unigrams: Các âm tiết, unigrams[i] là âm tiết có chỉ số i
+            bigrams: Mảng (n_bigrams × 2) chỉ số âm tiết của các cột bigram
+            n_unigram_columns: Số cột unigram (0 nếu ngram_range bắt đầu từ 2)
+        """
+        self.counts = counts
+        self.unigrams = unigrams
+        self.bigrams = bigrams
+        self.n_unigram_columns = n_unigram_columns
+
+    def terms(self, columns: np.ndarray) -> np.ndarray:
+        """Chuỗi n-gram của các cột (bigram nối bằng dấu cách như TfidfVectorizer)"""
+        result = np.empty(len(columns), dtype=object)
+        for position, column in enumerate(columns.tolist()):
+            if column < self.n_unigram_columns:
+                result[position] = self.unigrams[column]
+            else:
+                first, second = self.bigrams[column - self.n_unigram_columns]
+                result[position] = f"{self.unigrams[first]} {self.unigrams[second]}"
+        return result
+
+    def save(self, directory: str):
+        np.save(os.path.join(directory, 'counts_data.npy'), self.counts.data)
+        np.save(os.path.join(directory, 'counts_indices.npy'), self.counts.indices)
+        np.save(os.path.join(directory, 'counts_indptr.npy'), self.counts.indptr)
+        np.save(os.path.join(directory, 'bigrams.npy'), self.bigrams)
+        with open(os.path.join(directory, 'unigrams.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.unigrams.tolist()))
+
+    @classmethod
+    def load(cls, directory: str, meta: Dict) -> 'TokenCounts':
+        def load_array(name: str) -> np.ndarray:
+            return np.load(os.path.join(directory, name + '.npy'))
+
+        with open(os.path.join(directory, 'unigrams.txt'), 'r', encoding='utf-8') as f:
+            content = f.read()
+        unigrams = np.array(content.split('\n') if content else [], dtype=object)
+        counts = sparse.csr_matrix(
+            (load_array('counts_data'), load_array('counts_indices'), load_array('counts_indptr')),
+            shape=(meta['n_documents'], meta['n_columns']))
+        return cls(counts, unigrams, load_array('bigrams'), meta['n_unigram_columns'])
+
+
+def text_digests(texts: Iterable[str]) -> np.ndarray:
+    """Hash BLAKE2b 16 byte của nội dung từng văn bản"""
+    return np.array([hashlib.blake2b((text if isinstance(text, str) else '').encode('utf-8'),
+                                     digest_size=16).digest() for text in texts], dtype='S16')
+
+
+class TokenCache:
+    """Cache ma trận đếm n-gram trên đĩa, khóa theo nội dung, xóa theo LRU"""
+
+    def __init__(self, cache_dir: str, max_size_mb: float = 2048):
+        """
+        Args:
+            cache_dir: Thư mục cache (mỗi mục là một thư mục con)
+            max_size_mb: Tổng dung lượng tối đa của cache
+        """
+        self.cache_dir = cache_dir
+        self.max_size_mb = max_size_mb
+
+    @staticmethod
+    def key(digests: np.ndarray, tokenizer: VietnameseTokenizer) -> str:
+        """Khóa của một mục: hash cấu hình tách từ và tập hash văn bản đã sắp xếp"""
+        digest = hashlib.sha1(json.dumps(tokenizer.config(), sort_keys=True).encode('utf-8'))
+        digest.update(np.sort(digests).tobytes())
+        return digest.hexdigest()
+
+    def counts_for(self, texts, tokenizer: VietnameseTokenizer) -> Tuple[TokenCounts, np.ndarray]:
+        """
+        Ma trận đếm của các văn bản, tách từ chỉ khi chưa có trong cache
+
+        Các văn bản trùng nội dung chỉ được tách một lần.
+
+        Args:
+            texts: Các văn bản (Series, TextView hoặc list)
+            tokenizer: VietnameseTokenizer
+
+        Returns:
+            Tuple (TokenCounts, rows) - rows[i] là dòng của văn bản thứ i trong ma trận đếm
+        """
+        digests = text_digests(texts)
+        unique_digests, first_positions, rows = np.unique(digests, return_index=True, return_inverse=True)
+        entry = os.path.join(self.cache_dir, self.key(unique_digests, tokenizer))
+        meta_file = os.path.join(entry, META_FILE)
+
+        if os.path.exists(meta_file):
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            # Cập nhật thời điểm dùng gần nhất cho LRU
+            os.utime(meta_file)
+            print(f"⚡ Dùng lại kết quả tách từ của {meta['n_documents']:,} văn bản từ cache")
+            return TokenCounts.load(entry, meta), rows
+
+        started = time.perf_counter()
+        take = getattr(texts, 'take', None)
+        unique_texts = take(first_positions) if take is not None else [texts[i] for i in first_positions]
+        token_counts = tokenizer.count(unique_texts)
+        print(f"🔤 Đã tách từ {len(unique_digests):,} văn bản phân biệt "
+              f"trong {time.perf_counter() - started:.1f}s")
+
+        self._write(entry, token_counts, unique_digests, tokenizer)
+        return token_counts, rows
+
+    def _write(self, entry: str, token_counts: TokenCounts, digests: np.ndarray,
+               tokenizer: VietnameseTokenizer):
+        """Ghi một mục vào thư mục tạm rồi đổi tên, sau đó xóa bớt theo LRU"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = f"{entry}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        token_counts.save(tmp_dir)
+        np.save(os.path.join(tmp_dir, 'digests.npy'), digests)
+        with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({
+                'tokenizer': tokenizer.config(),
+                'n_documents': token_counts.counts.shape[0],
+                'n_columns': token_counts.counts.shape[1],
+                'n_unigram_columns': token_counts.n_unigram_columns,
+                'n_bigrams': len(token_counts.bigrams),
+            }, f, ensure_ascii=False, indent=2)
+        try:
+            os.replace(tmp_dir, entry)
+        except OSError:
+            # Tiến trình khác vừa ghi cùng mục (cùng nội dung)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict(keep=os.path.basename(entry))
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """Các mục trong cache: (thời điểm dùng gần nhất, dung lượng byte, đường dẫn)"""
+        result = []
+        if not os.path.isdir(self.cache_dir):
+            return result
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            meta_file = os.path.join(path, META_FILE)
+            if not os.path.exists(meta_file) or '.tmp' in name:
+                continue
+            size = sum(os.path.getsize(os.path.join(path, filename)) for filename in os.listdir(path))
+            result.append((os.path.getmtime(meta_file), size, path))
+        return result
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Xóa các mục dùng lâu nhất cho tới khi tổng dung lượng <= max_size_mb"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        limit = self.max_size_mb * 1024 * 1024
+        removed = 0
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            if os.path.basename(path) == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def _apply_weights(vectorizer: TfidfVectorizer, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+    """tf (sublinear) × idf rồi chuẩn hóa dòng, giống TfidfTransformer.transform"""
+    X = counts.astype(vectorizer.dtype)
+    if vectorizer.sublinear_tf:
+        np.log(X.data, X.data)
+        X.data += 1
+    if vectorizer.use_idf:
+        X.data *= vectorizer.idf_[X.indices]
+    if vectorizer.norm:
+        X = normalize(X, norm=vectorizer.norm, copy=False)
+    return X
+
+
+class TrainingCounts:
+    """
+    Ma trận đếm của các văn bản training cùng df/tf, dùng chung cho nhiều cấu hình vectorizer
+
+    Các cấu hình chỉ khác max_features, min_df/max_df, ngram_range (trong
+    phạm vi đã đếm) hay trọng số tf/idf đều được dựng bằng cách chọn cột,
+    không phải tách từ lại.
+    """
+
+    def __init__(self, token_counts: TokenCounts, rows: np.ndarray):
+        """
+        Args:
+            token_counts: Ma trận đếm toàn bộ từ vựng
+            rows: Dòng của ma trận đếm cho từng văn bản training (có thể lặp)
+        """
+        self.token_counts = token_counts
+        self.counts = token_counts.counts[rows]
+        self.n_docs = self.counts.shape[0]
+        self.dfs = np.bincount(self.counts.indices, minlength=self.counts.shape[1])
+        self.tfs = np.bincount(self.counts.indices, weights=self.counts.data,
+                               minlength=self.counts.shape[1]).astype(np.int64)
+        self._sorted_candidates: Dict[Tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _candidates(self, min_doc_count: float, max_doc_count: float,
+                    ngram_range: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Các cột qua được ngưỡng df và ngram_range, sắp theo chữ cái như CountVectorizer"""
+        key = (min_doc_count, max_doc_count, tuple(ngram_range))
+        if key not in self._sorted_candidates:
+            mask = (self.dfs >= min_doc_count) & (self.dfs <= max_doc_count)
+            n_unigrams = self.token_counts.n_unigram_columns
+            if ngram_range[0] > 1:
+                mask[:n_unigrams] = False
+            if ngram_range[1] < 2:
+                mask[n_unigrams:] = False
+            candidates = np.flatnonzero(mask)
+            terms = self.token_counts.terms(candidates)
+            order = np.argsort(terms, kind='stable')
+            self._sorted_candidates[key] = (candidates[order], terms[order])
+        return self._sorted_candidates[key]
+
+    def fit(self, vectorizer: TfidfVectorizer) -> Tuple[sparse.csr_matrix, np.ndarray]:
+        """
+        Fit vectorizer thay cho vectorizer.fit_transform(texts)
+
+        Lọc đặc trưng theo max_df/min_df/max_features và tính IDF theo đúng
+        thứ tự của CountVectorizer (sắp xếp từ vựng theo chữ cái trước khi
+        chọn max_features), rồi gán vocabulary_ và idf_ cho vectorizer.
+
+        Returns:
+            Tuple (X, columns) - ma trận TF-IDF của các văn bản training và
+            các cột của ma trận đếm ứng với từ vựng đã chọn (dùng cho transform_tfidf)
+        """
+        max_df, min_df = vectorizer.max_df, vectorizer.min_df
+        max_doc_count = max_df if isinstance(max_df, Integral) else max_df * self.n_docs
+        min_doc_count = min_df if isinstance(min_df, Integral) else min_df * self.n_docs
+        if max_doc_count < min_doc_count:
+            raise ValueError("max_df corresponds to < documents than min_df")
+
+        candidates, terms = self._candidates(min_doc_count, max_doc_count, vectorizer.ngram_range)
+        if vectorizer.max_features is not None and len(candidates) > vectorizer.max_features:
+            tfs = self.dfs if vectorizer.binary else self.tfs
+            selected = np.sort((-tfs[candidates]).argsort()[:vectorizer.max_features])
+            candidates, terms = candidates[selected], terms[selected]
+        if len(candidates) == 0:
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+
+        X = self.counts[:, candidates].tocsr()
+        if vectorizer.binary:
+            X.data.fill(1)
+        vectorizer.vocabulary_ = {str(term): column for column, term in enumerate(terms)}
+        if vectorizer.use_idf:
+            df = self.dfs[candidates] + int(vectorizer.smooth_idf)
+            n_samples = self.n_docs + int(vectorizer.smooth_idf)
+            vectorizer.idf_ = np.log(n_samples / df) + 1
+        return _apply_weights(vectorizer, X), candidates
+
+
+def fit_tfidf(vectorizer: TfidfVectorizer, token_counts: TokenCounts,
+              rows: np.ndarray) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    Fit vectorizer từ ma trận đếm thay cho vectorizer.fit_transform(texts)
+
+    Args:
+        vectorizer: TfidfVectorizer (chưa fit) cần dựng
+        token_counts: Ma trận đếm toàn bộ từ vựng
+        rows: Dòng của ma trận đếm cho từng văn bản training (có thể lặp)
+
+    Returns:
+        Tuple (X, columns), xem TrainingCounts.fit
+    """
+    return TrainingCounts(token_counts, rows).fit(vectorizer)
+
+
+def transform_tfidf(vectorizer: TfidfVectorizer, token_counts: TokenCounts, rows: np.ndarray,
+                    columns: np.ndarray) -> sparse.csr_matrix:
+    """Tương đương vectorizer.transform(texts) cho các dòng của ma trận đếm đã cache"""
+    X = token_counts.counts[rows][:, columns].tocsr()
+    if vectorizer.binary:
+        X.data.fill(1)
+    return _apply_weights(vectorizer, X)
@@ -0,0 +1,324 @@
+"""
+Tìm siêu tham số song song cho LawClassifier, dùng lại ma trận đếm n-gram
+
+Văn bản của các bản án được tách từ đúng một lần thành ma trận đếm trên toàn
+bộ từ vựng (qua TokenCache, nên các lần tìm sau không tách từ lại). Với mỗi
+fold, TrainingCounts tính df/tf của các bản án training một lần; mọi cấu
+hình vectorizer (max_features, min_df/max_df, ngram_range, use_idf, ...) chỉ
+là chọn cột và đổi trọng số trên ma trận đó.
+
+Mỗi tác vụ là một cặp (cấu hình vectorizer, fold): dựng ma trận TF-IDF một
+lần rồi huấn luyện lần lượt mọi classifier của không gian tìm kiếm trên nó.
+Các tác vụ chạy song song trên nhiều tiến trình. Mỗi ứng viên được đánh giá
+bằng các chỉ số xếp hạng của EVAL_CONFIG trên các bản án của fold kiểm tra;
+leaderboard ghi thêm thời gian vectorize, thời gian fit và độ trễ dự đoán.
+
+Cách chạy:
+    python src/models/tuning.py --data-dir data_export --jobs 4 \\
+        --output reports/leaderboard.json
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+import warnings
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import KFold
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from data.config import EVAL_CONFIG, MODEL_CONFIG
+from data_loader import DataLoader
+from evaluation.evaluate import evaluate_rankings, merge_reports
+from models.law_classifier import LawClassifier
+from models.token_cache import TokenCache, TrainingCounts, VietnameseTokenizer, transform_tfidf
+
+# Dữ liệu dùng chung của các worker (gán trước khi fork hoặc qua initializer)
+_STATE: Dict = {}
+
+
+def expand_grid(grid: Dict[str, list]) -> List[Dict]:
+    """Tích Descartes của các giá trị trong grid, {'a': [1, 2]} -> [{'a': 1}, {'a': 2}]"""
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def _init_worker(state: Dict):
+    warnings.filterwarnings('ignore')
+    _STATE.clear()
+    _STATE.update(state)
+
+
+def _training_counts(fold: int) -> TrainingCounts:
+    """df/tf của fold, tính một lần trong mỗi tiến trình"""
+    cache = _STATE.setdefault('training_counts', {})
+    if fold not in cache:
+        cache[fold] = TrainingCounts(_STATE['token_counts'], _STATE['folds'][fold]['train_rows'])
+    return cache[fold]
+
+
+def _evaluate_task(task: Tuple[int, Dict, int]) -> List[Dict]:
+    """
+    Đánh giá mọi classifier trên một cặp (cấu hình vectorizer, fold)
+
+    Returns:
+        List kết quả {candidate, fold, vectorize_seconds, fit_seconds,
+        predict_ms, report} cho từng classifier
+    """
+    vectorizer_index, vectorizer_params, fold = task
+    data = _STATE['folds'][fold]
+    Y = _STATE['Y']
+    multi_label = _STATE['multi_label']
+
+    started = time.perf_counter()
+    base = LawClassifier(multi_label=multi_label, vectorizer_params=vectorizer_params)
+    X_train, columns = _training_counts(fold).fit(base.vectorizer)
+    X_test = transform_tfidf(base.vectorizer, _STATE['token_counts'], data['test_rows'], columns)
+    vectorize_seconds = time.perf_counter() - started
+
+    results = []
+    for candidate, (model_type, classifier_params) in enumerate(_STATE['classifiers']):
+        model = LawClassifier(model_type, multi_label=multi_label, classifier_params=classifier_params)
+        model.vectorizer = base.vectorizer
+        model.classifier = model._create_classifier()
+
+        started = time.perf_counter()
+        if multi_label:
+            model._fit_multi_label(X_train, data['Y_train'])
+        else:
+            model.classifier.fit(X_train, data['y_train'])
+        fit_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        scores = model.predict_scores(X_test)
+        predict_ms = (time.perf_counter() - started) * 1000 / max(X_test.shape[0], 1)
+
+        # Cột của ma trận điểm là các lớp classifier đã thấy khi fit (RandomForest
+        # đa nhãn có một cột cho mỗi cột của Y)
+        label_columns = (np.arange(Y.shape[1]) if multi_label and model_type == 'random_forest'
+                         else model.classifier.classes_)
+        truth = Y[data['test_cases']][:, label_columns]
+        report = evaluate_rankings(scores, truth.tocsr(), data['test_sizes'])
+        results.append({
+            'candidate': vectorizer_index * len(_STATE['classifiers']) + candidate,
+            'fold': fold,
+            'vectorize_seconds': vectorize_seconds,
+            'fit_seconds': fit_seconds,
+            'predict_ms': predict_ms,
+            'report': report,
+        })
+    return results
+
+
+class HyperparameterSearch:
+    """Tìm kiếm lưới trên tham số vectorizer × classifier với k-fold theo bản án"""
+
+    def __init__(self, vectorizer_grid: Optional[Dict[str, list]] = None,
+                 classifier_grids: Optional[Dict[str, Dict[str, list]]] = None,
+                 n_folds: Optional[int] = None, n_jobs: Optional[int] = None,
+                 multi_label: bool = False, scoring: Optional[Tuple[str, int]] = None,
+                 seed: int = 42):
+        """
+        Args:
+            vectorizer_grid: Các giá trị tham số TfidfVectorizer, mặc định MODEL_CONFIG['search']
+            classifier_grids: {model_type: {tham số: các giá trị}}
+            n_folds: Số fold (chia theo bản án)
+            n_jobs: Số tiến trình, mặc định os.cpu_count()
+            multi_label: Huấn luyện đa nhãn như LawClassifier(multi_label=True)
+            scoring: (chỉ số, k) dùng để xếp hạng, ví dụ ('map', 10)
+            seed: Seed chia fold
+        """
+        config = MODEL_CONFIG['search']
+        self.vectorizer_grid = vectorizer_grid if vectorizer_grid is not None else config['vectorizer']
+        self.classifier_grids = classifier_grids if classifier_grids is not None else config['classifiers']
+        self.n_folds = n_folds or config['n_folds']
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.multi_label = multi_label
+        self.scoring = tuple(scoring or config['scoring'])
+        self.seed = seed
+
+        self.vectorizer_candidates = expand_grid(self.vectorizer_grid)
+        self.classifier_candidates = [(model_type, params)
+                                      for model_type, grid in self.classifier_grids.items()
+                                      for params in expand_grid(grid)]
+        self.leaderboard: Optional[pd.DataFrame] = None
+        self.reports: Dict[int, Dict] = {}
+
+    def candidates(self) -> List[Dict]:
+        """Các ứng viên theo thứ tự chỉ số candidate"""
+        return [{'model_type': model_type, 'vectorizer_params': vectorizer_params,
+                 'classifier_params': classifier_params}
+                for vectorizer_params in self.vectorizer_candidates
+                for model_type, classifier_params in self.classifier_candidates]
+
+    def _prepare(self, loader: DataLoader) -> Dict:
+        """Ma trận đếm của mọi bản án (qua TokenCache), nhãn và các fold"""
+        texts, Y = LawClassifier(multi_label=True).prepare_multilabel_data(loader)
+        if len(texts) == 0:
+            raise ValueError("Không có dữ liệu để tìm siêu tham số")
+        Y = Y.tocsr()
+
+        # Tách từ một lần cho khoảng n-gram rộng nhất của không gian tìm kiếm
+        ngram_ranges = [tuple(params.get('ngram_range', MODEL_CONFIG['tfidf']['ngram_range']))
+                        for params in self.vectorizer_candidates]
+        tokenizer = VietnameseTokenizer((min(low for low, _ in ngram_ranges),
+                                         max(high for _, high in ngram_ranges)))
+        cache = TokenCache(os.path.join(loader.cache_dir, 'tokens'),
+                           MODEL_CONFIG['token_cache']['max_size_mb'])
+        token_counts, case_rows = cache.counts_for(texts, tokenizer)
+
+        truth_sizes = np.diff(Y.indptr)
+        folds = []
+        splitter = KFold(n_splits=self.n_folds, shuffle=True, random_state=self.seed)
+        for train_cases, test_cases in splitter.split(np.arange(Y.shape[0])):
+            fold = {'test_cases': test_cases, 'test_rows': case_rows[test_cases],
+                    'test_sizes': truth_sizes[test_cases]}
+            if self.multi_label:
+                fold['train_rows'] = case_rows[train_cases]
+                fold['Y_train'] = Y[train_cases]
+            else:
+                # Mỗi cặp bản án - điều luật là một mẫu, như LawClassifier.prepare_data
+                Y_train = Y[train_cases]
+                fold['train_rows'] = case_rows[np.repeat(train_cases, np.diff(Y_train.indptr))]
+                fold['y_train'] = Y_train.indices
+            folds.append(fold)
+
+        return {'token_counts': token_counts, 'Y': Y, 'folds': folds,
+                'multi_label': self.multi_label, 'classifiers': self.classifier_candidates}
+
+    def run(self, loader: DataLoader) -> pd.DataFrame:
+        """
+        Chạy tìm kiếm và dựng leaderboard
+
+        Returns:
+            DataFrame xếp theo chỉ số scoring giảm dần, mỗi dòng một ứng viên
+        """
+        started = time.perf_counter()
+        state = self._prepare(loader)
+        tasks = [(index, params, fold)
+                 for fold in range(self.n_folds)
+                 for index, params in enumerate(self.vectorizer_candidates)]
+        n_candidates = len(self.vectorizer_candidates) * len(self.classifier_candidates)
+        print(f"🔎 Tìm kiếm {n_candidates} ứng viên × {self.n_folds} fold "
+              f"({len(tasks)} tác vụ) trên {self.n_jobs} tiến trình...")
+
+        results = []
+        if self.n_jobs <= 1:
+            _init_worker(state)
+            for task in tasks:
+                results.extend(_evaluate_task(task))
+        else:
+            with multiprocessing.get_context().Pool(self.n_jobs, initializer=_init_worker,
+                                                    initargs=(state,)) as pool:
+                for task_results in pool.imap_unordered(_evaluate_task, tasks):
+                    results.extend(task_results)
+                    print(f"  ✓ {len(results) // len(self.classifier_candidates)}/{len(tasks)} tác vụ")
+
+        self.leaderboard = self._build_leaderboard(results)
+        print(f"✅ Tìm kiếm hoàn thành trong {time.perf_counter() - started:.1f}s")
+        return self.leaderboard
+
+    def _build_leaderboard(self, results: List[Dict]) -> pd.DataFrame:
+        metric, k = self.scoring
+        candidates = self.candidates()
+        by_candidate: Dict[int, List[Dict]] = {}
+        for result in results:
+            by_candidate.setdefault(result['candidate'], []).append(result)
+
+        rows = []
+        self.reports = {}
+        for index, candidate_results in sorted(by_candidate.items()):
+            report = merge_reports([result['report'] for result in candidate_results])
+            self.reports[index] = report
+            candidate = candidates[index]
+            row = {
+                'candidate': index,
+                'model_type': candidate['model_type'],
+                'vectorizer_params': json.dumps(candidate['vectorizer_params'], sort_keys=True),
+                'classifier_params': json.dumps(candidate['classifier_params'], sort_keys=True),
+                'vectorize_seconds': np.mean([result['vectorize_seconds'] for result in candidate_results]),
+                'fit_seconds': np.mean([result['fit_seconds'] for result in candidate_results]),
+                'predict_ms': np.mean([result['predict_ms'] for result in candidate_results]),
+            }
+            for name in EVAL_CONFIG['metrics']:
+                row[f"{name}@{k}"] = report[name].get(k, np.nan)
+            rows.append(row)
+
+        leaderboard = pd.DataFrame(rows).sort_values(f"{metric}@{k}", ascending=False, kind='stable')
+        leaderboard.insert(0, 'rank', np.arange(1, len(leaderboard) + 1))
+        return leaderboard.reset_index(drop=True)
+
+    def best_params(self) -> Dict:
+        """Tham số của ứng viên tốt nhất, truyền được cho LawClassifier(**best_params())"""
+        if self.leaderboard is None or len(self.leaderboard) == 0:
+            raise ValueError("Chưa chạy tìm kiếm")
+        candidate = self.candidates()[int(self.leaderboard.iloc[0]['candidate'])]
+        return {**candidate, 'multi_label': self.multi_label}
+
+    def save(self, filepath: str):
+        """Lưu leaderboard (JSON kèm báo cáo đầy đủ mọi k của từng ứng viên, và CSV)"""
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        records = self.leaderboard.to_dict('records')
+        for record in records:
+            record['vectorizer_params'] = json.loads(record['vectorizer_params'])
+            record['classifier_params'] = json.loads(record['classifier_params'])
+            record['report'] = self.reports[record['candidate']]
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({'scoring': list(self.scoring), 'n_folds': self.n_folds,
+                       'multi_label': self.multi_label, 'leaderboard': records},
+                      f, ensure_ascii=False, indent=2, default=float)
+        self.leaderboard.to_csv(os.path.splitext(filepath)[0] + '.csv', index=False)
+        print(f"✅ Đã lưu leaderboard vào {filepath}")
+
+
+def print_leaderboard(leaderboard: pd.DataFrame, top: int = 10):
+    """In các ứng viên đứng đầu leaderboard"""
+    metric_columns = [column for column in leaderboard.columns if '@' in column]
+    print(f"\n🏆 LEADERBOARD (top {min(top, len(leaderboard))}/{len(leaderboard)}):")
+    print("=" * 100)
+    for _, row in leaderboard.head(top).iterrows():
+        metrics = "  ".join(f"{column}={row[column]:.4f}" for column in metric_columns)
+        print(f"  {row['rank']:3d}. {row['model_type']:13s} {row['vectorizer_params']} {row['classifier_params']}")
+        print(f"       {metrics} | vectorize {row['vectorize_seconds']:.2f}s "
+              f"| fit {row['fit_seconds']:.2f}s | predict {row['predict_ms']:.3f} ms/bản án")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tìm siêu tham số cho LawClassifier")
+    parser.add_argument('--data-dir', default='data_export')
+    parser.add_argument('--folds', type=int, default=None)
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--multi-label', action='store_true')
+    parser.add_argument('--models', nargs='+', default=None,
+                        help="Chỉ tìm trên các model_type này (mặc định mọi loại trong MODEL_CONFIG['search'])")
+    parser.add_argument('--output', default='reports/leaderboard.json')
+    args = parser.parse_args()
+
+    loader = DataLoader(args.data_dir)
+    if not loader.load_all_data():
+        print("❌ Không thể load dữ liệu")
+        return
+
+    classifier_grids = None
+    if args.models:
+        classifier_grids = {model_type: MODEL_CONFIG['search']['classifiers'][model_type]
+                            for model_type in args.models}
+    search = HyperparameterSearch(classifier_grids=classifier_grids, n_folds=args.folds,
+                                  n_jobs=args.jobs, multi_label=args.multi_label)
+    print_leaderboard(search.run(loader))
+    search.save(args.output)
+    print(f"\n🥇 Tham số tốt nhất: {search.best_params()}")
+
+
+if __name__ == "__main__":
+    main()
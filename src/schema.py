@@ -0,0 +1,206 @@
+"""
+Module schema kiểu dữ liệu của các bảng CSV
+
+Mỗi bảng có kiểu khai báo sẵn cho từng cột, được truyền thẳng vào
+pd.read_csv (dtype, parse_dates) để kiểu được áp dụng ngay khi parse
+(read_table):
+
+    category   - chuỗi lặp lại ít giá trị (tòa án, cấp xét xử, loại luật, điểm)
+    Int32      - id và số điều/khoản (nullable, thay cho int64/float64 khi có NaN)
+    datetime   - thời điểm created/uploaded
+    str        - văn bản tự do (tên, toàn văn, url)
+
+read_options() kiểm tra file có đủ các cột khai báo, validate_table() kiểm tra
+lại kiểu của bảng sau khi đọc (vd cột thời gian không parse được vẫn là chuỗi).
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# Tăng khi đổi schema để các bản cache nhị phân cũ bị bỏ qua
+SCHEMA_VERSION = 1
+
+DATETIME = 'datetime'
+
+# Kiểu nullable → kiểu dùng khi parse CSV, được ép về kiểu nullable sau khi đọc
+NULLABLE_PARSE_DTYPES = {'Int32': 'float64'}
+
+TABLE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    'case': {
+        'id': 'Int32',
+        'case_number': 'str',
+        'case_name': 'str',
+        'document_type': 'category',
+        'case_level': 'category',
+        'law_type': 'category',
+        'court_name': 'category',
+        'content': 'str',
+        'text': 'str',
+        'created': DATETIME,
+        'uploaded': DATETIME,
+        'url': 'str',
+        'file': 'str',
+    },
+    'law': {
+        'id': 'Int32',
+        'article': 'Int32',
+        'title': 'str',
+        'content': 'str',
+        'type': 'category',
+    },
+    'case_law': {
+        'id': 'Int32',
+        'case_id': 'Int32',
+        'law_id': 'Int32',
+        'point': 'category',
+        'clause': 'Int32',
+        'article': 'Int32',
+        'type': 'category',
+    },
+}
+
+
+class SchemaError(ValueError):
+    """Dữ liệu CSV không khớp schema khai báo"""
+
+
+def read_options(table: str, header: Iterable[str], usecols: Optional[Iterable[str]] = None) -> Dict:
+    """
+    Tham số dtype/parse_dates của pd.read_csv cho một bảng
+
+    Cột Int32 được parse dưới dạng float64 (đường parse nhanh của C parser,
+    parse trực tiếp sang kiểu nullable chậm hơn nhiều lần) rồi được ép kiểu
+    ngay sau khi đọc trong read_table().
+
+    Args:
+        table: Tên bảng (case, law, case_law)
+        header: Các cột có trong file CSV
+        usecols: Các cột sẽ được đọc, None là toàn bộ header
+
+    Raises:
+        SchemaError: File thiếu cột khai báo trong schema
+    """
+    schema = TABLE_SCHEMAS[table]
+    header = list(header)
+    missing = [col for col in schema if col not in header]
+    if missing:
+        raise SchemaError(f"Bảng '{table}' thiếu các cột {missing}")
+    columns = set(usecols if usecols is not None else header)
+    return {
+        'dtype': {col: NULLABLE_PARSE_DTYPES.get(kind, kind) for col, kind in schema.items()
+                  if kind != DATETIME and col in columns},
+        'parse_dates': [col for col, kind in schema.items() if kind == DATETIME and col in columns],
+        # created/uploaded có thể lẫn 'YYYY-mm-dd' và 'YYYY-mm-dd HH:MM:SS'
+        'date_format': 'ISO8601',
+    }
+
+
+def read_table(filepath: str, table: str, usecols: Optional[List[str]] = None,
+               header: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Đọc một bảng CSV theo schema
+
+    Args:
+        filepath: File CSV
+        table: Tên bảng (case, law, case_law)
+        usecols: Chỉ đọc các cột này, None là toàn bộ
+        header: Header của file nếu đã đọc trước đó
+
+    Raises:
+        SchemaError: Thiếu cột, hoặc giá trị không chuyển được sang kiểu khai báo
+    """
+    if header is None:
+        header = pd.read_csv(filepath, encoding='utf-8-sig', nrows=0).columns
+    options = read_options(table, header, usecols)
+    filename = os.path.basename(filepath)
+    try:
+        df = pd.read_csv(filepath, encoding='utf-8-sig', usecols=usecols, **options)
+        for col, kind in TABLE_SCHEMAS[table].items():
+            if kind in NULLABLE_PARSE_DTYPES and col in df.columns:
+                # Ép kiểu an toàn: lỗi nếu có giá trị lẻ (1.5) hoặc tràn int32
+                df[col] = df[col].astype(kind)
+    except (ValueError, TypeError, OverflowError) as e:
+        raise SchemaError(f"{filename} không khớp schema của bảng '{table}': {e}") from e
+    validate_table(table, df)
+    return df
+
+
+def _matches(series: pd.Series, kind: str) -> bool:
+    if kind == DATETIME:
+        return pd.api.types.is_datetime64_any_dtype(series.dtype)
+    if kind == 'str':
+        return pd.api.types.is_string_dtype(series.dtype) or series.dtype == object
+    return str(series.dtype) == kind
+
+
+def validate_table(table: str, df: pd.DataFrame, columns: Optional[Iterable[str]] = None):
+    """
+    Kiểm tra các cột của bảng có đúng kiểu khai báo trong schema
+
+    Args:
+        table: Tên bảng (case, law, case_law)
+        df: DataFrame đã đọc
+        columns: Chỉ kiểm tra các cột này (mặc định mọi cột có trong df)
+
+    Raises:
+        SchemaError: Có cột sai kiểu, vd cột thời gian không parse được
+    """
+    schema = TABLE_SCHEMAS[table]
+    columns = [col for col in (columns if columns is not None else df.columns) if col in schema]
+    wrong = {col: str(df[col].dtype) for col in columns if not _matches(df[col], schema[col])}
+    if wrong:
+        expected = {col: schema[col] for col in wrong}
+        raise SchemaError(f"Bảng '{table}' có cột sai kiểu: {wrong}, schema yêu cầu {expected}")
+
+
+def conform(df: pd.DataFrame, reference: pd.DataFrame) -> pd.DataFrame:
+    """
+    Đưa các dòng mới về đúng cột và kiểu của một bảng đã load để nối vào cuối
+
+    Cột thiếu được điền giá trị rỗng. Cột category của reference được thêm
+    các giá trị mới vào cuối danh sách category (mã của các dòng cũ không
+    đổi), nên reference có thể bị thay cột tại chỗ.
+
+    Raises:
+        SchemaError: Có cột không có trong bảng, hoặc giá trị không chuyển được kiểu
+    """
+    extra = [col for col in df.columns if col not in reference.columns]
+    if extra:
+        raise SchemaError(f"Các cột {extra} không có trong bảng")
+    df = df.reindex(columns=reference.columns)
+    for col in reference.columns:
+        dtype = reference[col].dtype
+        try:
+            if isinstance(dtype, pd.CategoricalDtype):
+                values = df[col].dropna().unique()
+                new = pd.Index(values).difference(dtype.categories)
+                if len(new) > 0:
+                    reference[col] = reference[col].cat.add_categories(new)
+                    dtype = reference[col].dtype
+            elif pd.api.types.is_datetime64_any_dtype(dtype):
+                df[col] = pd.to_datetime(df[col], format='ISO8601')
+            df[col] = df[col].astype(dtype)
+        except (ValueError, TypeError, OverflowError) as e:
+            raise SchemaError(f"Cột '{col}' không chuyển được sang kiểu {dtype}: {e}") from e
+    return df
+
+
+def memory_report(tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Bộ nhớ (deep) của từng cột trong các bảng
+
+    Returns:
+        DataFrame gồm table, column, dtype, bytes; mỗi bảng thêm một dòng tổng (column='*')
+    """
+    records: List[Dict] = []
+    for name, df in tables.items():
+        if df is None:
+            continue
+        usage = df.memory_usage(deep=True, index=False)
+        for col in df.columns:
+            records.append({'table': name, 'column': col, 'dtype': str(df[col].dtype),
+                            'bytes': int(usage[col])})
+        records.append({'table': name, 'column': '*', 'dtype': '', 'bytes': int(usage.sum())})
+    return pd.DataFrame(records, columns=['table', 'column', 'dtype', 'bytes'])
@@ -0,0 +1,223 @@
+"""
+Module chỉ mục ngược (inverted index) cho tìm kiếm bản án
+
+Văn bản được chuẩn hóa Unicode NFC, chuyển chữ thường và (tùy chọn) bỏ dấu
+tiếng Việt, sau đó tách thành các âm tiết. Vì từ tiếng Việt thường gồm nhiều
+âm tiết, chỉ mục lưu cả âm tiết đơn lẫn cặp âm tiết liền nhau ("trộm cắp"),
+mỗi term kèm danh sách dòng chứa nó theo dạng CSR:
+
+    terms.json     - danh sách term (âm tiết hoặc cặp âm tiết) đã sắp xếp
+    offsets.npy    - int64, postings của terms[i] là postings[offsets[i]:offsets[i+1]]
+    postings.npy   - int32, vị trí dòng tăng dần
+    meta.json      - dấu vết file nguồn và cấu hình chuẩn hóa
+
+Cú pháp truy vấn:
+    trộm cắp                  - AND: dòng chứa cả hai âm tiết
+    trộm AND cắp              - như trên, AND viết rõ chỉ là phép nối mặc định
+    trộm OR cướp              - OR giữa các mệnh đề
+    "trộm cắp" tài sản        - cụm từ chính xác (các âm tiết liền nhau)
+
+Cụm hai âm tiết được trả lời trực tiếp từ chỉ mục; cụm dài hơn lấy giao của
+các cặp liền nhau rồi kiểm tra lại trên văn bản của các dòng ứng viên.
+"""
+
+import json
+import os
+import re
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r'\w+')
+QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def normalize_text(text: str, fold_diacritics: bool = False) -> str:
+    """
+    Chuẩn hóa văn bản: NFC, chữ thường, tùy chọn bỏ dấu tiếng Việt
+
+    Args:
+        text: Văn bản gốc
+        fold_diacritics: Bỏ dấu (ví dụ 'trộm cắp' -> 'trom cap', 'đ' -> 'd')
+    """
+    if not isinstance(text, str):
+        return ''
+    text = unicodedata.normalize('NFC', text).lower()
+    if fold_diacritics:
+        text = unicodedata.normalize('NFD', text)
+        text = ''.join(ch for ch in text if unicodedata.category(ch) != 'Mn')
+        text = unicodedata.normalize('NFC', text.replace('đ', 'd'))
+    return text
+
+
+def tokenize(text: str, fold_diacritics: bool = False) -> List[str]:
+    """Tách văn bản đã chuẩn hóa thành danh sách âm tiết"""
+    return TOKEN_PATTERN.findall(normalize_text(text, fold_diacritics))
+
+
+def parse_query(query: str, fold_diacritics: bool = False) -> List[List[List[str]]]:
+    """
+    Phân tích truy vấn thành danh sách mệnh đề OR
+
+    Mỗi mệnh đề là danh sách các điều kiện AND, mỗi điều kiện là một cụm
+    âm tiết (một âm tiết, hoặc nhiều âm tiết nếu là cụm từ trong ngoặc kép).
+    AND viết hoa là phép nối mặc định nên được bỏ qua; muốn tìm chính từ
+    "and" thì viết chữ thường hoặc đặt trong ngoặc kép.
+    """
+    clauses = [[]]
+    for phrase, word in QUERY_PATTERN.findall(query):
+        if word == 'OR':
+            clauses.append([])
+            continue
+        if word == 'AND':
+            continue
+        if phrase:
+            tokens = tokenize(phrase, fold_diacritics)
+            if tokens:
+                clauses[-1].append(tokens)
+        else:
+            clauses[-1].extend([token] for token in tokenize(word, fold_diacritics))
+    return [clause for clause in clauses if clause]
+
+
+class InvertedIndex:
+    """Chỉ mục ngược mức dòng trên một cột văn bản"""
+
+    def __init__(self, terms: List[str], offsets: np.ndarray, postings: np.ndarray,
+                 meta: Optional[Dict] = None):
+        self.terms = terms
+        self.term_ids = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.postings = postings
+        self.meta = meta or {}
+        self.fold_diacritics = bool(self.meta.get('fold_diacritics', False))
+        self.num_rows = int(self.meta.get('num_rows', 0))
+
+    @classmethod
+    def build(cls, texts: Iterable[str], fold_diacritics: bool = False,
+              meta: Optional[Dict] = None) -> 'InvertedIndex':
+        """
+        Xây chỉ mục từ một dãy văn bản (Series, TextView hoặc list)
+
+        Args:
+            texts: Các văn bản theo thứ tự dòng
+            fold_diacritics: Chỉ mục không phân biệt dấu
+            meta: Thông tin bổ sung lưu kèm chỉ mục
+        """
+        vocabulary: Dict[str, int] = {}
+        pair_terms = array('i')
+        pair_rows = array('i')
+
+        num_rows = 0
+        for row, text in enumerate(texts):
+            num_rows += 1
+            tokens = tokenize(text, fold_diacritics)
+            bigrams = {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+            for token in bigrams.union(tokens):
+                term_id = vocabulary.setdefault(token, len(vocabulary))
+                pair_terms.append(term_id)
+                pair_rows.append(row)
+
+        terms = sorted(vocabulary)
+        # Đổi id theo thứ tự xuất hiện sang id theo thứ tự sắp xếp
+        remap = np.empty(len(terms), dtype=np.int32)
+        for new_id, term in enumerate(terms):
+            remap[vocabulary[term]] = new_id
+
+        term_ids = remap[np.frombuffer(pair_terms, dtype=np.int32)]
+        rows = np.frombuffer(pair_rows, dtype=np.int32)
+        order = np.argsort(term_ids, kind='stable')
+
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(terms)), out=offsets[1:])
+
+        meta = dict(meta or {})
+        meta.update({'fold_diacritics': fold_diacritics, 'num_rows': num_rows})
+        return cls(terms, offsets, rows[order], meta)
+
+    def save(self, directory: str):
+        """Lưu chỉ mục ra thư mục"""
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'terms.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.terms, f, ensure_ascii=False)
+        np.save(os.path.join(directory, 'offsets.npy'), self.offsets)
+        np.save(os.path.join(directory, 'postings.npy'), self.postings)
+        # meta.json ghi sau cùng, là dấu hiệu chỉ mục đã ghi xong
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional['InvertedIndex']:
+        """Load chỉ mục đã lưu, trả về None nếu chưa có hoặc hỏng"""
+        try:
+            with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(os.path.join(directory, 'terms.json'), 'r', encoding='utf-8') as f:
+                terms = json.load(f)
+            offsets = np.load(os.path.join(directory, 'offsets.npy'))
+            postings = np.load(os.path.join(directory, 'postings.npy'), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        return cls(terms, offsets, postings, meta)
+
+    def term_rows(self, term: str) -> np.ndarray:
+        """Các dòng chứa một term (âm tiết hoặc cặp âm tiết)"""
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return np.empty(0, dtype=np.int32)
+        return np.asarray(self.postings[self.offsets[term_id]:self.offsets[term_id + 1]])
+
+    def _phrase_terms(self, group: List[str]) -> List[str]:
+        """Các term cần tra cho một cụm: âm tiết đơn hoặc các cặp liền nhau"""
+        if len(group) == 1:
+            return group
+        return [f"{a} {b}" for a, b in zip(group, group[1:])]
+
+    def _phrase_pattern(self, phrase: List[str]):
+        return re.compile(r'(?<!\w)' + r'\W+'.join(map(re.escape, phrase)) + r'(?!\w)')
+
+    def search(self, query: str, texts=None, page: int = 1,
+               page_size: Optional[int] = None) -> Tuple[np.ndarray, int]:
+        """
+        Tìm các dòng thỏa mãn truy vấn
+
+        Args:
+            query: Truy vấn (xem cú pháp ở đầu module)
+            texts: Các văn bản gốc theo dòng, cần cho truy vấn cụm từ
+            page: Trang kết quả (bắt đầu từ 1)
+            page_size: Số dòng mỗi trang, None là trả về tất cả
+
+        Returns:
+            Tuple (các vị trí dòng của trang, tổng số dòng khớp)
+        """
+        matched = np.empty(0, dtype=np.int32)
+        for clause in parse_query(query, self.fold_diacritics):
+            # Giao các danh sách ngắn trước để tập ứng viên nhỏ nhanh
+            postings = sorted((self.term_rows(term) for group in clause
+                               for term in self._phrase_terms(group)), key=len)
+            rows = postings[0]
+            for other in postings[1:]:
+                if len(rows) == 0:
+                    break
+                rows = np.intersect1d(rows, other, assume_unique=True)
+
+            # Cụm từ trên hai âm tiết: kiểm tra lại trên văn bản của các ứng viên
+            patterns = [self._phrase_pattern(group) for group in clause if len(group) > 2]
+            if patterns and len(rows) > 0:
+                if texts is None:
+                    raise ValueError("Cần truyền texts để tìm kiếm cụm từ trên hai âm tiết")
+                rows = np.array([
+                    row for row in rows
+                    if all(p.search(normalize_text(texts[int(row)], self.fold_diacritics))
+                           for p in patterns)
+                ], dtype=np.int32)
+
+            matched = np.union1d(matched, rows)
+
+        total = len(matched)
+        if page_size is not None:
+            start = (max(page, 1) - 1) * page_size
+            matched = matched[start:start + page_size]
+        return matched.astype(np.int64), total
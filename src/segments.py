@@ -0,0 +1,159 @@
+"""
+Module lưu các dòng mới (delta segment) của case_data/case_law_data
+
+Mỗi lần DataLoader.append_data() ghi một segment vào data_dir/segments:
+
+    seg_<first>_<last>/case.pkl        - các dòng case_data mới (pickle protocol 5)
+    seg_<first>_<last>/case_law.pkl    - các dòng case_law_data mới
+    seg_<first>_<last>/meta.json       - số dòng của từng bảng
+
+first/last là số thứ tự các lần ghi mà segment bao gồm. Segment được ghi vào
+thư mục tạm rồi đổi tên, nên chỉ segment đã ghi xong mới được đọc. compact()
+gộp các segment thành một segment mới bao cả khoảng [first, last] rồi mới xóa
+các segment cũ; khi đọc, segment nằm trong khoảng của một segment gộp được
+bỏ qua nên việc dừng giữa chừng không làm mất hay lặp dữ liệu.
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+SEGMENT_PATTERN = re.compile(r'^seg_(\d{8})_(\d{8})$')
+TABLES = ('case', 'case_law')
+# Số segment hiện hành để DataLoader.append_data() tự gộp trong luồng nền
+COMPACT_AFTER = 8
+
+
+class SegmentStore:
+    """Các delta segment của một thư mục dữ liệu, ghi thêm và gộp được từ nhiều luồng"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._compacting = threading.Lock()
+
+    def _scan(self) -> List[Tuple[int, int, str]]:
+        """Các segment đã ghi xong (first, last, tên), kể cả segment đã bị gộp"""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match and os.path.exists(os.path.join(self.directory, name, 'meta.json')):
+                found.append((int(match.group(1)), int(match.group(2)), name))
+        return found
+
+    def segments(self) -> List[str]:
+        """Tên các segment hiện hành theo thứ tự ghi"""
+        covered = -1
+        names = []
+        # Segment gộp (khoảng rộng hơn) đứng trước các segment nó bao phủ
+        for first, last, name in sorted(self._scan(), key=lambda item: (item[0], -item[1])):
+            if first > covered:
+                names.append(name)
+                covered = last
+        return names
+
+    def meta(self, name: str) -> Dict:
+        with open(os.path.join(self.directory, name, 'meta.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def rows(self, table: str) -> int:
+        """Tổng số dòng của một bảng trong các segment"""
+        return sum(self.meta(name)['rows'].get(table, 0) for name in self.segments())
+
+    def _write(self, first: int, last: int, frames: Dict[str, pd.DataFrame]) -> str:
+        name = f"seg_{first:08d}_{last:08d}"
+        tmp_dir = os.path.join(self.directory, f".tmp_{name}_{os.getpid()}_{threading.get_ident()}")
+        os.makedirs(tmp_dir)
+        for table, frame in frames.items():
+            frame.to_pickle(os.path.join(tmp_dir, f"{table}.pkl"), compression=None, protocol=5)
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'rows': {table: len(frame) for table, frame in frames.items()}}, f, indent=2)
+        os.rename(tmp_dir, os.path.join(self.directory, name))
+        return name
+
+    def append(self, frames: Dict[str, pd.DataFrame]) -> str:
+        """
+        Ghi một segment mới
+
+        Args:
+            frames: Tên bảng (case, case_law) → các dòng mới
+
+        Returns:
+            Tên segment vừa ghi
+        """
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            sequence = max((last for _, last, _ in self._scan()), default=0) + 1
+            return self._write(sequence, sequence, frames)
+
+    def read(self, table: str, names: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Các dòng của một bảng trong các segment, nối theo thứ tự ghi
+
+        Returns:
+            None nếu không có segment nào chứa bảng này
+        """
+        for _ in range(3):
+            try:
+                frames = [pd.read_pickle(os.path.join(self.directory, name, f"{table}.pkl"))
+                          for name in (names if names is not None else self.segments())
+                          if os.path.exists(os.path.join(self.directory, name, f"{table}.pkl"))]
+                break
+            except FileNotFoundError:
+                # Segment vừa bị xóa sau khi gộp, đọc lại danh sách
+                if names is not None:
+                    raise
+        else:
+            raise RuntimeError(f"Không đọc được các segment trong {self.directory}")
+        frames = [frame for frame in frames if len(frame) > 0]
+        if not frames:
+            return None
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    def compact(self, min_segments: int = 2) -> Optional[str]:
+        """
+        Gộp các segment hiện hành thành một segment
+
+        Args:
+            min_segments: Chỉ gộp khi có ít nhất từng này segment
+
+        Returns:
+            Tên segment gộp, None nếu không cần gộp hoặc đang có lượt gộp khác
+        """
+        if not self._compacting.acquire(blocking=False):
+            return None
+        try:
+            names = self.segments()
+            if len(names) < min_segments:
+                return None
+            frames = {}
+            for table in TABLES:
+                frame = self.read(table, names)
+                if frame is not None:
+                    frames[table] = frame
+            first = int(SEGMENT_PATTERN.match(names[0]).group(1))
+            last = int(SEGMENT_PATTERN.match(names[-1]).group(2))
+            merged = self._write(first, last, frames)
+            for name in names:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+            return merged
+        finally:
+            self._compacting.release()
+
+    def compact_async(self, min_segments: int = 2) -> threading.Thread:
+        """Gộp segment trong luồng nền, trả về luồng đã khởi chạy"""
+        thread = threading.Thread(target=self.compact, args=(min_segments,),
+                                  name='segment-compaction', daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        """Xóa toàn bộ segment (vd sau khi dữ liệu đã được export lại vào CSV)"""
+        shutil.rmtree(self.directory, ignore_errors=True)
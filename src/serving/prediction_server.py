@@ -0,0 +1,333 @@
+"""
+Server dự đoán điều luật chạy lâu dài, gom request thành micro-batch
+
+Mô hình được load một lần khi khởi động. Các request đến đồng thời được
+gom trong vài mili giây (hoặc tới khi đủ max_batch_size) rồi chấm điểm
+bằng một lần predict_topk duy nhất. Hàng đợi có giới hạn: khi đầy, request
+mới bị từ chối ngay với mã 503 thay vì làm tăng độ trễ của mọi request.
+
+API (HTTP/1.1, hỗ trợ keep-alive; có thể nghe trên TCP hoặc Unix socket):
+    POST /predict   body {"text": "...", "top_k": 5}
+                    -> {"predictions": [{rank, article, confidence, probability}, ...]}
+    GET  /stats     -> số request, số batch, kích thước batch trung bình,
+                       độ trễ p50/p99 (ms) và throughput (request/giây)
+    GET  /health    -> {"status": "ok"}
+
+Cách chạy:
+    python src/serving/prediction_server.py --model models/law_classifier
+    python src/serving/prediction_server.py --model models/law_classifier_linear --unix /tmp/law.sock
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from data.config import SERVER_CONFIG
+from models.predictor import load_predictor
+
+MAX_TOP_K = 50
+MAX_BODY_BYTES = 1 << 20
+
+
+class QueueFullError(Exception):
+    """Hàng đợi dự đoán đã đầy"""
+
+
+class LatencyStats:
+    """Bộ đếm request và độ trễ của các request gần nhất"""
+
+    def __init__(self, window: int = 10000):
+        self.latencies = deque(maxlen=window)
+        self.started_at = time.perf_counter()
+        self.requests = 0
+        self.rejected = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_requests = 0
+
+    def record_batch(self, size: int):
+        self.batches += 1
+        self.batched_requests += size
+
+    def record_request(self, latency: float):
+        self.requests += 1
+        self.latencies.append(latency)
+
+    def snapshot(self) -> Dict:
+        """Tóm tắt các bộ đếm hiện tại"""
+        elapsed = time.perf_counter() - self.started_at
+        if self.latencies:
+            p50, p99 = np.percentile(np.fromiter(self.latencies, dtype=np.float64), [50, 99]) * 1000
+        else:
+            p50 = p99 = 0.0
+        return {
+            'requests': self.requests,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'batches': self.batches,
+            'avg_batch_size': self.batched_requests / self.batches if self.batches else 0.0,
+            'latency_p50_ms': float(p50),
+            'latency_p99_ms': float(p99),
+            'throughput_rps': self.requests / elapsed if elapsed > 0 else 0.0,
+            'uptime_s': elapsed,
+        }
+
+
+class MicroBatcher:
+    """Gom các request đồng thời thành batch và chấm điểm bằng predict_topk"""
+
+    def __init__(self, predictor, max_batch_size: int = None, max_wait_ms: float = None,
+                 max_queue: int = None, stats: Optional[LatencyStats] = None):
+        """
+        Args:
+            predictor: Đối tượng có predict_topk(texts, top_k) trả về dạng cột
+            max_batch_size: Số request tối đa mỗi batch
+            max_wait_ms: Thời gian chờ gom batch tính từ request đầu tiên
+            max_queue: Số request chờ tối đa trước khi từ chối
+            stats: Bộ đếm dùng chung với server
+        """
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size or SERVER_CONFIG['max_batch_size']
+        self.max_wait = (SERVER_CONFIG['max_wait_ms'] if max_wait_ms is None else max_wait_ms) / 1000
+        self.max_queue = max_queue or SERVER_CONFIG['max_queue']
+        self.stats = stats or LatencyStats()
+        self.queue: Optional[asyncio.Queue] = None
+        # Một luồng duy nhất: các batch chạy tuần tự, event loop vẫn nhận request
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=False)
+
+    async def submit(self, text: str, top_k: int) -> List[Dict]:
+        """
+        Đưa một bản án vào hàng đợi và chờ kết quả
+
+        Raises:
+            QueueFullError: Hàng đợi đã đầy
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((text, top_k, future))
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+            raise QueueFullError()
+        return await future
+
+    async def _collect(self) -> List[Tuple[str, int, asyncio.Future]]:
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Lấy hết các request đã có sẵn trước khi chờ thêm
+            while len(batch) < self.max_batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            remaining = deadline - time.perf_counter()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _predict(self, texts: List[str], top_k: int) -> List[List[Dict]]:
+        columns = self.predictor.predict_topk(texts, top_k=top_k)
+        k = len(columns['rank']) // len(texts) if texts else 0
+        ranks = columns['rank'].tolist()
+        articles = columns['article'].tolist()
+        confidences = columns['confidence'].tolist()
+        return [
+            [
+                {'rank': ranks[i], 'article': str(articles[i]),
+                 'confidence': confidences[i], 'probability': confidences[i]}
+                for i in range(doc * k, (doc + 1) * k)
+            ]
+            for doc in range(len(texts))
+        ]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _, _ in batch]
+            top_k = max(k for _, k, _ in batch)
+            try:
+                results = await loop.run_in_executor(self.executor, self._predict, texts, top_k)
+            except Exception as e:
+                self.stats.errors += len(batch)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats.record_batch(len(batch))
+            # Mỗi request chỉ lấy top_k của chính nó từ kết quả top_k lớn nhất của batch
+            for (_, k, future), predictions in zip(batch, results):
+                if not future.done():
+                    future.set_result(predictions[:k])
+
+
+class PredictionServer:
+    """Server HTTP/1.1 tối giản trên asyncio, chuyển /predict vào MicroBatcher"""
+
+    def __init__(self, batcher: MicroBatcher):
+        self.batcher = batcher
+        self.stats = batcher.stats
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, payload: Dict,
+                    keep_alive: bool = True):
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+                   413: 'Payload Too Large', 500: 'Internal Server Error',
+                   503: 'Service Unavailable'}
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        headers = (
+            f"HTTP/1.1 {status} {reasons.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(headers.encode('ascii') + body)
+        await writer.drain()
+
+    async def _predict(self, body: bytes) -> Tuple[int, Dict]:
+        started = time.perf_counter()
+        try:
+            request = json.loads(body.decode('utf-8'))
+            text = request['text']
+            top_k = int(request.get('top_k', 5))
+            if not isinstance(text, str) or not 1 <= top_k <= MAX_TOP_K:
+                raise ValueError()
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return 400, {'error': f'Body phải là {{"text": str, "top_k": 1..{MAX_TOP_K}}}'}
+
+        try:
+            predictions = await self.batcher.submit(text, top_k)
+        except QueueFullError:
+            return 503, {'error': 'Hàng đợi dự đoán đã đầy, thử lại sau'}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+        self.stats.record_request(time.perf_counter() - started)
+        return 200, {'predictions': predictions}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Xử lý một kết nối, nhiều request nối tiếp nếu keep-alive"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, path, version = lines[0].split(' ', 2)
+                except ValueError:
+                    await self._send(writer, 400, {'error': 'Request line không hợp lệ'}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # Không biết body kết thúc ở đâu nên không thể giữ kết nối
+                    await self._send(writer, 400, {'error': 'Content-Length không hợp lệ'}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._send(writer, 413, {'error': 'Body quá lớn'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                if method == 'POST' and path == '/predict':
+                    status, payload = await self._predict(body)
+                elif method == 'GET' and path == '/stats':
+                    status, payload = 200, self.stats.snapshot()
+                elif method == 'GET' and path == '/health':
+                    status, payload = 200, {'status': 'ok'}
+                else:
+                    status, payload = 404, {'error': f'Không có {method} {path}'}
+
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = None, port: int = None, unix_path: str = None):
+        """Chạy server cho tới khi bị dừng"""
+        self.batcher.start()
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            server = await asyncio.start_unix_server(self.handle, path=unix_path)
+            address = unix_path
+        else:
+            host = host or SERVER_CONFIG['host']
+            port = SERVER_CONFIG['port'] if port is None else port
+            server = await asyncio.start_server(self.handle, host, port)
+            address = f"http://{host}:{server.sockets[0].getsockname()[1]}"
+
+        print(f"🚀 Server dự đoán đang chạy tại {address} "
+              f"(batch ≤ {self.batcher.max_batch_size}, chờ {self.batcher.max_wait * 1000:g} ms, "
+              f"hàng đợi ≤ {self.batcher.max_queue})", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server dự đoán điều luật với micro-batching")
+    parser.add_argument('--model', default='models/law_classifier',
+                        help='Artifact tuyến tính, thư mục mô hình hoặc file .pkl')
+    parser.add_argument('--host', default=None)
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--unix', default=None, help='Nghe trên Unix socket thay vì TCP')
+    parser.add_argument('--max-batch-size', type=int, default=None)
+    parser.add_argument('--max-wait-ms', type=float, default=None)
+    parser.add_argument('--max-queue', type=int, default=None)
+    args = parser.parse_args()
+
+    predictor = load_predictor(args.model)
+    print(f"✅ Đã load mô hình từ {args.model}")
+
+    batcher = MicroBatcher(predictor, args.max_batch_size, args.max_wait_ms, args.max_queue)
+    try:
+        asyncio.run(PredictionServer(batcher).serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("\n👋 Đã dừng server")
+
+
+if __name__ == "__main__":
+    main()
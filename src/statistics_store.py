@@ -0,0 +1,297 @@
+"""
+Module thống kê dựng sẵn (materialized) cho DataLoader
+
+Các bảng đếm của get_law_statistics/get_case_statistics và hai khối đếm
+(group-by theo nhiều chiều) được tính một lần rồi lưu trong cache_dir/stats:
+
+    tables.pkl     - dict tên bảng → Series số dòng theo khóa (pickle protocol 5)
+    meta.json      - số dòng, digest các cột được đếm và kiểu các cột của case/case_law
+
+Khối 'citations' đếm các dòng case_law theo điều luật (law_id, article, type)
+kèm thuộc tính của bản án trích dẫn (tòa án, cấp xét xử, loại văn bản, năm);
+khối 'cases' đếm các bản án theo các thuộc tính đó. Bảng chéo như số lần áp
+dụng điều luật theo tòa án hoặc theo năm được cộng gộp từ các khối này thay vì
+quét lại dữ liệu.
+
+Khi dữ liệu chỉ được nối thêm dòng vào cuối (digest các cột được đếm của phần
+cũ không đổi, kể cả giá trị như court_name), refresh() chỉ đếm các dòng mới
+rồi cộng vào bảng đã có; ngược lại dựng lại toàn bộ. Các bảng giữ khóa theo
+thứ tự xuất hiện đầu tiên nên kết quả (kể cả thứ tự các khóa cùng số đếm)
+trùng với value_counts() trên toàn bộ dữ liệu.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from case_law_index import take_columns
+from id_index import IdIndex
+
+STATS_FORMAT_VERSION = 2
+
+# Tên thống kê → cột, giữ nguyên khóa của get_law_statistics/get_case_statistics
+LAW_STATISTICS = {
+    'law_usage': 'law_id',
+    'type_usage': 'type',
+    'clause_usage': 'clause',
+    'point_usage': 'point',
+}
+CASE_STATISTICS = {
+    'court_distribution': 'court_name',
+    'level_distribution': 'case_level',
+    'document_type_distribution': 'document_type',
+}
+
+# Chiều của các khối đếm; 'year' lấy từ năm của cột created
+CASE_DIMENSIONS = ('court_name', 'case_level', 'document_type', 'law_type', 'year')
+CITATION_DIMENSIONS = ('law_id', 'article', 'type')
+YEAR_SOURCE = 'created'
+
+# Các cột mà bảng thống kê phụ thuộc vào, được đưa vào digest của phần đã đếm
+COUNTED_COLUMNS = {
+    'case': list(dict.fromkeys(('id',) + tuple(CASE_STATISTICS.values())
+                               + CASE_DIMENSIONS + (YEAR_SOURCE,))),
+    'case_law': list(dict.fromkeys(('id', 'case_id') + tuple(LAW_STATISTICS.values())
+                                   + CITATION_DIMENSIONS)),
+}
+
+
+def id_digest(ids: pd.Series) -> str:
+    """Digest blake2b của một cột id, dùng để nhận biết phần dữ liệu cũ không đổi"""
+    hashed = pd.util.hash_pandas_object(ids, index=False).to_numpy()
+    return hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()
+
+
+def content_digest(name: str, data: pd.DataFrame) -> Optional[str]:
+    """Digest blake2b các cột được đếm (COUNTED_COLUMNS) của bảng case/case_law"""
+    columns = [col for col in COUNTED_COLUMNS[name] if col in data.columns]
+    if not columns:
+        return None
+    hashed = pd.util.hash_pandas_object(data[columns], index=False).to_numpy()
+    return hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()
+
+
+def _dtypes(data: pd.DataFrame) -> Dict[str, str]:
+    # Đổi cột hoặc kiểu (vd bật/tắt schema) thì không cộng dồn vào bảng cũ
+    return {col: str(dtype) for col, dtype in data.dtypes.items()}
+
+
+def case_attributes(case_data: pd.DataFrame) -> pd.DataFrame:
+    """Các cột thuộc tính bản án dùng làm chiều của khối đếm (kèm cột year)"""
+    columns = {col: case_data[col] for col in CASE_DIMENSIONS if col in case_data.columns}
+    if YEAR_SOURCE in case_data.columns:
+        created = pd.to_datetime(case_data[YEAR_SOURCE], errors='coerce')
+        columns['year'] = created.dt.year.astype('Int64')
+    return pd.DataFrame(columns, index=case_data.index)
+
+
+def count_rows(frame: pd.DataFrame, columns: List[str], dropna: bool = True) -> pd.Series:
+    """Số dòng theo một hoặc nhiều cột, khóa theo thứ tự xuất hiện đầu tiên"""
+    if len(columns) == 1:
+        counts = frame[columns[0]].value_counts(sort=False, dropna=dropna)
+    else:
+        counts = frame.groupby(columns, sort=False, dropna=dropna, observed=True).size()
+    # Cột categorical trả về cả các giá trị không xuất hiện; cột Int32 cho số đếm kiểu Int64
+    return counts[counts > 0].astype(np.int64)
+
+
+def merge_counts(old: pd.Series, new: pd.Series) -> pd.Series:
+    """
+    Cộng hai bảng đếm, khóa mới được nối sau các khóa đã có
+
+    Chỉ tra các khóa của bảng mới trong chỉ mục của bảng cũ (không nhóm lại
+    toàn bộ), chi phí tỷ lệ với số khóa mới.
+    """
+    if len(new) == 0:
+        return old
+    if len(old) == 0:
+        return new
+    locs = old.index.get_indexer(new.index)
+    found = locs >= 0
+    values = old.to_numpy().copy()
+    np.add.at(values, locs[found], new.to_numpy()[found])
+    return pd.Series(np.concatenate([values, new.to_numpy()[~found]]),
+                     index=old.index.append(new.index[~found]), name=old.name)
+
+
+class StatisticsStore:
+    """Các bảng thống kê dựng sẵn của case_data/case_law_data, cập nhật dần khi nối thêm dòng"""
+
+    def __init__(self, tables: Optional[Dict[str, pd.Series]] = None, meta: Optional[Dict] = None):
+        self.tables: Dict[str, pd.Series] = tables or {}
+        self.meta: Dict = meta or {}
+        self._dicts: Dict[str, Dict] = {}
+
+    @property
+    def rows(self) -> Dict[str, int]:
+        """Số dòng case/case_law đã được đếm"""
+        return {name: state['rows'] for name, state in self.meta.get('tables', {}).items()}
+
+    def _appended_from(self, name: str, data: pd.DataFrame) -> Optional[int]:
+        """
+        Vị trí dòng đầu tiên chưa được đếm của một bảng
+
+        Returns:
+            None nếu phần đã đếm không còn nguyên vẹn (phải dựng lại)
+        """
+        state = self.meta.get('tables', {}).get(name)
+        if state is None or state.get('dtypes') != _dtypes(data) or len(data) < state['rows']:
+            return None
+        if content_digest(name, data.iloc[:state['rows']]) != state['digest']:
+            return None
+        return state['rows']
+
+    def refresh(self, case_data: Optional[pd.DataFrame], case_law_data: Optional[pd.DataFrame],
+                case_index: Optional[IdIndex] = None) -> bool:
+        """
+        Đồng bộ các bảng thống kê với dữ liệu hiện tại
+
+        Args:
+            case_data: Bảng bản án
+            case_law_data: Bảng trích dẫn bản án - điều luật
+            case_index: Chỉ mục id → dòng của case_data (xây mới nếu không truyền hoặc đã cũ)
+
+        Returns:
+            True nếu các bảng thống kê đã thay đổi
+        """
+        case_data = case_data if case_data is not None else pd.DataFrame()
+        case_law_data = case_law_data if case_law_data is not None else pd.DataFrame()
+        case_start = self._appended_from('case', case_data)
+        link_start = self._appended_from('case_law', case_law_data)
+
+        if case_start is not None and link_start is not None:
+            if case_start == len(case_data) and link_start == len(case_law_data):
+                return False
+            # Trích dẫn cũ tới bản án vừa được thêm phải đổi thuộc tính trong khối citations
+            if (case_start < len(case_data) and 'case_id' in case_law_data.columns
+                    and np.isin(case_law_data['case_id'].to_numpy()[:link_start],
+                                case_data['id'].to_numpy()[case_start:]).any()):
+                case_start = link_start = None
+
+        if case_start is None or link_start is None:
+            self.tables = {}
+            case_start = link_start = 0
+
+        if 'id' in case_data.columns and (case_index is None or len(case_index) != len(case_data)):
+            case_index = IdIndex(case_data['id'])
+        self._count(case_data, case_law_data, case_start, link_start, case_index)
+
+        self.meta = {
+            'format_version': STATS_FORMAT_VERSION,
+            'tables': {name: {'rows': len(data), 'dtypes': _dtypes(data),
+                              'digest': content_digest(name, data)}
+                       for name, data in (('case', case_data), ('case_law', case_law_data))},
+        }
+        self._dicts = {}
+        return True
+
+    def _count(self, case_data: pd.DataFrame, case_law_data: pd.DataFrame,
+               case_start: int, link_start: int, case_index: Optional[IdIndex]):
+        """Đếm các dòng từ case_start/link_start trở đi và cộng vào các bảng"""
+        new_counts: Dict[str, pd.Series] = {}
+        cases = case_data.iloc[case_start:]
+        links = case_law_data.iloc[link_start:]
+
+        for name, column in CASE_STATISTICS.items():
+            if column in cases.columns:
+                new_counts[name] = count_rows(cases, [column])
+        for name, column in LAW_STATISTICS.items():
+            if column in links.columns:
+                new_counts[name] = count_rows(links, [column])
+
+        attributes = case_attributes(cases)
+        if len(attributes.columns) > 0:
+            new_counts['cases'] = count_rows(attributes, list(attributes.columns), dropna=False)
+
+        dimensions = [col for col in CITATION_DIMENSIONS if col in links.columns]
+        if dimensions:
+            citations = {col: links[col].to_numpy() for col in dimensions}
+            if case_index is not None and 'case_id' in links.columns:
+                # Như left join: trích dẫn tới bản án không có trong case_data mang thuộc tính rỗng
+                rows = case_index.positions(links['case_id'].to_numpy())
+                source = [col for col in CASE_DIMENSIONS + (YEAR_SOURCE,) if col in case_data.columns]
+                cited = pd.DataFrame(take_columns(case_data, rows, {col: col for col in source}))
+                citations.update(case_attributes(cited).reset_index(drop=True))
+            new_counts['citations'] = count_rows(pd.DataFrame(citations), list(citations),
+                                                 dropna=False)
+
+        for name, counts in new_counts.items():
+            self.tables[name] = merge_counts(self.tables.get(name, counts.iloc[:0]), counts)
+
+    def _as_dict(self, name: str) -> Dict:
+        """Bảng đếm dạng dict sắp giảm dần như value_counts(), được giữ lại tới lần refresh sau"""
+        if name not in self._dicts:
+            counts = self.tables[name].sort_values(ascending=False, kind='stable')
+            self._dicts[name] = counts.to_dict()
+        return self._dicts[name]
+
+    def law_statistics(self) -> Dict:
+        """Thống kê sử dụng điều luật (cùng định dạng get_law_statistics)"""
+        return {name: dict(self._as_dict(name)) for name in LAW_STATISTICS if name in self.tables}
+
+    def case_statistics(self) -> Dict:
+        """Thống kê bản án (cùng định dạng get_case_statistics)"""
+        return {name: dict(self._as_dict(name)) for name in CASE_STATISTICS if name in self.tables}
+
+    def dimensions(self, table: str = 'citations') -> List[str]:
+        """Các chiều có thể dùng trong crosstab() của một khối đếm"""
+        if table not in self.tables:
+            return []
+        return list(self.tables[table].index.names)
+
+    def crosstab(self, index: Union[str, List[str]], columns: Optional[str] = None,
+                 table: str = 'citations', dropna: bool = True) -> Union[pd.DataFrame, pd.Series]:
+        """
+        Bảng chéo số dòng, cộng gộp từ khối đếm dựng sẵn
+
+        Args:
+            index: Chiều (hoặc danh sách chiều) làm dòng, vd 'law_id', 'article'
+            columns: Chiều làm cột, vd 'court_name', 'year'; None trả về Series
+            table: 'citations' (đếm trích dẫn) hoặc 'cases' (đếm bản án)
+            dropna: Bỏ các khóa rỗng như pd.crosstab
+
+        Returns:
+            DataFrame index × columns (0 cho ô trống), hoặc Series nếu columns=None
+        """
+        if table not in self.tables:
+            raise ValueError(f"Không có khối đếm '{table}'")
+        levels = [index] if isinstance(index, str) else list(index)
+        if columns is not None:
+            levels.append(columns)
+        unknown = [level for level in levels if level not in self.dimensions(table)]
+        if unknown:
+            raise ValueError(f"Khối '{table}' không có chiều {unknown}, "
+                             f"các chiều hợp lệ: {self.dimensions(table)}")
+
+        counts = self.tables[table].groupby(level=levels, dropna=dropna).sum()
+        if columns is None:
+            return counts
+        return counts.unstack(columns, fill_value=0)
+
+    def save(self, directory: str):
+        """Lưu các bảng thống kê ra thư mục"""
+        os.makedirs(directory, exist_ok=True)
+        tmp_file = os.path.join(directory, 'tables.pkl.tmp')
+        pd.to_pickle(self.tables, tmp_file, compression=None, protocol=5)
+        os.replace(tmp_file, os.path.join(directory, 'tables.pkl'))
+        # meta.json ghi sau cùng, là dấu hiệu các bảng đã ghi xong
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional['StatisticsStore']:
+        """Load các bảng thống kê đã lưu, trả về None nếu chưa có, hỏng hoặc khác phiên bản"""
+        try:
+            with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('format_version') != STATS_FORMAT_VERSION:
+                return None
+            tables = pd.read_pickle(os.path.join(directory, 'tables.pkl'))
+        except (OSError, ValueError, EOFError):
+            return None
+        return cls(tables, meta)
+
@@ -0,0 +1,202 @@
+"""
+Module lưu trữ văn bản dạng memory-mapped
+
+Toàn bộ văn bản của một cột (ví dụ 'text' của bản án) được ghi nối tiếp
+vào một file UTF-8 duy nhất (<prefix>.bin), kèm mảng offsets int64
+(<prefix>.offsets.npy) gồm n+1 phần tử: văn bản thứ i nằm trong khoảng
+byte [offsets[i], offsets[i+1]). Khi đọc, cả hai file được memory-map nên
+chỉ những văn bản đang dùng mới được giải mã thành chuỗi Python.
+"""
+
+import json
+import os
+from array import array
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+BLOB_SUFFIX = '.bin'
+OFFSETS_SUFFIX = '.offsets.npy'
+META_SUFFIX = '.meta.json'
+
+
+def store_paths(path_prefix: str) -> Dict[str, str]:
+    """Đường dẫn các file của một text store"""
+    return {
+        'blob': path_prefix + BLOB_SUFFIX,
+        'offsets': path_prefix + OFFSETS_SUFFIX,
+        'meta': path_prefix + META_SUFFIX,
+    }
+
+
+def read_store_meta(path_prefix: str) -> Optional[Dict]:
+    """Đọc manifest của text store, trả về None nếu chưa có hoặc hỏng"""
+    paths = store_paths(path_prefix)
+    if not all(os.path.exists(p) for p in paths.values()):
+        return None
+    try:
+        with open(paths['meta'], 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class TextStoreWriter:
+    """Ghi lần lượt các văn bản vào một text store mới"""
+
+    def __init__(self, path_prefix: str):
+        self.path_prefix = path_prefix
+        self.paths = store_paths(path_prefix)
+        directory = os.path.dirname(path_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._blob = open(self.paths['blob'] + '.tmp', 'wb')
+        self._offsets = array('q', [0])
+        self._position = 0
+
+    def append(self, text: Optional[str]):
+        """Thêm một văn bản, giá trị rỗng/NaN được lưu thành chuỗi rỗng"""
+        if isinstance(text, str) and text:
+            data = text.encode('utf-8')
+            self._blob.write(data)
+            self._position += len(data)
+        self._offsets.append(self._position)
+
+    def extend(self, texts: Iterable[Optional[str]]):
+        for text in texts:
+            self.append(text)
+
+    def close(self, meta: Optional[Dict] = None) -> 'TextStore':
+        """
+        Hoàn tất việc ghi và mở text store vừa tạo
+
+        Args:
+            meta: Thông tin bổ sung ghi vào manifest (ví dụ dấu vết file nguồn)
+        """
+        self._blob.close()
+        os.replace(self.paths['blob'] + '.tmp', self.paths['blob'])
+
+        offsets_tmp = self.paths['offsets'] + '.tmp.npy'
+        np.save(offsets_tmp, np.frombuffer(self._offsets, dtype=np.int64))
+        os.replace(offsets_tmp, self.paths['offsets'])
+
+        manifest = dict(meta or {})
+        manifest['count'] = len(self._offsets) - 1
+        manifest['bytes'] = self._position
+        with open(self.paths['meta'], 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        return TextStore(self.path_prefix)
+
+
+def append_to_store(path_prefix: str, texts: Iterable[Optional[str]],
+                    meta: Optional[Dict] = None) -> 'TextStore':
+    """
+    Nối thêm văn bản vào cuối một text store đã có
+
+    Blob được ghi nối tiếp, offsets và manifest được ghi lại qua file tạm nên
+    các TextStore đang mở (memory-map bản cũ) vẫn đọc đúng các dòng cũ.
+
+    Args:
+        path_prefix: Tiền tố đường dẫn của text store
+        texts: Các văn bản mới
+        meta: Các khóa manifest cần cập nhật
+    """
+    paths = store_paths(path_prefix)
+    offsets = array('q', np.load(paths['offsets']).tobytes())
+    position = offsets[-1]
+    with open(paths['blob'], 'r+b') as blob:
+        # Bỏ phần thừa của lần nối trước bị dừng giữa chừng
+        blob.truncate(position)
+        blob.seek(position)
+        for text in texts:
+            if isinstance(text, str) and text:
+                data = text.encode('utf-8')
+                blob.write(data)
+                position += len(data)
+            offsets.append(position)
+
+    offsets_tmp = paths['offsets'] + '.tmp.npy'
+    np.save(offsets_tmp, np.frombuffer(offsets, dtype=np.int64))
+    os.replace(offsets_tmp, paths['offsets'])
+
+    manifest = read_store_meta(path_prefix) or {}
+    manifest.update(meta or {})
+    manifest['count'] = len(offsets) - 1
+    manifest['bytes'] = position
+    meta_tmp = paths['meta'] + '.tmp'
+    with open(meta_tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(meta_tmp, paths['meta'])
+    return TextStore(path_prefix)
+
+
+class TextStore:
+    """Kho văn bản chỉ đọc, truy cập theo số thứ tự dòng"""
+
+    def __init__(self, path_prefix: str):
+        self.path_prefix = path_prefix
+        paths = store_paths(path_prefix)
+        self.offsets = np.load(paths['offsets'], mmap_mode='r')
+        if os.path.getsize(paths['blob']) > 0:
+            self.blob = np.memmap(paths['blob'], dtype=np.uint8, mode='r')
+        else:
+            self.blob = np.empty(0, dtype=np.uint8)
+
+    @classmethod
+    def build(cls, texts: Iterable[Optional[str]], path_prefix: str,
+              meta: Optional[Dict] = None) -> 'TextStore':
+        """Tạo text store từ một iterable các văn bản"""
+        writer = TextStoreWriter(path_prefix)
+        writer.extend(texts)
+        return writer.close(meta)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def get(self, row: int) -> str:
+        """Lấy văn bản ở dòng thứ row"""
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return self.blob[start:end].tobytes().decode('utf-8')
+
+    def text_lengths(self) -> np.ndarray:
+        """Độ dài (byte) của từng văn bản"""
+        return np.diff(self.offsets)
+
+    def view(self, rows: Optional[Iterable[int]] = None) -> 'TextView':
+        """Tạo view lười trên một tập dòng (mặc định là toàn bộ)"""
+        if rows is None:
+            rows = np.arange(len(self))
+        return TextView(self, np.asarray(rows, dtype=np.int64))
+
+
+class TextView:
+    """
+    Dãy văn bản lười trên một TextStore
+
+    Hỗ trợ len(), lặp tuần tự, truy cập theo vị trí và take() như một
+    pandas Series, nên có thể truyền trực tiếp cho TfidfVectorizer.
+    """
+
+    def __init__(self, store: TextStore, rows: np.ndarray):
+        self.store = store
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[str]:
+        for row in self.rows:
+            yield self.store.get(row)
+
+    def __getitem__(self, position: Union[int, slice]) -> Union[str, 'TextView']:
+        if isinstance(position, slice):
+            return TextView(self.store, self.rows[position])
+        return self.store.get(self.rows[position])
+
+    def take(self, positions: Iterable[int]) -> 'TextView':
+        """Lấy các phần tử theo vị trí, tương tự pandas.Series.take"""
+        return TextView(self.store, self.rows[np.asarray(positions, dtype=np.int64)])
+
+    def tolist(self):
+        return list(self)
@@ -6,7 +6,31 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from models.law_classifier import LawClassifier
+MODEL_PATH = 'models/law_classifier'
+LINEAR_MODEL_DIR = 'models/law_classifier_linear'
+
+def load_predictor():
+    """
+    Load mô hình để dự đoán
+    
+    Ưu tiên artifact tuyến tính (chỉ cần NumPy/SciPy, khởi động nhanh),
+    nếu không có thì load mô hình pickle đầy đủ.
+    """
+    if os.path.exists(os.path.join(LINEAR_MODEL_DIR, 'manifest.json')):
+        from models.linear_scorer import LinearScorer
+        predictor = LinearScorer(LINEAR_MODEL_DIR)
+        print(f"✅ Đã load mô hình tuyến tính từ {LINEAR_MODEL_DIR}")
+        return predictor
+    
+    # Thư mục định dạng mới hoặc file pickle cũ
+    for path in (MODEL_PATH, MODEL_PATH + '.pkl'):
+        if os.path.exists(path):
+            from models.law_classifier import LawClassifier
+            classifier = LawClassifier()
+            classifier.load_model(path)
+            return classifier
+    
+    return None
 
 def test_custom_input():
     """Test mô hình với input tùy chỉnh"""
@@ -14,10 +38,9 @@ def test_custom_input():
     print("=" * 60)
     
     # Load mô hình đã train
-    classifier = LawClassifier()
+    classifier = load_predictor()
     
-    if os.path.exists('models/law_classifier.pkl'):
-        classifier.load_model('models/law_classifier.pkl')
+    if classifier is not None:
         print("✅ Đã load mô hình thành công!")
     else:
         print("❌ Không tìm thấy mô hình đã train. Hãy chạy demo_model.py trước.")
@@ -69,10 +92,9 @@ def interactive_test():
     print("=" * 40)
     
     # Load mô hình
-    classifier = LawClassifier()
+    classifier = load_predictor()
     
-    if os.path.exists('models/law_classifier.pkl'):
-        classifier.load_model('models/law_classifier.pkl')
+    if classifier is not None:
         print("✅ Đã load mô hình thành công!")
     else:
         print("❌ Không tìm thấy mô hình đã train.")